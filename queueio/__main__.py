@@ -1,13 +1,17 @@
+from contextlib import ExitStack
+from pathlib import Path
+from threading import Event
 from typing import Annotated
 
 import typer
 from typer import Argument
 from typer import Typer
 
-from .monitor import Monitor
 from .queueio import QueueIO
 from .queuespec import QueueSpec
-from .worker import Worker
+from .raw import Format
+from .registry import ROUTINE_REGISTRY
+from .routine import Verbosity
 
 app = Typer()
 
@@ -31,66 +35,421 @@ app.add_typer(
 @routine_app.command("list")
 def routine_list():
     """Show all registered routines."""
-    with QueueIO.default() as queueio:
-        routines = queueio.routines()
+    QueueIO.register_routines()
+    QueueIO.import_routines()
+    routines = list(ROUTINE_REGISTRY.values())
 
-        if not routines:
-            print("No routines registered.")
-            return
+    if not routines:
+        print("No routines registered.")
+        return
+
+    # Calculate column widths
+    name_width = max(len("Name"), max(len(routine.name) for routine in routines))
+    function_paths = []
+    for routine in routines:
+        module = routine.fn.__module__
+        qualname = routine.fn.__qualname__
+        function_paths.append(f"{module}.{qualname}")
+    path_width = max(len("Path"), max(len(path) for path in function_paths))
+
+    print(f"{'Name':<{name_width}} | {'Path':<{path_width}}")
+    print(f"{'-' * name_width}-+-{'-' * path_width}")
+    for routine, path in zip(routines, function_paths, strict=False):
+        print(f"{routine.name:<{name_width}} | {path:<{path_width}}")
+
+
+@routine_app.command("manifest")
+def routine_manifest(
+    path: Annotated[
+        Path,
+        Argument(help="Path of the manifest to write."),
+    ] = Path("queueio-manifest.json"),
+):
+    """Write a manifest of the module and queue of each routine.
+
+    With a manifest configured, processes import the module of a routine
+    only when they use it, and workers import only the modules of the
+    routines on their queues. Regenerate it when routines change.
+    """
+    from .manifest import Manifest
 
-        # Calculate column widths
-        name_width = max(len("Name"), max(len(routine.name) for routine in routines))
-        function_paths = []
-        for routine in routines:
-            module = routine.fn.__module__
-            qualname = routine.fn.__qualname__
-            function_paths.append(f"{module}.{qualname}")
-        path_width = max(len("Path"), max(len(path) for path in function_paths))
+    QueueIO.register_routines(manifest=False)
+    manifest = Manifest.from_routines(ROUTINE_REGISTRY.values())
+    manifest.dump(path)
 
-        print(f"{'Name':<{name_width}} | {'Path':<{path_width}}")
-        print(f"{'-' * name_width}-+-{'-' * path_width}")
-        for routine, path in zip(routines, function_paths, strict=False):
-            print(f"{routine.name:<{name_width}} | {path:<{path_width}}")
+    print(f"Wrote {len(manifest.routines)} routine(s) to {path}")
+    print("Configure it in pyproject.toml to use it:")
+    print()
+    print("  [tool.queueio]")
+    print(f'  manifest = "{path}"')
 
 
 @app.command(rich_help_panel="Commands")
-def monitor(raw: bool = False):
+def monitor(
+    raw: Annotated[
+        bool,
+        typer.Option(help="Write each event, rather than showing a live view."),
+    ] = False,
+    format: Annotated[
+        Format,
+        typer.Option(help="How to write raw events, one per line."),
+    ] = Format.REPR,
+    event: Annotated[
+        list[str] | None,
+        typer.Option(
+            help="Write only raw events of this type, such as Completed "
+            "or Invocation.Started. May be repeated.",
+            show_default=False,
+        ),
+    ] = None,
+    routine: Annotated[
+        list[str] | None,
+        typer.Option(
+            help="Write only raw events of invocations of this routine. "
+            "May be repeated.",
+            show_default=False,
+        ),
+    ] = None,
+    queue: Annotated[
+        list[str] | None,
+        typer.Option(
+            help="Write only raw events of invocations on this queue. May be repeated.",
+            show_default=False,
+        ),
+    ] = None,
+    sample: Annotated[
+        float,
+        typer.Option(min=0, max=1, help="Fraction of raw invocations to write."),
+    ] = 1.0,
+):
     """Monitor queueio events.
 
-    Show a live view of queueio activity. Use --raw for detailed event output.
+    Show a live view of queueio activity. Use --raw for detailed event output,
+    and --format jsonl to write it as JSON lines for other tools.
     """
     if raw:
+        import os
+        import sys
+        from functools import cache
+
+        from .raw import EventFilter
+        from .raw import write
+
         with QueueIO.default() as queueio:
-            events = queueio.subscribe({object})
+
+            @cache
+            def queue_of(name: str) -> str:
+                try:
+                    return queueio.routine(name).queue
+                except KeyError:
+                    return ""
+
+            keep = EventFilter(
+                queue_of,
+                types=event or (),
+                routines=routine or (),
+                queues=queue or (),
+                sample=sample,
+            )
             try:
-                while True:
-                    print(events.get())
+                write(queueio.subscribe({object}), sys.stdout, format=format, keep=keep)
             except KeyboardInterrupt:
-                print("Shutting down gracefully.")
+                print("Shutting down gracefully.", file=sys.stderr)
+            except BrokenPipeError:
+                # The reader stopped reading, such as with head,
+                # so discard what's left to write when exiting
+                os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
     else:
+        # Textual is slow to import, so only the monitor imports it
+        from .monitor import Monitor
+
         with QueueIO.default() as queueio:
             Monitor(queueio).run()
 
 
 @app.command(rich_help_panel="Commands")
 def run(
-    queuespec: Annotated[
-        QueueSpec,
+    queuespecs: Annotated[
+        list[QueueSpec],
         Argument(
             parser=QueueSpec.parse,
-            help="Queue configuration in format 'queue=concurrency'. "
-            "Examples: 'production=10', 'api,background=5'",
-            metavar="QUEUE[,QUEUE2,...]=CONCURRENCY",
+            help="Queue configurations in format 'queue=concurrency'. "
+            "Each gets its own pool of runners. "
+            "Concurrency may be adaptive, as 'auto:MIN..MAX'. "
+            "Examples: 'production=10', 'api,background=5', 'critical:5,bulk=20', "
+            "'api=auto:4..64'",
+            metavar="QUEUE[:WEIGHT][,QUEUE2[:WEIGHT],...]=CONCURRENCY...",
         ),
     ],
+    max_suspended: Annotated[
+        int | None,
+        typer.Option(
+            min=0,
+            help="Maximum invocations suspended on a pause that release their "
+            "capacity. Further pauses hold their capacity, which throttles "
+            "receiving. The cap doesn't cover invocations awaiting other "
+            "invocations, which always release their capacity, so that they "
+            "can't deadlock the worker.",
+        ),
+    ] = None,
+    metrics_port: Annotated[
+        int | None,
+        typer.Option(
+            min=0,
+            help="Serve Prometheus metrics of invocations on this port.",
+        ),
+    ] = None,
+    metrics_host: Annotated[
+        str,
+        typer.Option(help="Address to serve metrics on."),
+    ] = "127.0.0.1",
+    trace_otlp: Annotated[
+        str | None,
+        typer.Option(
+            help="Export traces of invocations to this OTLP/HTTP traces endpoint, "
+            "such as http://localhost:4318/v1/traces.",
+        ),
+    ] = None,
+    trace_file: Annotated[
+        Path | None,
+        typer.Option(help="Append traces of invocations to this file as JSON lines."),
+    ] = None,
+    trace_sample: Annotated[
+        float,
+        typer.Option(
+            min=0,
+            max=1,
+            help="Fraction of new traces to record.",
+        ),
+    ] = 1.0,
+    profile: Annotated[
+        Path | None,
+        typer.Option(
+            help="Write collapsed stacks of routines to this directory "
+            "when profiling is triggered, with SIGUSR1 or queueio profile.",
+        ),
+    ] = None,
+    profile_interval: Annotated[
+        float,
+        typer.Option(min=0.001, help="Seconds between stack samples."),
+    ] = 0.01,
+    profile_duration: Annotated[
+        float,
+        typer.Option(min=0, help="Default seconds to profile when triggered."),
+    ] = 30,
+):
+    """Run a worker to process from queues.
+
+    The worker will process invocations from the specified queues,
+    as many at a time as specified by the concurrency of each queuespec.
+    Multiple queuespecs share one connection in a single process.
+    """
+    from .worker import Worker
+
+    with ExitStack() as stack:
+        metrics = tracer = profiler = None
+        if metrics_port is not None:
+            from .metrics import Metrics
+
+            metrics = Metrics()
+            host, port = stack.enter_context(
+                metrics.serve(metrics_port, host=metrics_host)
+            )
+            print(f"Serving metrics at http://{host}:{port}/metrics")
+        if trace_otlp is not None or trace_file is not None:
+            from .tracing import FileExporter
+            from .tracing import OtlpExporter
+            from .tracing import Tracer
+
+            if trace_otlp is not None:
+                exporter = OtlpExporter(trace_otlp)
+            else:
+                assert trace_file is not None
+                exporter = FileExporter(trace_file)
+            tracer = stack.enter_context(Tracer.start(exporter, sample=trace_sample))
+        if profile is not None:
+            import signal
+
+            from .profiler import Profile
+            from .profiler import Profiler
+
+            def written(profiled: Profile, paths: list[Path]):
+                print(
+                    f"Wrote {profiled.invocations.total()} samples "
+                    f"of {len(paths)} routine(s) to {profile}"
+                )
+
+            profiler = Profiler(
+                profile,
+                interval=profile_interval,
+                duration=profile_duration,
+                written=written,
+            )
+            stack.callback(profiler.shutdown)
+            if hasattr(signal, "SIGUSR1"):
+                signal.signal(signal.SIGUSR1, lambda *_: profiler.trigger())
+
+        queueio = stack.enter_context(
+            QueueIO.default(metrics=metrics, tracer=tracer, profiler=profiler)
+        )
+        if profiler is not None:
+            profiler.listen(queueio.subscribe({profiler.Requested}))
+            print(f"Profiling to {profile} with SIGUSR1 or queueio profile")
+        Worker(queueio, *queuespecs, max_suspended=max_suspended)()
+
+
+@app.command(rich_help_panel="Commands")
+def bench(
+    scenarios: Annotated[
+        list[str] | None,
+        Argument(
+            help="Scenarios to run, of noop, awaits, fanout, chain, pauses, "
+            "and payload. Runs all of them by default.",
+            show_default=False,
+        ),
+    ] = None,
+    stub: Annotated[
+        bool,
+        typer.Option(help="Use the in-memory stub backend, not the configured one."),
+    ] = False,
+    invocations: Annotated[
+        int,
+        typer.Option(min=1, help="Invocations to submit for each scenario."),
+    ] = 1000,
+    concurrency: Annotated[
+        int,
+        typer.Option(min=1, help="Concurrency of the worker and the submitter."),
+    ] = 10,
+    output: Annotated[
+        Path | None,
+        typer.Option(help="Write the results as JSON to compare with later runs."),
+    ] = None,
+    baseline: Annotated[
+        Path | None,
+        typer.Option(help="Fail if results are slower than in this JSON results."),
+    ] = None,
+    tolerance: Annotated[
+        float,
+        typer.Option(
+            min=0,
+            help="Fraction that throughput may drop, or p99 latency rise, "
+            "from the baseline.",
+        ),
+    ] = 0.1,
+    events: Annotated[
+        Verbosity,
+        typer.Option(help="Which lifecycle events the scenarios publish."),
+    ] = Verbosity.FULL,
 ):
-    """Run a worker to process from a queue.
+    """Benchmark routines with a worker in this process.
 
-    The worker will process invocations from the specified queue,
-    as many at a time as specified by the concurrency.
+    Each scenario reports invocations per second, latency from submitting
+    to completing, the CPU time of the process, its peak memory,
+    and the lifecycle events published to the journal per invocation.
+    The scenarios use the queueio-bench queue, which is purged first.
     """
+    from . import bench as benchmark
+    from .scenarios import QUEUE
+
+    if stub:
+        from .stub import StubBackend
+
+        with (
+            StubBackend.connect() as backend,
+            backend.broker() as broker,
+            backend.journal() as journal,
+        ):
+            queueio = QueueIO(broker=broker, journal=journal, events={QUEUE: events})
+            try:
+                report = benchmark.scenarios(
+                    queueio,
+                    scenarios,
+                    backend="stub",
+                    invocations=invocations,
+                    concurrency=concurrency,
+                )
+            finally:
+                queueio.shutdown()
+    else:
+        with QueueIO.default(events={QUEUE: events}) as queueio:
+            report = benchmark.scenarios(
+                queueio,
+                scenarios,
+                backend="configured",
+                invocations=invocations,
+                concurrency=concurrency,
+            )
+
+    print(
+        f"{'Scenario':<10} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'p99 ms':>9} {'CPU s':>8} {'RSS MiB':>8} {'events':>7}"
+    )
+    for result in report.results:
+        print(
+            f"{result.scenario:<10} {result.ops:>10.0f} "
+            f"{result.latency.p50 * 1000:>9.2f} {result.latency.p95 * 1000:>9.2f} "
+            f"{result.latency.p99 * 1000:>9.2f} {result.cpu:>8.2f} "
+            f"{result.rss / 2**20:>8.1f} {result.events:>7.2f}"
+        )
+
+    if output is not None:
+        report.dump(output)
+        print(f"Wrote results to {output}")
+
+    if baseline is not None:
+        regressions = report.regressions(
+            benchmark.Report.load(baseline), tolerance=tolerance
+        )
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            raise typer.Exit(1)
+
+
+@app.command(rich_help_panel="Commands")
+def profile(
+    duration: Annotated[
+        float | None,
+        typer.Option(
+            min=0,
+            help="Seconds to profile, instead of each worker's --profile-duration.",
+        ),
+    ] = None,
+):
+    """Profile the routines of workers run with --profile.
+
+    Each worker samples the stacks of its routines for the duration,
+    and writes their collapsed stacks to its profile directory.
+    """
+    from .id import random_id
+    from .profiler import Profiler
+
     with QueueIO.default() as queueio:
-        Worker(queueio, queuespec)()
+        queueio.publish(Profiler.Requested(id=random_id(), duration=duration))
+    print("Requested a profile from workers run with --profile.")
+
+
+@app.command(rich_help_panel="Commands")
+def hub(
+    path: Annotated[
+        str,
+        Argument(help="Path of the Unix socket to serve."),
+    ],
+):
+    """Serve queues and a journal to the processes on this host.
+
+    Producers and workers connect to the hub with a broker URI
+    of unix:// followed by the path. The queues are kept in memory,
+    so pending messages are lost when the hub stops.
+    """
+    from .unix.hub import Hub
+
+    with Hub.serve(path):
+        print(f"Serving at unix://{path}")
+        try:
+            Event().wait()
+        except KeyboardInterrupt:
+            print("Shutting down gracefully.")
 
 
 @app.command(rich_help_panel="Commands")
@@ -0,0 +1,141 @@
+from collections import OrderedDict
+from collections.abc import Callable
+from collections.abc import Iterable
+from dataclasses import dataclass
+from dataclasses import replace
+from itertools import count
+from threading import Lock
+from typing import Any
+
+from .invocation import Invocation
+from .result import Ok
+
+# The status each lifecycle event moves an invocation to
+_STATUSES: dict[type, str] = {
+    Invocation.Started: "Started",
+    Invocation.Suspended: "Suspended",
+    Invocation.Continued: "Continued",
+    Invocation.Threw: "Threw",
+    Invocation.Resumed: "Resumed",
+}
+
+
+@dataclass(frozen=True)
+class Row:
+    """The latest status of an invocation."""
+
+    seq: int
+    id: str
+    routine: str
+    queue: str
+    status: str
+
+
+class Activity:
+    """The most recent invocations, indexed by routine, queue, and status.
+
+    Only the most recently updated invocations, up to the capacity, are kept,
+    so that memory is bounded however many invocations are submitted.
+    Events of invocations that aren't kept are ignored.
+    """
+
+    __fields = ("routine", "queue", "status")
+
+    def __init__(self, queue: Callable[[str], str], /, *, capacity: int = 10_000):
+        if capacity <= 0:
+            raise ValueError(f"capacity must be a positive integer, got: {capacity}")
+        self.__queue = queue
+        self.__capacity = capacity
+        self.__rows = OrderedDict[str, Row]()
+        # The ids of the rows with each value of each field
+        self.__index = dict[tuple[str, str], dict[str, None]]()
+        self.__seq = count()
+        self.__lock = Lock()
+        self.__version = 0
+
+    def __len__(self) -> int:
+        return len(self.__rows)
+
+    @property
+    def version(self) -> int:
+        """A number that changes whenever the rows change."""
+        return self.__version
+
+    def __add(self, row: Row):
+        self.__rows[row.id] = row
+        for field in self.__fields:
+            self.__index.setdefault((field, getattr(row, field)), {})[row.id] = None
+
+    def __remove(self, row: Row):
+        del self.__rows[row.id]
+        for field in self.__fields:
+            key = (field, getattr(row, field))
+            ids = self.__index[key]
+            del ids[row.id]
+            if not ids:
+                del self.__index[key]
+
+    def __apply(self, event: Any):
+        if isinstance(event, Invocation.Submitted):
+            if event.id in self.__rows:
+                return
+            self.__add(
+                Row(
+                    next(self.__seq),
+                    event.id,
+                    event.routine,
+                    self.__queue(event.routine),
+                    "Submitted",
+                )
+            )
+            if len(self.__rows) > self.__capacity:
+                self.__remove(next(iter(self.__rows.values())))
+            return
+
+        if (row := self.__rows.get(event.id)) is None:
+            return
+        if isinstance(event, Invocation.Completed):
+            status = "Succeeded" if isinstance(event.result, Ok) else "Errored"
+        elif (status := _STATUSES.get(type(event))) is None:
+            return
+        # Replace the row, so rows that were selected don't change
+        self.__remove(row)
+        self.__add(replace(row, status=status))
+
+    def apply(self, events: Iterable[Any], /):
+        """Apply a batch of invocation events."""
+        with self.__lock:
+            for event in events:
+                self.__apply(event)
+            self.__version += 1
+
+    def select(
+        self,
+        *,
+        routine: str | None = None,
+        queue: str | None = None,
+        status: str | None = None,
+    ) -> list[Row]:
+        """The rows matching all the given values, newest first."""
+        filters = {
+            field: value
+            for field, value in zip(
+                self.__fields, (routine, queue, status), strict=True
+            )
+            if value is not None
+        }
+        with self.__lock:
+            if not filters:
+                rows = list(self.__rows.values())
+            else:
+                # Scan the fewest candidates, and check them against the rest
+                candidates = min(
+                    (self.__index.get(key, {}) for key in filters.items()), key=len
+                )
+                rows = [
+                    row
+                    for row in map(self.__rows.__getitem__, candidates)
+                    if all(getattr(row, k) == v for k, v in filters.items())
+                ]
+        rows.sort(key=lambda row: row.seq, reverse=True)
+        return rows
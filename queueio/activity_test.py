@@ -0,0 +1,73 @@
+from .activity import Activity
+from .invocation import Invocation
+from .queuevar import QueueContext
+from .result import Err
+from .result import Ok
+
+
+def submitted(id: str, routine: str = "noop") -> Invocation.Submitted:
+    return Invocation.Submitted(
+        id=id, routine=routine, args=(), kwargs={}, context=QueueContext({})
+    )
+
+
+def test_activity_tracks_the_status_of_invocations():
+    activity = Activity(lambda routine: f"{routine}-queue")
+
+    activity.apply([submitted("a"), submitted("b"), submitted("c")])
+    activity.apply(
+        [
+            Invocation.Started(id="a"),
+            Invocation.Started(id="b"),
+            Invocation.Suspended(id="b"),
+            Invocation.Completed(id="a", result=Ok(None)),
+            Invocation.Started(id="c"),
+            Invocation.Completed(id="c", result=Err(ValueError())),
+        ]
+    )
+
+    assert [(row.id, row.queue, row.status) for row in activity.select()] == [
+        ("c", "noop-queue", "Errored"),
+        ("b", "noop-queue", "Suspended"),
+        ("a", "noop-queue", "Succeeded"),
+    ]
+
+
+def test_activity_ignores_events_of_unknown_invocations():
+    activity = Activity(lambda routine: "")
+    version = activity.version
+
+    activity.apply([Invocation.Started(id="missing")])
+
+    assert len(activity) == 0
+    assert activity.version != version
+
+
+def test_activity_keeps_the_most_recently_updated_invocations():
+    activity = Activity(lambda routine: "", capacity=3)
+
+    activity.apply([submitted("a"), submitted("b"), submitted("c")])
+    activity.apply([Invocation.Started(id="a"), submitted("d")])
+
+    assert [row.id for row in activity.select()] == ["d", "c", "a"]
+    assert activity.select(status="Submitted") == activity.select()[:2]
+
+
+def test_activity_selects_by_routine_queue_and_status():
+    activity = Activity(lambda routine: "fast" if routine == "add" else "slow")
+
+    activity.apply(
+        [
+            submitted("a", "add"),
+            submitted("b", "add"),
+            submitted("c", "fetch"),
+            Invocation.Started(id="b"),
+            Invocation.Started(id="c"),
+        ]
+    )
+
+    assert [row.id for row in activity.select(routine="add")] == ["b", "a"]
+    assert [row.id for row in activity.select(queue="slow")] == ["c"]
+    assert [row.id for row in activity.select(status="Started")] == ["c", "b"]
+    assert [row.id for row in activity.select(routine="add", status="Started")] == ["b"]
+    assert activity.select(routine="missing") == []
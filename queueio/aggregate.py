@@ -0,0 +1,282 @@
+from collections import OrderedDict
+from collections.abc import Callable
+from collections.abc import Iterable
+from dataclasses import dataclass
+from dataclasses import field
+from math import ceil
+from math import log
+from threading import Lock
+from time import time
+from typing import Any
+
+from .invocation import Invocation
+from .result import Ok
+
+
+class Sketch:
+    """Quantiles of positive values within a relative error, in fixed memory.
+
+    Values are counted in buckets whose bounds grow geometrically, so each
+    quantile is within the relative error of a value that was added.
+    Values outside of the smallest and largest bounds are clamped to them,
+    which bounds the number of buckets.
+    """
+
+    def __init__(self, *, error: float = 0.01, least: float = 1e-6, most: float = 3600):
+        self.__gamma = (1 + error) / (1 - error)
+        self.__log_gamma = log(self.__gamma)
+        self.__least = self.__index(least)
+        self.__most = self.__index(most)
+        self.__buckets = dict[int, int]()
+        self.count = 0
+
+    def __index(self, value: float) -> int:
+        return ceil(log(value) / self.__log_gamma)
+
+    def add(self, value: float, /):
+        if value <= 0:
+            index = self.__least
+        else:
+            index = min(max(self.__index(value), self.__least), self.__most)
+        self.__buckets[index] = self.__buckets.get(index, 0) + 1
+        self.count += 1
+
+    def merge(self, other: Sketch, /):
+        """Add the values of another sketch with the same parameters."""
+        for index, count in other.__buckets.items():
+            self.__buckets[index] = self.__buckets.get(index, 0) + count
+        self.count += other.count
+
+    def quantile(self, q: float, /) -> float | None:
+        """The value at the quantile, or None if there are no values."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.__buckets):
+            seen += self.__buckets[index]
+            if seen > rank:
+                break
+        else:
+            index = max(self.__buckets)
+        # The middle of the bucket, by relative error
+        return 2 * self.__gamma**index / (self.__gamma + 1)
+
+
+@dataclass
+class _Slot:
+    second: int
+    count: int = 0
+    sketch: Sketch | None = None
+
+
+class Window:
+    """Counts and latencies of the last seconds, in one slot per second."""
+
+    def __init__(self, seconds: int = 60):
+        self.__slots = [_Slot(-1) for _ in range(seconds)]
+
+    def __slot(self, second: int) -> _Slot:
+        slot = self.__slots[second % len(self.__slots)]
+        if slot.second != second:
+            slot.second, slot.count, slot.sketch = second, 0, None
+        return slot
+
+    def add(self, now: float, /, latency: float | None = None):
+        slot = self.__slot(int(now))
+        slot.count += 1
+        if latency is not None:
+            if slot.sketch is None:
+                slot.sketch = Sketch()
+            slot.sketch.add(latency)
+
+    def counts(self, now: float, /) -> list[int]:
+        """The count in each second of the window, oldest first."""
+        second = int(now)
+        return [
+            slot.count
+            if (slot := self.__slots[s % len(self.__slots)]).second == s
+            else 0
+            for s in range(second - len(self.__slots) + 1, second + 1)
+        ]
+
+    def sketch(self, now: float, /) -> Sketch:
+        """The latencies added within the window."""
+        sketch = Sketch()
+        oldest = int(now) - len(self.__slots)
+        for slot in self.__slots:
+            if slot.second > oldest and slot.sketch is not None:
+                sketch.merge(slot.sketch)
+        return sketch
+
+
+@dataclass
+class _Stats:
+    """The activity of the invocations of a routine or queue."""
+
+    submitted: Window
+    started: Window
+    completed: Window
+    errored: Window
+    waiting: int = 0
+    running: int = 0
+    suspended: int = 0
+
+
+@dataclass(frozen=True)
+class Summary:
+    """The recent activity of a routine or queue."""
+
+    # Either "routine" or "queue"
+    kind: str
+    name: str
+    # Submissions, completions, and errors per second over the rate window
+    submitted: float
+    rate: float
+    errors: float
+    waiting: int
+    running: int
+    suspended: int
+    # Quantiles of the seconds from submitting to starting,
+    # and from starting to completing
+    wait: dict[float, float | None] = field(repr=False)
+    run: dict[float, float | None] = field(repr=False)
+    # Completions in each second of the window, oldest first
+    history: list[int] = field(repr=False)
+
+
+@dataclass
+class _Tracked:
+    routine: str
+    queue: str
+    submitted: float
+    started: float | None = None
+    state: str = "waiting"
+
+
+class Aggregate:
+    """Rolling rates, counts, and latencies of invocations by routine and queue.
+
+    Memory is bounded by the window and by the capacity of invocations
+    that are tracked between submitting and completing. Invocations submitted
+    before the aggregate started aren't counted.
+    """
+
+    def __init__(
+        self,
+        queue: Callable[[str], str],
+        /,
+        *,
+        seconds: int = 60,
+        rate: int = 10,
+        capacity: int = 100_000,
+        quantiles: tuple[float, ...] = (0.5, 0.9, 0.99),
+    ):
+        if not 0 < rate < seconds:
+            raise ValueError(f"rate must be between 0 and {seconds}, got: {rate}")
+        self.__queue = queue
+        self.__seconds = seconds
+        self.__rate = rate
+        self.__capacity = capacity
+        self.__quantiles = quantiles
+        self.__stats = dict[tuple[str, str], _Stats]()
+        self.__tracked = OrderedDict[str, _Tracked]()
+        self.__lock = Lock()
+
+    def __window(self) -> Window:
+        return Window(self.__seconds)
+
+    def __for(self, tracked: _Tracked) -> list[_Stats]:
+        stats = list[_Stats]()
+        for key in (("routine", tracked.routine), ("queue", tracked.queue)):
+            if (found := self.__stats.get(key)) is None:
+                found = self.__stats[key] = _Stats(
+                    self.__window(), self.__window(), self.__window(), self.__window()
+                )
+            stats.append(found)
+        return stats
+
+    def __move(self, tracked: _Tracked, state: str | None):
+        for stats in self.__for(tracked):
+            setattr(stats, tracked.state, getattr(stats, tracked.state) - 1)
+            if state is not None:
+                setattr(stats, state, getattr(stats, state) + 1)
+        if state is not None:
+            tracked.state = state
+
+    def __apply(self, event: Any, now: float):
+        at = event.timestamp.timestamp()
+        if isinstance(event, Invocation.Submitted):
+            if event.id in self.__tracked:
+                return
+            tracked = self.__tracked[event.id] = _Tracked(
+                event.routine, self.__queue(event.routine), at
+            )
+            for stats in self.__for(tracked):
+                stats.submitted.add(now)
+                stats.waiting += 1
+            if len(self.__tracked) > self.__capacity:
+                _, evicted = self.__tracked.popitem(last=False)
+                self.__move(evicted, None)
+            return
+
+        if (tracked := self.__tracked.get(event.id)) is None:
+            return
+        match event:
+            case Invocation.Started():
+                tracked.started = at
+                for stats in self.__for(tracked):
+                    stats.started.add(now, max(0.0, at - tracked.submitted))
+                self.__move(tracked, "running")
+            case Invocation.Suspended():
+                self.__move(tracked, "suspended")
+            case Invocation.Continued() | Invocation.Threw():
+                self.__move(tracked, "running")
+            case Invocation.Completed():
+                del self.__tracked[event.id]
+                started = (
+                    tracked.submitted if tracked.started is None else tracked.started
+                )
+                for stats in self.__for(tracked):
+                    stats.completed.add(now, max(0.0, at - started))
+                    if not isinstance(event.result, Ok):
+                        stats.errored.add(now)
+                self.__move(tracked, None)
+
+    def apply(self, events: Iterable[Any], /, *, now: float | None = None):
+        """Apply a batch of invocation events, received at now."""
+        now = time() if now is None else now
+        with self.__lock:
+            for event in events:
+                self.__apply(event, now)
+
+    def __per_second(self, window: Window, now: float) -> float:
+        # Exclude the current second, which is still being counted
+        counts = window.counts(now)[-self.__rate - 1 : -1]
+        return sum(counts) / len(counts)
+
+    def summarize(self, *, now: float | None = None) -> list[Summary]:
+        """Summaries of each routine and queue, ordered by kind and name."""
+        now = time() if now is None else now
+        summaries = list[Summary]()
+        with self.__lock:
+            for (kind, name), stats in sorted(self.__stats.items()):
+                history = stats.completed.counts(now)
+                wait = stats.started.sketch(now)
+                run = stats.completed.sketch(now)
+                summaries.append(
+                    Summary(
+                        kind=kind,
+                        name=name,
+                        submitted=self.__per_second(stats.submitted, now),
+                        rate=self.__per_second(stats.completed, now),
+                        errors=self.__per_second(stats.errored, now),
+                        waiting=stats.waiting,
+                        running=stats.running,
+                        suspended=stats.suspended,
+                        wait={q: wait.quantile(q) for q in self.__quantiles},
+                        run={q: run.quantile(q) for q in self.__quantiles},
+                        history=history,
+                    )
+                )
+        return summaries
@@ -0,0 +1,131 @@
+import random
+from datetime import UTC
+from datetime import datetime
+
+import pytest
+
+from .aggregate import Aggregate
+from .aggregate import Sketch
+from .aggregate import Window
+from .invocation import Invocation
+from .queuevar import QueueContext
+from .result import Err
+from .result import Ok
+
+NOW = 1_700_000_000.0
+
+
+def at(seconds: float) -> datetime:
+    return datetime.fromtimestamp(NOW + seconds, tz=UTC)
+
+
+def submitted(id: str, routine: str, seconds: float) -> Invocation.Submitted:
+    return Invocation.Submitted(
+        id=id,
+        routine=routine,
+        args=(),
+        kwargs={},
+        context=QueueContext({}),
+        timestamp=at(seconds),
+    )
+
+
+def test_sketch_quantiles_are_within_the_relative_error():
+    sketch = Sketch(error=0.01)
+    values = [random.lognormvariate(-4, 1.5) for _ in range(10_000)]
+    for value in values:
+        sketch.add(value)
+
+    values.sort()
+    for q in [0.5, 0.9, 0.99]:
+        expected = values[int(q * (len(values) - 1))]
+        assert sketch.quantile(q) == pytest.approx(expected, rel=0.02)
+    assert Sketch().quantile(0.5) is None
+
+
+def test_sketch_merges_other_sketches():
+    first, second = Sketch(), Sketch()
+    for value in range(1, 51):
+        first.add(value)
+        second.add(value + 50)
+
+    first.merge(second)
+
+    assert first.count == 100
+    assert first.quantile(0.5) == pytest.approx(50, rel=0.01)
+
+
+def test_window_forgets_seconds_outside_of_it():
+    window = Window(3)
+
+    window.add(NOW, 0.5)
+    window.add(NOW + 1, 0.25)
+    window.add(NOW + 1)
+    window.add(NOW + 3, 2)
+
+    assert window.counts(NOW + 3) == [2, 0, 1]
+    assert window.sketch(NOW + 3).count == 2
+    assert window.counts(NOW + 10) == [0, 0, 0]
+
+
+def test_aggregate_summarizes_routines_and_queues():
+    aggregate = Aggregate(lambda routine: "work", seconds=10, rate=2)
+
+    aggregate.apply(
+        [
+            submitted("a", "add", 0),
+            submitted("b", "add", 0),
+            submitted("c", "fetch", 0),
+            Invocation.Started(id="a", timestamp=at(0.25)),
+            Invocation.Started(id="b", timestamp=at(0.5)),
+            Invocation.Started(id="c", timestamp=at(0.5)),
+            Invocation.Suspended(id="c", timestamp=at(0.5)),
+        ],
+        now=NOW,
+    )
+    aggregate.apply(
+        [
+            Invocation.Completed(id="a", result=Ok(1), timestamp=at(1.25)),
+            Invocation.Completed(id="b", result=Err(ValueError()), timestamp=at(2.5)),
+            # Events of invocations submitted before the aggregate are ignored
+            Invocation.Started(id="unknown", timestamp=at(1)),
+        ],
+        now=NOW + 1,
+    )
+
+    summaries = {
+        (summary.kind, summary.name): summary
+        for summary in aggregate.summarize(now=NOW + 2)
+    }
+    assert list(summaries) == [
+        ("queue", "work"),
+        ("routine", "add"),
+        ("routine", "fetch"),
+    ]
+    add = summaries["routine", "add"]
+    assert (add.submitted, add.rate, add.errors) == (1.0, 1.0, 0.5)
+    assert (add.waiting, add.running, add.suspended) == (0, 0, 0)
+    assert add.wait[0.5] == pytest.approx(0.25, rel=0.01)
+    assert add.run[0.5] == pytest.approx(1, rel=0.01)
+    assert add.history[-3:] == [0, 2, 0]
+    fetch = summaries["routine", "fetch"]
+    assert (fetch.waiting, fetch.running, fetch.suspended) == (0, 0, 1)
+    work = summaries["queue", "work"]
+    assert (work.submitted, work.rate, work.suspended) == (1.5, 1.0, 1)
+
+
+def test_aggregate_bounds_the_invocations_it_tracks():
+    aggregate = Aggregate(lambda routine: "work", capacity=2)
+
+    aggregate.apply(
+        [
+            submitted("a", "add", 0),
+            submitted("b", "add", 0),
+            submitted("c", "add", 0),
+            Invocation.Started(id="a", timestamp=at(1)),
+        ],
+        now=NOW,
+    )
+
+    (_, add) = aggregate.summarize(now=NOW)
+    assert (add.waiting, add.running) == (2, 0)
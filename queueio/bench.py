@@ -0,0 +1,441 @@
+import json
+import platform
+import resource
+import subprocess
+import sys
+from collections.abc import Callable
+from collections.abc import Iterable
+from concurrent.futures import Future
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from threading import BoundedSemaphore
+from time import perf_counter
+from time import process_time
+
+from .broker import Broker
+from .event import Event
+from .id import random_id
+from .invocation import Invocation
+from .journal import Journal
+from .queue import Queue
+from .queueio import QueueIO
+from .queuespec import QueueSpec
+from .thread import Thread
+
+
+@dataclass(frozen=True)
+class Throughput:
+    """Messages per second through a broker or journal."""
+
+    messages: int
+    enqueue: float
+    receive: float
+
+
+@dataclass(frozen=True)
+class Latency:
+    """Seconds from enqueuing a message to receiving it."""
+
+    messages: int
+    p50: float
+    p95: float
+    p99: float
+
+
+@dataclass(frozen=True)
+class ScenarioResult:
+    """Invocations per second and seconds from submitting to completing."""
+
+    scenario: str
+    invocations: int
+    ops: float
+    latency: Latency
+    # CPU seconds used by this process, including the worker
+    cpu: float
+    # Peak resident set size of this process in bytes
+    rss: int
+    # Lifecycle events published to the journal for each invocation
+    events: float = field(default=0.0)
+
+
+@dataclass(frozen=True)
+class Report:
+    """The results of benchmark scenarios, to compare between runs."""
+
+    backend: str
+    python: str
+    results: list[ScenarioResult]
+
+    @classmethod
+    def load(cls, path: Path, /) -> Report:
+        with path.open() as f:
+            data = json.load(f)
+        return cls(
+            backend=data["backend"],
+            python=data["python"],
+            results=[
+                ScenarioResult(**{**result, "latency": Latency(**result["latency"])})
+                for result in data["results"]
+            ],
+        )
+
+    def dump(self, path: Path, /):
+        with path.open("w") as f:
+            json.dump(asdict(self), f, indent=2)
+            f.write("\n")
+
+    def regressions(self, baseline: Report, /, *, tolerance: float = 0.1) -> list[str]:
+        """Describe the scenarios that got slower than in the baseline.
+
+        A scenario regressed if its throughput dropped, or its p99 latency
+        rose, by more than the tolerance, as a fraction of the baseline.
+        """
+        regressions = list[str]()
+        before = {result.scenario: result for result in baseline.results}
+        for result in self.results:
+            if (previous := before.get(result.scenario)) is None:
+                continue
+            if result.ops < previous.ops * (1 - tolerance):
+                regressions.append(
+                    f"{result.scenario}: {result.ops:.0f} ops/s, "
+                    f"down {1 - result.ops / previous.ops:.0%} "
+                    f"from {previous.ops:.0f} ops/s"
+                )
+            if result.latency.p99 > previous.latency.p99 * (1 + tolerance):
+                regressions.append(
+                    f"{result.scenario}: p99 {result.latency.p99 * 1000:.2f}ms, "
+                    f"up {result.latency.p99 / previous.latency.p99 - 1:.0%} "
+                    f"from {previous.latency.p99 * 1000:.2f}ms"
+                )
+        return regressions
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    """Seconds to import a module in a new interpreter."""
+
+    module: str
+    seconds: float
+    # Seconds spent importing each module itself, excluding its imports
+    modules: dict[str, float]
+
+    def slowest(self, count: int = 10) -> list[tuple[str, float]]:
+        """The modules that took the longest to import themselves."""
+        return sorted(self.modules.items(), key=lambda item: -item[1])[:count]
+
+
+def broker_throughput(
+    broker: Broker,
+    /,
+    *,
+    messages: int = 10_000,
+    concurrency: int = 100,
+    batch: int = 100,
+    queue: str = "queueio-bench",
+) -> Throughput:
+    """Measure the throughput of enqueuing and receiving messages.
+
+    Messages are enqueued in batches, then received and finished by a
+    receiver with the given concurrency. The queue is purged before and
+    after, so it should not be a queue that is in use.
+    """
+    broker.sync([queue])
+    broker.purge(queue=queue)
+    body = b"x" * 64
+
+    started = perf_counter()
+    for start in range(0, messages, batch):
+        count = min(batch, messages - start)
+        broker.enqueue_many([body] * count, queue=queue, priority=4)
+    enqueued = perf_counter() - started
+
+    receiver = broker.receive(QueueSpec(queues=[queue], concurrency=concurrency))
+
+    def receive() -> float:
+        started = perf_counter()
+        for received, message in enumerate(receiver, 1):
+            receiver.finish(message)
+            if received == messages:
+                break
+        return perf_counter() - started
+
+    thread = Thread(target=receive, name="queueio-bench-receiver")
+    thread.start()
+    received = thread.future.result()
+    thread.join()
+    broker.purge(queue=queue)
+
+    return Throughput(
+        messages=messages,
+        enqueue=messages / enqueued,
+        receive=messages / received,
+    )
+
+
+def journal_throughput(
+    journal: Journal,
+    /,
+    *,
+    messages: int = 10_000,
+    publishers: int = 8,
+) -> Throughput:
+    """Measure the throughput of publishing and subscribing to messages.
+
+    Messages are published concurrently by the given number of publishers,
+    which lets journals that group concurrent publishes do so, while a
+    subscriber receives them in batches.
+    """
+    body = b"x" * 64
+    subscription = journal.subscribe_many()
+    received = 0
+    finished = 0.0
+
+    def subscribe():
+        nonlocal received, finished
+        for batch in subscription:
+            received += len(batch)
+            if received >= messages:
+                finished = perf_counter()
+                break
+
+    def publish(count: int):
+        for _ in range(count):
+            journal.publish(body)
+
+    subscriber = Thread(target=subscribe, name="queueio-bench-subscriber")
+    subscriber.start()
+
+    started = perf_counter()
+    threads = [
+        Thread(
+            target=publish,
+            args=(messages // publishers + (i < messages % publishers),),
+            name=f"queueio-bench-publisher-{i}",
+        )
+        for i in range(publishers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    published = perf_counter() - started
+
+    subscriber.join()
+    subscriber.future.result()
+
+    return Throughput(
+        messages=messages,
+        enqueue=messages / published,
+        receive=messages / (finished - started),
+    )
+
+
+def broker_latency(
+    broker: Broker,
+    /,
+    *,
+    messages: int = 1000,
+    queue: str = "queueio-bench-latency",
+) -> Latency:
+    """Measure the latency from enqueuing a message to receiving it.
+
+    Each message is enqueued after the last was received, so the latency
+    doesn't include waiting behind other messages. The queue is purged
+    before and after, so it should not be a queue that is in use.
+    """
+    broker.sync([queue])
+    broker.purge(queue=queue)
+    receiver = broker.receive(QueueSpec(queues=[queue], concurrency=1))
+    received = Queue[float]()
+
+    def receive():
+        for count, message in enumerate(receiver, 1):
+            received.put(perf_counter())
+            receiver.finish(message)
+            if count == messages:
+                break
+
+    thread = Thread(target=receive, name="queueio-bench-receiver")
+    thread.start()
+    latencies = list[float]()
+    for _ in range(messages):
+        started = perf_counter()
+        broker.enqueue(b"x", queue=queue, priority=4)
+        latencies.append(received.get() - started)
+    thread.join()
+    thread.future.result()
+    broker.purge(queue=queue)
+
+    return _latency(latencies)
+
+
+def _latency(latencies: list[float]) -> Latency:
+    latencies = sorted(latencies)
+    return Latency(
+        messages=len(latencies),
+        p50=latencies[len(latencies) * 50 // 100],
+        p95=latencies[len(latencies) * 95 // 100],
+        p99=latencies[len(latencies) * 99 // 100],
+    )
+
+
+def _rss() -> int:
+    """The peak resident set size of this process in bytes."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, and macOS reports bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+# The lifecycle events of invocations that are published to the journal
+_LIFECYCLE = (
+    Invocation.Submitted,
+    Invocation.Started,
+    Invocation.Suspended,
+    Invocation.Continued,
+    Invocation.Threw,
+    Invocation.Resumed,
+    Invocation.Completed,
+)
+
+
+@dataclass(eq=False, kw_only=True)
+class _Measured(Event):
+    """Published after a scenario, to count the events published before it."""
+
+
+def scenarios(
+    queueio: QueueIO,
+    /,
+    names: Iterable[str] | None = None,
+    *,
+    backend: str,
+    invocations: int = 1000,
+    concurrency: int = 10,
+) -> Report:
+    """Run benchmark scenarios of routines with a worker in this process.
+
+    Each scenario submits invocations of a routine, keeping as many in
+    flight as the concurrency of the worker, and measures the time from
+    submitting each invocation to its completion. The worker shuts down
+    the QueueIO when it stops, after the last scenario.
+    """
+    from .scenarios import QUEUE
+    from .scenarios import SCENARIOS
+    from .worker import Worker
+
+    names = list(SCENARIOS) if names is None else list(names)
+    if unknown := [name for name in names if name not in SCENARIOS]:
+        raise ValueError(f"Unknown scenarios: {unknown}")
+
+    queueio.sync([QUEUE])
+    queueio.purge(queue=QUEUE)
+    worker = Worker(queueio, QueueSpec(queues=[QUEUE], concurrency=concurrency))
+    thread = Thread(target=worker, name="queueio-bench-worker")
+    thread.start()
+    try:
+        with queueio.invocation_handler():
+            results = [
+                _scenario(
+                    queueio,
+                    name,
+                    SCENARIOS[name],
+                    invocations=invocations,
+                    concurrency=concurrency,
+                )
+                for name in names
+            ]
+    finally:
+        worker.stop()
+        thread.join()
+    thread.future.result()
+
+    return Report(backend=backend, python=platform.python_version(), results=results)
+
+
+def _scenario(
+    queueio: QueueIO,
+    name: str,
+    create: Callable[[], Invocation],
+    /,
+    *,
+    invocations: int,
+    concurrency: int,
+) -> ScenarioResult:
+    # Warm up the worker before measuring
+    for future in [create().submit() for _ in range(concurrency)]:
+        future.result()
+
+    slots = BoundedSemaphore(concurrency)
+    latencies = [0.0] * invocations
+    futures = list[Future]()
+
+    def complete(index: int, submitted: float) -> Callable[[Future], None]:
+        def on_done(_: Future):
+            latencies[index] = perf_counter() - submitted
+            slots.release()
+
+        return on_done
+
+    events = queueio.subscribe({*_LIFECYCLE, _Measured})
+    cpu = process_time()
+    started = perf_counter()
+    for index in range(invocations):
+        slots.acquire()
+        submitted = perf_counter()
+        future = create().submit()
+        future.add_done_callback(complete(index, submitted))
+        futures.append(future)
+    for future in futures:
+        future.result()
+    elapsed = perf_counter() - started
+    cpu = process_time() - cpu
+
+    # Events are received in the order they're published by this process,
+    # which runs the worker, so the marker is received after the others
+    queueio.publish(_Measured(id=random_id()))
+    published = 0
+    try:
+        while not isinstance(events.get(), _Measured):
+            published += 1
+    finally:
+        queueio.unsubscribe(events)
+
+    return ScenarioResult(
+        scenario=name,
+        invocations=invocations,
+        ops=invocations / elapsed,
+        latency=_latency(latencies),
+        cpu=cpu,
+        rss=_rss(),
+        events=published / invocations,
+    )
+
+
+def import_time(module: str, /) -> ImportTime:
+    """Measure the time to import a module in a new interpreter.
+
+    Each imported module's own time is reported by ``-X importtime``,
+    which includes the modules imported by the interpreter at startup.
+    """
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = dict[str, float]()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        own, _, name = line.removeprefix("import time:").split("|")
+        if own.strip().isdigit():
+            modules[name.strip()] = int(own) / 1_000_000
+    return ImportTime(module=module, seconds=float(result.stdout), modules=modules)
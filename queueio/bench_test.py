@@ -0,0 +1,106 @@
+from .bench import Latency
+from .bench import Report
+from .bench import ScenarioResult
+from .bench import import_time
+from .bench import scenarios
+from .queueio import QueueIO
+from .stub import StubBackend
+
+
+def result(scenario: str, *, ops: float, p99: float) -> ScenarioResult:
+    return ScenarioResult(
+        scenario=scenario,
+        invocations=100,
+        ops=ops,
+        latency=Latency(messages=100, p50=p99 / 2, p95=p99, p99=p99),
+        cpu=1.0,
+        rss=2**20,
+    )
+
+
+def test_import_time_reports_imported_modules():
+    timing = import_time("queueio.queuespec")
+    assert timing.seconds > 0
+    assert "queueio.queuespec" in timing.modules
+    assert timing.slowest(1)[0][1] == max(timing.modules.values())
+
+
+def test_cli_imports_only_what_every_command_needs():
+    """Starting the CLI doesn't import the monitor, worker, or backends.
+
+    Workers are started by the CLI, so this keeps their cold start fast.
+    """
+    timing = import_time("queueio.__main__")
+    for module in ["textual", "queueio.monitor", "queueio.worker", "pika", "psycopg"]:
+        assert module not in timing.modules
+
+
+def test_worker_imports_no_backends_or_monitor():
+    timing = import_time("queueio.worker")
+    for module in ["textual", "queueio.monitor", "pika", "psycopg"]:
+        assert module not in timing.modules
+
+
+def test_scenarios_report_each_scenario():
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = QueueIO(broker=broker, journal=journal)
+        try:
+            report = scenarios(
+                queueio, ["noop", "fanout"], backend="stub", invocations=20
+            )
+        finally:
+            queueio.shutdown()
+
+    assert [result.scenario for result in report.results] == ["noop", "fanout"]
+    # Each noop is submitted, started, and completed
+    assert report.results[0].events == 3
+    for result in report.results:
+        assert result.invocations == 20
+        assert result.ops > 0
+        assert 0 < result.latency.p50 <= result.latency.p99
+        assert result.rss > 0
+
+
+def test_report_round_trip(tmp_path):
+    path = tmp_path / "bench.json"
+    report = Report(
+        backend="stub", python="3.14.0", results=[result("noop", ops=1000, p99=0.01)]
+    )
+
+    report.dump(path)
+
+    assert Report.load(path) == report
+
+
+def test_report_regressions():
+    """Scenarios regress if throughput drops or p99 latency rises too much."""
+    baseline = Report(
+        backend="stub",
+        python="3.14.0",
+        results=[
+            result("noop", ops=1000, p99=0.010),
+            result("chain", ops=100, p99=0.100),
+            result("fanout", ops=100, p99=0.100),
+        ],
+    )
+    report = Report(
+        backend="stub",
+        python="3.14.0",
+        results=[
+            result("noop", ops=950, p99=0.0105),
+            result("chain", ops=80, p99=0.100),
+            result("fanout", ops=100, p99=0.150),
+            result("payload", ops=10, p99=1.0),
+        ],
+    )
+
+    regressions = report.regressions(baseline, tolerance=0.1)
+
+    assert regressions == [
+        "chain: 80 ops/s, down 20% from 100 ops/s",
+        "fanout: p99 150.00ms, up 50% from 100.00ms",
+    ]
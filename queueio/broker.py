@@ -28,6 +28,15 @@ class Broker(ABC):
         """Enqueue a message."""
         raise NotImplementedError("Subclasses must implement this method.")
 
+    def enqueue_many(self, bodies: Iterable[bytes], /, *, queue: str, priority: int):
+        """Enqueue several messages.
+
+        Brokers that can send several messages at once should override this
+        to reduce the per-message overhead.
+        """
+        for body in bodies:
+            self.enqueue(body, queue=queue, priority=priority)
+
     @abstractmethod
     def purge(self, *, queue: str):
         """Purge all messages from the queue."""
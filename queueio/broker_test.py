@@ -128,6 +128,47 @@ class BaseBrokerTest:
         broker.shutdown()
         thread.join(timeout=1.0)  # Clean up thread
 
+    @pytest.mark.timeout(2)
+    def test_adjust_changes_prefetch_capacity(self, broker):
+        """Verify adjusting the receiver changes how many messages it receives."""
+        broker.sync(["test-queue"])
+        broker.purge(queue="test-queue")
+
+        for i in range(4):
+            broker.enqueue(f"msg{i}".encode(), queue="test-queue", priority=4)
+
+        received_messages = []
+        queuespec = QueueSpec(queues=["test-queue"], concurrency=1)
+        receiver = broker.receive(queuespec)
+
+        def receive_messages():
+            for message in receiver:
+                received_messages.append(message)
+
+        thread = threading.Thread(target=receive_messages)
+        thread.start()
+
+        thread.join(timeout=0.1)
+        assert len(received_messages) == 1
+
+        # Raising the capacity receives more messages
+        receiver.adjust(+2)
+        thread.join(timeout=0.1)
+        assert len(received_messages) == 3
+
+        # Lowering the capacity takes effect as messages finish
+        receiver.adjust(-2)
+        receiver.finish(received_messages[0])
+        receiver.finish(received_messages[1])
+        thread.join(timeout=0.1)
+        assert len(received_messages) == 3
+        receiver.finish(received_messages[2])
+        thread.join(timeout=0.1)
+        assert len(received_messages) == 4
+
+        broker.shutdown()
+        thread.join(timeout=1.0)
+
     @pytest.mark.timeout(2)
     def test_complete_message_frees_prefetch_capacity(self, broker):
         """Verify completing messages frees up capacity."""
@@ -393,6 +434,75 @@ class BaseBrokerTest:
         broker.shutdown()
         thread.join(timeout=1.0)  # Clean up thread
 
+    @skip_if_unsupported("supports_multiple_queues")
+    @skip_if_unsupported("supports_weighted_queue_subscriptions")
+    def test_queue_weights_share_receiving(self, broker):
+        """Verify that queue weights give proportional shares of messages."""
+        broker.sync(["critical", "bulk"])
+        broker.purge(queue="critical")
+        broker.purge(queue="bulk")
+
+        for i in range(40):
+            broker.enqueue(f"critical_{i}".encode(), queue="critical", priority=4)
+            broker.enqueue(f"bulk_{i}".encode(), queue="bulk", priority=4)
+
+        selection_order = []
+        queuespec = QueueSpec.parse("critical:3,bulk:1=4")
+
+        def receive_messages():
+            receiver = broker.receive(queuespec)
+            for message in receiver:
+                selection_order.append(message.body.decode().split("_")[0])
+                receiver.finish(message)
+                if len(selection_order) >= 40:
+                    break
+
+        thread = threading.Thread(target=receive_messages)
+        thread.start()
+        thread.join(timeout=2.0)
+
+        assert len(selection_order) == 40
+        critical_ratio = selection_order.count("critical") / len(selection_order)
+        assert 0.65 <= critical_ratio <= 0.85, (
+            f"Expected critical to get ~75% of messages with 3:1 weights, "
+            f"got {critical_ratio:.2%}. Order: {selection_order}"
+        )
+
+        broker.shutdown()
+        thread.join(timeout=1.0)
+
+    @pytest.mark.timeout(2)
+    @skip_if_unsupported("supports_multiple_queues")
+    @skip_if_unsupported("supports_weighted_queue_subscriptions")
+    def test_queue_weights_give_idle_capacity_to_busy_queues(self, broker):
+        """Verify that a busy queue gets the capacity an idle queue leaves."""
+        broker.sync(["critical", "bulk"])
+        broker.purge(queue="critical")
+        broker.purge(queue="bulk")
+
+        for i in range(8):
+            broker.enqueue(f"bulk_{i}".encode(), queue="bulk", priority=4)
+
+        received_messages = []
+
+        def receive_messages():
+            receiver = broker.receive(QueueSpec.parse("critical:3,bulk:1=4"))
+            for message in receiver:
+                received_messages.append(message)
+
+        thread = threading.Thread(target=receive_messages)
+        thread.start()
+        thread.join(timeout=0.5)
+
+        # The empty critical queue leaves its share to bulk,
+        # which gets the whole concurrency
+        assert len(received_messages) == 4
+        assert thread.is_alive()
+
+        broker.shutdown()
+        thread.join(timeout=1.0)
+        assert not thread.is_alive()
+
     @skip_if_unsupported("supports_multiple_queues")
     def test_empty_queue_cycling_fairness(self, broker):
         """Test that empty queues don't cause unfair cycling in round-robin selection.
@@ -0,0 +1,91 @@
+import json
+from collections import OrderedDict
+from collections.abc import Mapping
+from collections.abc import Sequence
+from dataclasses import dataclass
+from hashlib import sha256
+from threading import Lock
+from time import monotonic
+from typing import Any
+
+from .result import Ok
+
+
+@dataclass
+class CacheStats:
+    """Counts of lookups in a cache."""
+
+    hits: int = 0
+    misses: int = 0
+    size: int = 0
+
+    @property
+    def ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class Cache:
+    """An in-process LRU cache of routine results, with an optional TTL.
+
+    Routines that are pure functions of their arguments can use a cache to
+    complete submitted invocations with a known result, without enqueuing.
+    Only successful results are cached. When the cache is full, the least
+    recently used result is evicted, and results expire after the ttl.
+    """
+
+    def __init__(self, maxsize: int = 1024, *, ttl: float | None = None):
+        if maxsize <= 0:
+            raise ValueError(f"maxsize must be positive, got {maxsize}")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.__lock = Lock()
+        self.__results = OrderedDict[str, tuple[float | None, Any]]()
+        self.__hits = 0
+        self.__misses = 0
+
+    @staticmethod
+    def key(routine: str, args: Sequence[Any], kwargs: Mapping[str, Any]) -> str:
+        """A canonical hash of an invocation of a routine.
+
+        Invocations are serialized as JSON, so the key is a hash of the JSON
+        of the arguments, with the keyword arguments sorted. Arguments that
+        were deserialized as a list have the same key as the tuple.
+        """
+        canonical = json.dumps(
+            [routine, args, kwargs], sort_keys=True, separators=(",", ":")
+        )
+        return sha256(canonical.encode()).hexdigest()
+
+    def get(self, key: str, /) -> Ok | None:
+        """Get the cached result for the key, if there is one."""
+        with self.__lock:
+            entry = self.__results.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires is None or monotonic() < expires:
+                    self.__results.move_to_end(key)
+                    self.__hits += 1
+                    return Ok(value)
+                del self.__results[key]
+            self.__misses += 1
+            return None
+
+    def set(self, key: str, value: Any, /):
+        """Cache the result for the key."""
+        expires = None if self.ttl is None else monotonic() + self.ttl
+        with self.__lock:
+            self.__results[key] = (expires, value)
+            self.__results.move_to_end(key)
+            while len(self.__results) > self.maxsize:
+                self.__results.popitem(last=False)
+
+    def clear(self):
+        """Remove all cached results."""
+        with self.__lock:
+            self.__results.clear()
+
+    def stats(self) -> CacheStats:
+        """The hits and misses of lookups, and the number of cached results."""
+        with self.__lock:
+            return CacheStats(self.__hits, self.__misses, len(self.__results))
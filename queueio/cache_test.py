@@ -0,0 +1,70 @@
+import pytest
+
+from . import cache as cache_module
+from .cache import Cache
+from .result import Ok
+
+
+def test_get_missing_key():
+    cache = Cache()
+    assert cache.get("missing") is None
+    assert cache.stats().misses == 1
+
+
+def test_set_and_get():
+    cache = Cache()
+    cache.set("key", 42)
+    assert cache.get("key") == Ok(42)
+    assert cache.stats().hits == 1
+
+
+def test_cached_none_is_a_hit():
+    cache = Cache()
+    cache.set("key", None)
+    assert cache.get("key") == Ok(None)
+
+
+def test_evicts_least_recently_used():
+    cache = Cache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == Ok(1)
+    assert cache.get("c") == Ok(3)
+    assert cache.stats().size == 2
+
+
+def test_results_expire_after_ttl(monkeypatch):
+    now = 100.0
+    monkeypatch.setattr(cache_module, "monotonic", lambda: now)
+    cache = Cache(ttl=10)
+    cache.set("key", 42)
+    now = 109.0
+    assert cache.get("key") == Ok(42)
+    now = 110.0
+    assert cache.get("key") is None
+    assert cache.stats().size == 0
+
+
+def test_stats_ratio():
+    cache = Cache()
+    assert cache.stats().ratio == 0.0
+    cache.set("key", 42)
+    cache.get("key")
+    cache.get("missing")
+    assert cache.stats().ratio == 0.5
+
+
+def test_key_is_canonical():
+    assert Cache.key("r", (1, 2), {"a": 1, "b": 2}) == Cache.key(
+        "r", [1, 2], {"b": 2, "a": 1}
+    )
+    assert Cache.key("r", (1,), {}) != Cache.key("r", (2,), {})
+    assert Cache.key("r", (1,), {}) != Cache.key("s", (1,), {})
+
+
+def test_invalid_maxsize_error():
+    with pytest.raises(ValueError, match="maxsize must be positive"):
+        Cache(maxsize=0)
@@ -0,0 +1,191 @@
+from concurrent.futures import Future
+from contextvars import Context
+from contextvars import copy_context
+from dataclasses import dataclass
+from threading import Lock
+from threading import Timer
+
+from .invocation import Invocation
+
+
+def _chain(source: Future, target: Future):
+    """Complete the target future with the outcome of the source future."""
+
+    def done(source: Future):
+        if target.done():
+            return
+        if (exception := source.exception()) is not None:
+            target.set_exception(exception)
+        else:
+            target.set_result(source.result())
+
+    source.add_done_callback(done)
+
+
+@dataclass(eq=False)
+class _Submission:
+    invocation: Invocation
+    context: Context
+    future: Future
+
+    def submit(self) -> bool:
+        """Submit the invocation, failing the future if it can't be submitted."""
+        try:
+            submitted = self.context.run(self.invocation.submit)
+        except Exception as exception:
+            self.future.set_exception(exception)
+            return False
+        _chain(submitted, self.future)
+        return True
+
+
+@dataclass(eq=False)
+class _Window:
+    timer: Timer
+    future: Future
+    pending: _Submission | None = None
+    # Throttled windows reopen for their interval with a pending submission
+    interval: float | None = None
+
+
+class Coalescer:
+    """Collapse bursts of submissions with the same key into one.
+
+    Each key has at most one open window at a time. Submissions during a
+    window share a future, and only one of them is submitted. Submissions
+    that are deferred to the end of a window are submitted in the context
+    where they were made, so they use its invocation handler.
+    If a submission fails, its future fails with the exception,
+    and its window ends so that the next submission is made.
+    """
+
+    def __init__(self):
+        self.__lock = Lock()
+        self.__windows = dict[str, _Window]()
+
+    def __open(
+        self,
+        key: str,
+        seconds: float,
+        future: Future,
+        *,
+        pending: _Submission | None = None,
+        interval: float | None = None,
+    ):
+        timer = Timer(seconds, lambda: self.__close(key, timer))
+        timer.daemon = True
+        self.__windows[key] = _Window(
+            timer=timer, future=future, pending=pending, interval=interval
+        )
+        timer.start()
+
+    def __extend(self, key: str, window: _Window, seconds: float):
+        window.timer.cancel()
+        timer = Timer(seconds, lambda: self.__close(key, timer))
+        timer.daemon = True
+        window.timer = timer
+        timer.start()
+
+    def __close(self, key: str, timer: Timer):
+        with self.__lock:
+            window = self.__windows.get(key)
+            # A cancelled timer may already be waiting for the lock
+            if window is None or window.timer is not timer:
+                return
+            pending = self.__end(key, window)
+        if pending is not None:
+            self.__submit(key, pending)
+
+    def __end(self, key: str, window: _Window) -> _Submission | None:
+        window.timer.cancel()
+        del self.__windows[key]
+        pending = window.pending
+        if pending is not None and window.interval is not None:
+            # Throttled submissions at the end of a window open the next
+            self.__open(key, window.interval, pending.future, interval=window.interval)
+        return pending
+
+    def __submit(self, key: str, submission: _Submission):
+        if submission.submit():
+            return
+        with self.__lock:
+            window = self.__windows.get(key)
+            # End the window early, so later submissions don't share the failure
+            if window is None or window.future is not submission.future:
+                return
+            pending = self.__end(key, window)
+        if pending is not None:
+            self.__submit(key, pending)
+
+    def debounce(
+        self,
+        key: str,
+        window: float,
+        invocation: Invocation,
+        /,
+        *,
+        leading: bool = False,
+    ) -> Future:
+        """Submit once for a burst of submissions with no gap of the window.
+
+        Trailing debounces submit the last invocation of the burst when the
+        window passes without another. Leading debounces submit the first
+        invocation of the burst immediately, and ignore the rest.
+        """
+        if window <= 0:
+            raise ValueError(f"window must be positive, got {window}")
+        submission = _Submission(invocation, copy_context(), Future())
+        with self.__lock:
+            current = self.__windows.get(key)
+            if current is not None:
+                self.__extend(key, current, window)
+                if not leading:
+                    assert current.pending is not None
+                    current.pending.invocation = invocation
+                    current.pending.context = submission.context
+                return current.future
+
+            if not leading:
+                self.__open(key, window, submission.future, pending=submission)
+                return submission.future
+            self.__open(key, window, submission.future)
+
+        self.__submit(key, submission)
+        return submission.future
+
+    def throttle(
+        self,
+        key: str,
+        rate: float,
+        invocation: Invocation,
+        /,
+        *,
+        trailing: bool = True,
+    ) -> Future:
+        """Submit at most rate times per second.
+
+        The first invocation is submitted immediately, and opens a window
+        of one over the rate seconds. Trailing throttles submit the last
+        invocation made during the window when it ends, which opens
+        the next window. Otherwise those invocations are ignored.
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        interval = 1 / rate
+        submission = _Submission(invocation, copy_context(), Future())
+        with self.__lock:
+            current = self.__windows.get(key)
+            if current is not None:
+                if not trailing:
+                    return current.future
+                if current.pending is None:
+                    current.pending = submission
+                else:
+                    current.pending.invocation = invocation
+                    current.pending.context = submission.context
+                return current.pending.future
+
+            self.__open(key, interval, submission.future, interval=interval)
+
+        self.__submit(key, submission)
+        return submission.future
@@ -0,0 +1,136 @@
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from .coalesce import Coalescer
+from .invocation import Invocation
+
+
+@pytest.fixture
+def submitted():
+    """Record submitted invocations, completing them with their first arg."""
+    submitted = list[Invocation]()
+
+    def handler(invocation: Invocation, /) -> Future:
+        submitted.append(invocation)
+        future = Future()
+        future.set_result(invocation.args[0])
+        return future
+
+    with Invocation.handler(handler):
+        yield submitted
+
+
+def invocation(value: int) -> Invocation:
+    return Invocation(routine="test", args=(value,), kwargs={})
+
+
+def test_trailing_debounce_submits_last(submitted):
+    coalescer = Coalescer()
+    futures = [coalescer.debounce("key", 0.05, invocation(i)) for i in range(5)]
+    assert submitted == []
+    assert futures[4].result(timeout=1) == 4
+    assert all(future is futures[0] for future in futures)
+    assert [invocation.args for invocation in submitted] == [(4,)]
+
+
+def test_leading_debounce_submits_first(submitted):
+    coalescer = Coalescer()
+    futures = [
+        coalescer.debounce("key", 0.05, invocation(i), leading=True) for i in range(5)
+    ]
+    assert [invocation.args for invocation in submitted] == [(0,)]
+    assert futures[4].result(timeout=1) == 0
+    time.sleep(0.1)  # Let the window close
+
+
+def test_debounce_keys_are_independent(submitted):
+    coalescer = Coalescer()
+    first = coalescer.debounce("a", 0.05, invocation(1))
+    second = coalescer.debounce("b", 0.05, invocation(2))
+    assert first.result(timeout=1) == 1
+    assert second.result(timeout=1) == 2
+
+
+def test_debounce_reopens_after_window(submitted):
+    coalescer = Coalescer()
+    coalescer.debounce("key", 0.05, invocation(1)).result(timeout=1)
+    assert coalescer.debounce("key", 0.05, invocation(2)).result(timeout=1) == 2
+    assert len(submitted) == 2
+
+
+def test_throttle_submits_leading_and_trailing(submitted):
+    coalescer = Coalescer()
+    leading = coalescer.throttle("key", 20, invocation(0))
+    assert leading.result(timeout=1) == 0
+    trailing = [coalescer.throttle("key", 20, invocation(i)) for i in range(1, 5)]
+    assert all(future is trailing[0] for future in trailing)
+    assert trailing[0].result(timeout=1) == 4
+    assert [invocation.args for invocation in submitted] == [(0,), (4,)]
+    time.sleep(0.1)  # Let the next window close
+
+
+def test_throttle_without_trailing_drops(submitted):
+    coalescer = Coalescer()
+    futures = [
+        coalescer.throttle("key", 20, invocation(i), trailing=False) for i in range(5)
+    ]
+    time.sleep(0.1)
+    assert all(future.result(timeout=1) == 0 for future in futures)
+    assert [invocation.args for invocation in submitted] == [(0,)]
+
+
+@pytest.fixture
+def failing():
+    """Fail to submit invocations with an odd first arg."""
+    submitted = list[Invocation]()
+
+    def handler(invocation: Invocation, /) -> Future:
+        submitted.append(invocation)
+        if invocation.args[0] % 2:
+            raise RuntimeError(f"failed {invocation.args[0]}")
+        future = Future()
+        future.set_result(invocation.args[0])
+        return future
+
+    with Invocation.handler(handler):
+        yield submitted
+
+
+def test_failing_leading_submit_fails_and_ends_window(failing):
+    coalescer = Coalescer()
+    debounced = coalescer.debounce("key", 0.5, invocation(1), leading=True)
+    throttled = coalescer.throttle("other", 2, invocation(1))
+    with pytest.raises(RuntimeError, match="failed 1"):
+        debounced.result(timeout=1)
+    with pytest.raises(RuntimeError, match="failed 1"):
+        throttled.result(timeout=1)
+
+    # The windows ended, so the next submissions aren't joined to the failures
+    assert coalescer.debounce("key", 0.5, invocation(2), leading=True).result() == 2
+    assert coalescer.throttle("other", 2, invocation(2)).result() == 2
+    assert len(failing) == 4
+    time.sleep(0.6)  # Let the windows close
+
+
+def test_failing_trailing_submit_fails_future(failing):
+    coalescer = Coalescer()
+    debounced = coalescer.debounce("key", 0.05, invocation(1))
+    coalescer.throttle("other", 20, invocation(0))
+    throttled = coalescer.throttle("other", 20, invocation(3))
+    with pytest.raises(RuntimeError, match="failed 1"):
+        debounced.result(timeout=1)
+    with pytest.raises(RuntimeError, match="failed 3"):
+        throttled.result(timeout=1)
+
+    assert coalescer.throttle("other", 20, invocation(4)).result(timeout=1) == 4
+    time.sleep(0.1)  # Let the window close
+
+
+def test_invalid_window_and_rate_errors():
+    coalescer = Coalescer()
+    with pytest.raises(ValueError, match="window must be positive"):
+        coalescer.debounce("key", 0, invocation(1))
+    with pytest.raises(ValueError, match="rate must be positive"):
+        coalescer.throttle("key", 0, invocation(1))
@@ -0,0 +1,106 @@
+import os
+import sys
+from dataclasses import dataclass
+
+from .event import Event
+
+
+def parallelism() -> int:
+    """The number of CPUs that this process can keep busy at once.
+
+    With the GIL enabled, Python code only runs on one CPU at a time.
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)
+    return 1 if is_gil_enabled() else os.process_cpu_count() or 1
+
+
+@dataclass(frozen=True)
+class Sample:
+    """Measurements of a worker over one control interval.
+
+    The throughput is tasks completed per second, and the latency is
+    the mean seconds that each of those tasks took to run. The cpu is
+    the fraction of the CPU that the process could use that it did use,
+    and saturated is whether every active runner was busy at once.
+    """
+
+    throughput: float
+    latency: float
+    cpu: float
+    saturated: bool
+
+
+class ConcurrencyController:
+    """Adapt a concurrency limit with additive increase, multiplicative decrease.
+
+    The limit starts at the minimum. It increases by one each interval that
+    every active runner was busy, and decreases by the backoff factor when
+    the CPU is saturated, or when latency grows by more than the tolerance
+    without any gain in throughput.
+    """
+
+    def __init__(
+        self,
+        minimum: int,
+        maximum: int,
+        *,
+        cpu_target: float = 0.9,
+        latency_tolerance: float = 1.5,
+        backoff: float = 0.75,
+    ):
+        if minimum <= 0 or maximum < minimum:
+            raise ValueError(
+                f"Expected 0 < minimum <= maximum, got {minimum} and {maximum}"
+            )
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = minimum
+        self.__cpu_target = cpu_target
+        self.__latency_tolerance = latency_tolerance
+        self.__backoff = backoff
+        self.__previous: Sample | None = None
+
+    def update(self, sample: Sample) -> str | None:
+        """Update the limit from a sample, returning the reason if it changed."""
+        previous, self.__previous = self.__previous, sample
+
+        if sample.cpu > self.__cpu_target:
+            return self.__decrease("cpu")
+        if (
+            previous is not None
+            and previous.latency > 0
+            and sample.latency > previous.latency * self.__latency_tolerance
+            and sample.throughput <= previous.throughput
+        ):
+            return self.__decrease("latency")
+        if sample.saturated:
+            return self.__increase("saturated")
+        return None
+
+    def __increase(self, reason: str) -> str | None:
+        if self.limit >= self.maximum:
+            return None
+        self.limit += 1
+        return reason
+
+    def __decrease(self, reason: str) -> str | None:
+        limit = max(self.minimum, min(self.limit - 1, int(self.limit * self.__backoff)))
+        if limit == self.limit:
+            return None
+        self.limit = limit
+        return reason
+
+    @dataclass(eq=False, kw_only=True)
+    class Adjusted(Event):
+        """A worker adjusted its concurrency.
+
+        The id is of the worker. The reason is what prompted the adjustment,
+        and the remaining fields are the sample that the decision was based on.
+        """
+
+        previous: int
+        limit: int
+        reason: str
+        throughput: float
+        latency: float
+        cpu: float
@@ -0,0 +1,82 @@
+import pytest
+
+from .concurrency import ConcurrencyController
+from .concurrency import Sample
+
+
+def sample(
+    *,
+    throughput: float = 10.0,
+    latency: float = 0.1,
+    cpu: float = 0.5,
+    saturated: bool = False,
+) -> Sample:
+    return Sample(throughput=throughput, latency=latency, cpu=cpu, saturated=saturated)
+
+
+def test_starts_at_minimum():
+    assert ConcurrencyController(4, 64).limit == 4
+
+
+def test_invalid_bounds_error():
+    with pytest.raises(ValueError):
+        ConcurrencyController(0, 4)
+    with pytest.raises(ValueError):
+        ConcurrencyController(8, 4)
+
+
+def test_saturated_increases_additively():
+    controller = ConcurrencyController(4, 64)
+    assert controller.update(sample(saturated=True)) == "saturated"
+    assert controller.limit == 5
+    assert controller.update(sample(saturated=True)) == "saturated"
+    assert controller.limit == 6
+
+
+def test_increase_stops_at_maximum():
+    controller = ConcurrencyController(1, 2)
+    controller.update(sample(saturated=True))
+    assert controller.update(sample(saturated=True)) is None
+    assert controller.limit == 2
+
+
+def test_idle_holds():
+    controller = ConcurrencyController(4, 64)
+    assert controller.update(sample()) is None
+    assert controller.limit == 4
+
+
+def test_cpu_saturation_decreases_multiplicatively():
+    controller = ConcurrencyController(1, 64)
+    for _ in range(15):
+        controller.update(sample(saturated=True))
+    assert controller.limit == 16
+    assert controller.update(sample(cpu=0.95, saturated=True)) == "cpu"
+    assert controller.limit == 12
+
+
+def test_decrease_stops_at_minimum():
+    controller = ConcurrencyController(4, 64)
+    controller.update(sample(saturated=True))
+    assert controller.update(sample(cpu=1.0)) == "cpu"
+    assert controller.limit == 4
+    assert controller.update(sample(cpu=1.0)) is None
+
+
+def test_latency_growth_without_throughput_decreases():
+    controller = ConcurrencyController(1, 64)
+    for _ in range(7):
+        controller.update(sample(saturated=True))
+    assert controller.limit == 8
+    assert controller.update(sample(latency=0.2, saturated=True)) == "latency"
+    assert controller.limit == 6
+
+
+def test_latency_growth_with_throughput_increases():
+    controller = ConcurrencyController(1, 64)
+    controller.update(sample(saturated=True))
+    assert (
+        controller.update(sample(throughput=20.0, latency=0.2, saturated=True))
+        == "saturated"
+    )
+    assert controller.limit == 3
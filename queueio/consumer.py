@@ -1,17 +1,52 @@
+import sys
 from collections.abc import Callable
+from collections.abc import Coroutine
 from collections.abc import Generator
 from collections.abc import Iterable
 from collections.abc import Iterator
 from contextvars import Context
+from dataclasses import dataclass
+from threading import Lock
+from types import CoroutineType
+from types import GeneratorType
 from typing import Any
 
+from .event import Event
 from .invocation import Invocation
 from .message import Message
+from .metrics import ConsumerMetrics
+from .pause import Pause
+from .profiler import Profiler
 from .receiver import Receiver
 from .result import Err
 from .result import Ok
+from .results import ResultStore
+from .routine import Verbosity
 from .stream import Stream
 from .suspension import Suspension
+from .tracing import Tracer
+
+
+def _retained_size(
+    message: Message, generator: Generator | Coroutine, context: Context
+) -> int:
+    """Approximate the bytes retained by a suspended invocation.
+
+    This counts the message, the context, and the shallow sizes of the
+    generator or coroutine and of the local variables of each frame it
+    is suspended in, following what it awaits.
+    """
+    size = len(message.body) + sys.getsizeof(generator) + sys.getsizeof(context)
+    awaiting: object = generator
+    while True:
+        if isinstance(awaiting, CoroutineType):
+            frame, awaiting = awaiting.cr_frame, awaiting.cr_await
+        elif isinstance(awaiting, GeneratorType):
+            frame, awaiting = awaiting.gi_frame, awaiting.gi_yieldfrom
+        else:
+            return size
+        if frame is not None:
+            size += sum(sys.getsizeof(value) for value in frame.f_locals.values())
 
 
 class Consumer(Iterable[Invocation]):
@@ -21,32 +56,114 @@ class Consumer(Iterable[Invocation]):
         stream: Stream,
         receiver: Receiver,
         deserialize: Callable[[bytes], Invocation],
+        max_suspended: int | None = None,
+        results: ResultStore | None = None,
+        metrics: ConsumerMetrics | None = None,
+        tracer: Tracer | None = None,
+        profiler: Profiler | None = None,
+        verbosity: Callable[[str], Verbosity] | None = None,
     ):
         self.__stream = stream
+        self.__results = results
+        self.__metrics = metrics
+        self.__tracer = tracer
+        self.__profiler = profiler
+        self.__verbosity = verbosity
         self.__receiver = receiver
         self.__deserialize = deserialize
+        self.__max_suspended = max_suspended
         self.__invocations = dict[Invocation, Message]()
+        self.__suspended_lock = Lock()
+        self.__suspended = dict[Invocation, int]()
+        self.__paused = set[Invocation]()
 
     def __iter__(self) -> Iterator[Invocation]:
         for message in self.__receiver:
             invocation = self.__deserialize(message.body)
             self.__invocations[invocation] = message
+            if self.__metrics is not None:
+                self.__metrics.received(invocation)
             yield invocation
 
-    def start(self, invocation: Invocation):
-        """Signal that the invocation is starting."""
-        self.__stream.publish(Invocation.Started(id=invocation.id))
+    def __contains__(self, invocation: object) -> bool:
+        """Whether the invocation was received and has not yet completed."""
+        return invocation in self.__invocations
+
+    def __suspensions(self, invocation: Invocation) -> Consumer.Suspensions:
+        return Consumer.Suspensions(
+            id=invocation.id,
+            count=len(self.__suspended),
+            paused=len(self.__paused),
+            retained=sum(self.__suspended.values()),
+        )
+
+    def __continue(self, invocation: Invocation):
+        """Stop accounting for a suspended invocation that is continuing."""
+        with self.__suspended_lock:
+            del self.__suspended[invocation]
+            paused = invocation in self.__paused
+            self.__paused.discard(invocation)
+            suspensions = self.__suspensions(invocation)
+        self.__stream.publish_local(suspensions)
+        if self.__metrics is not None:
+            self.__metrics.continued(invocation, paused=paused)
+        if self.__tracer is not None:
+            self.__tracer.continued(invocation)
+        if paused:
+            self.__receiver.unpause(self.__invocations[invocation])
+
+    def __lifecycle(self, invocation: Invocation) -> bool:
+        """Whether to publish the events between starting and completing."""
+        return (
+            self.__verbosity is None
+            or self.__verbosity(invocation.routine) is Verbosity.FULL
+        )
+
+    def start(self, invocation: Invocation, *, waited: float | None = None):
+        """Signal that the invocation is starting.
+
+        waited is how long it waited for a runner after it was received.
+        """
+        if self.__metrics is not None:
+            self.__metrics.started(invocation, waited=waited)
+        if self.__tracer is not None:
+            self.__tracer.started(invocation)
+        if self.__profiler is not None:
+            self.__profiler.started(invocation)
+        if self.__lifecycle(invocation):
+            self.__stream.publish(Invocation.Started(id=invocation.id))
 
     def suspend(
         self,
         invocation: Invocation,
-        generator: Generator,
+        generator: Generator | Coroutine,
         suspension: Suspension | None,
         context: Context,
     ):
-        """Signal that the invocation has suspended."""
+        """Signal that the invocation has suspended.
+
+        Suspended invocations release their capacity to receive more
+        invocations. Those suspended on a pause hold their capacity instead
+        when there are already max_suspended invocations that have released
+        theirs, which throttles receiving. Invocations awaiting others always
+        release their capacity, because holding it could deadlock a worker
+        that needs to receive the invocations they await.
+        """
+        message = self.__invocations[invocation]
+        with self.__suspended_lock:
+            self.__suspended[invocation] = _retained_size(message, generator, context)
+            pause = (
+                self.__max_suspended is None
+                or not isinstance(suspension, Pause)
+                or len(self.__paused) < self.__max_suspended
+            )
+            if pause:
+                self.__paused.add(invocation)
+            suspensions = self.__suspensions(invocation)
+
         if suspension:
-            self.__stream.publish(Invocation.Suspended(id=invocation.id))
+            if self.__lifecycle(invocation):
+                self.__stream.publish(Invocation.Suspended(id=invocation.id))
             self.__stream.publish_local(
                 Invocation.LocalSuspended(
                     id=invocation.id,
@@ -56,40 +173,104 @@ class Consumer(Iterable[Invocation]):
                     context=context,
                 )
             )
-        self.__receiver.pause(self.__invocations[invocation])
+        self.__stream.publish_local(suspensions)
+        if self.__metrics is not None:
+            self.__metrics.suspended(invocation, paused=pause)
+        if self.__tracer is not None:
+            self.__tracer.suspended(invocation)
+        if self.__profiler is not None:
+            self.__profiler.stopped(invocation)
+        if pause:
+            self.__receiver.pause(message)
 
-    def resolve(self, invocation: Invocation, generator: Generator, value: Any):
+    def resolve(
+        self, invocation: Invocation, generator: Generator | Coroutine, value: Any
+    ):
         """Signal that a suspension has resolved to a value."""
-        self.__stream.publish(Invocation.Continued(id=invocation.id, value=value))
+        if self.__lifecycle(invocation):
+            self.__stream.publish(Invocation.Continued(id=invocation.id, value=value))
         self.__stream.publish_local(
             Invocation.LocalContinued(
                 id=invocation.id, generator=generator, value=value
             )
         )
-        self.__receiver.unpause(self.__invocations[invocation])
+        self.__continue(invocation)
 
-    def throw(self, invocation: Invocation, generator: Generator, exception: Exception):
+    def throw(
+        self,
+        invocation: Invocation,
+        generator: Generator | Coroutine,
+        exception: Exception,
+    ):
         """Signal that a suspension has thrown an exception."""
-        self.__stream.publish(Invocation.Threw(id=invocation.id, exception=exception))
+        if self.__lifecycle(invocation):
+            self.__stream.publish(
+                Invocation.Threw(id=invocation.id, exception=exception)
+            )
         self.__stream.publish_local(
             Invocation.LocalThrew(
                 id=invocation.id, generator=generator, exception=exception
             )
         )
-        self.__receiver.unpause(self.__invocations[invocation])
+        self.__continue(invocation)
 
-    def resume(self, invocation: Invocation):
-        """Signal that the invocation is resuming."""
-        self.__stream.publish(Invocation.Resumed(id=invocation.id))
+    def adjust(self, change: int, /):
+        """Adjust the capacity to receive invocations."""
+        self.__receiver.adjust(change)
+        if self.__metrics is not None:
+            self.__metrics.adjusted(change)
+
+    def resume(self, invocation: Invocation, *, waited: float | None = None):
+        """Signal that the invocation is resuming.
+
+        waited is how long it waited for a runner after it was continued.
+        """
+        if self.__metrics is not None:
+            self.__metrics.resumed(invocation, waited=waited)
+        if self.__tracer is not None:
+            self.__tracer.resumed(invocation)
+        if self.__profiler is not None:
+            self.__profiler.started(invocation)
+        if self.__lifecycle(invocation):
+            self.__stream.publish(Invocation.Resumed(id=invocation.id))
 
     def succeed(self, invocation: Invocation, value: Any):
         """Signal that the invocation has succeeded."""
+        if self.__results is not None:
+            self.__results.put(invocation.id, Ok(value))
         self.__stream.publish(Invocation.Completed(id=invocation.id, result=Ok(value)))
+        if self.__metrics is not None:
+            self.__metrics.completed(invocation, ok=True)
+        if self.__tracer is not None:
+            self.__tracer.completed(invocation, ok=True)
+        if self.__profiler is not None:
+            self.__profiler.stopped(invocation)
         self.__receiver.finish(self.__invocations.pop(invocation))
 
     def error(self, invocation: Invocation, exception: Exception):
         """Signal that the invocation has errored."""
+        if self.__results is not None:
+            self.__results.put(invocation.id, Err(exception))
         self.__stream.publish(
             Invocation.Completed(id=invocation.id, result=Err(exception))
         )
+        if self.__metrics is not None:
+            self.__metrics.completed(invocation, ok=False)
+        if self.__tracer is not None:
+            self.__tracer.completed(invocation, ok=False)
+        if self.__profiler is not None:
+            self.__profiler.stopped(invocation)
         self.__receiver.finish(self.__invocations.pop(invocation))
+
+    @dataclass(eq=False, kw_only=True)
+    class Suspensions(Event):
+        """The invocations suspended by this consumer changed.
+
+        The id is of the invocation that suspended or continued.
+        Paused invocations are those that released their capacity,
+        and retained is the approximate bytes held by all of them.
+        """
+
+        count: int
+        paused: int
+        retained: int
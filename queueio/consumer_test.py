@@ -0,0 +1,213 @@
+from contextlib import suppress
+from contextvars import copy_context
+
+from .consumer import Consumer
+from .invocation import Invocation
+from .pause import pause
+from .queueio import QueueIO
+from .queuespec import QueueSpec
+from .stub import StubBackend
+from .thread import Thread
+
+
+def suspended():
+    """A generator suspended on a pause."""
+
+    async def routine():
+        await pause(0)
+
+    generator = routine().__await__()
+    return generator, generator.send(None)
+
+
+def test_max_suspended_throttles_receiving():
+    """Suspensions beyond the maximum hold their capacity."""
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = QueueIO(broker=broker, journal=journal)
+        try:
+            queueio.sync(["test"])
+            for _ in range(3):
+                broker.enqueue(
+                    Invocation(routine="test", args=(), kwargs={}).serialize(),
+                    queue="test",
+                    priority=4,
+                )
+            events = queueio.subscribe({Consumer.Suspensions})
+            consumer = queueio.consume(
+                QueueSpec(queues=["test"], concurrency=1), max_suspended=1
+            )
+            received = iter(consumer)
+
+            first = next(received)
+            first_generator, first_suspension = suspended()
+            consumer.suspend(first, first_generator, first_suspension, copy_context())
+            event = events.get()
+            assert (event.id, event.count, event.paused) == (first.id, 1, 1)
+            assert event.retained > 0
+
+            # The paused first invocation released its capacity
+            second = next(received)
+            second_generator, second_suspension = suspended()
+            consumer.suspend(
+                second, second_generator, second_suspension, copy_context()
+            )
+            event = events.get()
+            assert (event.id, event.count, event.paused) == (second.id, 2, 1)
+
+            # The second invocation holds its capacity while suspended
+            third = Thread(target=next, args=(received,))
+            third.start()
+            third.join(timeout=0.1)
+            assert third.is_alive()
+
+            consumer.resolve(first, first_generator, None)
+            event = events.get()
+            assert (event.id, event.count, event.paused) == (first.id, 1, 0)
+            consumer.resolve(second, second_generator, None)
+            event = events.get()
+            assert (event.id, event.count, event.paused) == (second.id, 0, 0)
+
+            # Finishing both invocations makes room for the third
+            consumer.succeed(second, None)
+            consumer.succeed(first, None)
+            third.join(timeout=1)
+            assert not third.is_alive()
+        finally:
+            queueio.shutdown()
+
+
+def test_invocations_awaiting_others_release_their_capacity():
+    """Awaiting invocations aren't held, which could deadlock the worker."""
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = QueueIO(broker=broker, journal=journal)
+        try:
+            queueio.sync(["test"])
+            for _ in range(2):
+                broker.enqueue(
+                    Invocation(routine="test", args=(), kwargs={}).serialize(),
+                    queue="test",
+                    priority=4,
+                )
+            consumer = queueio.consume(
+                QueueSpec(queues=["test"], concurrency=1), max_suspended=0
+            )
+            received = iter(consumer)
+
+            parent = next(received)
+            child = Invocation(routine="test", args=(), kwargs={})
+            consumer.suspend(parent, suspended()[0], child, copy_context())
+
+            # The parent released its capacity, so the next is received
+            second = Thread(target=next, args=(received,))
+            second.start()
+            second.join(timeout=1)
+            assert not second.is_alive()
+        finally:
+            queueio.shutdown()
+
+
+def test_retained_counts_the_locals_of_suspended_coroutines():
+    """The locals of a coroutine, and of those it awaits, are retained."""
+
+    async def awaited(size: int):
+        data = bytes(size)
+        await pause(0)
+        return data
+
+    async def routine(size: int):
+        return await awaited(size)
+
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = QueueIO(broker=broker, journal=journal)
+        try:
+            queueio.sync(["test"])
+            for _ in range(2):
+                broker.enqueue(
+                    Invocation(routine="test", args=(), kwargs={}).serialize(),
+                    queue="test",
+                    priority=4,
+                )
+            events = queueio.subscribe({Consumer.Suspensions})
+            consumer = queueio.consume(QueueSpec(queues=["test"], concurrency=2))
+            received = iter(consumer)
+
+            retained = list[int]()
+            for size in [0, 1_000_000]:
+                invocation = next(received)
+                coroutine = routine(size)
+                suspension = coroutine.send(None)
+                consumer.suspend(invocation, coroutine, suspension, copy_context())
+                retained.append(events.get().retained)
+                consumer.resolve(invocation, coroutine, None)
+                events.get()
+                with suppress(StopIteration):
+                    coroutine.send(None)
+                consumer.succeed(invocation, None)
+
+            assert retained[0] < 1_000_000 < retained[1]
+        finally:
+            queueio.shutdown()
+
+
+def test_consumer_publishes_only_completions_when_quiet():
+    """Lifecycle events are skipped, but awaiters still see completions."""
+    from .registry import ROUTINE_REGISTRY
+    from .routine import Routine
+    from .routine import Verbosity
+
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = QueueIO(
+            broker=broker, journal=journal, events={"test": Verbosity.COMPLETIONS}
+        )
+        original_registry = dict(ROUTINE_REGISTRY)
+        ROUTINE_REGISTRY["test"] = Routine(lambda: None, name="test", queue="test")
+        try:
+            queueio.sync(["test"])
+            events = queueio.subscribe(
+                {
+                    Invocation.Started,
+                    Invocation.Suspended,
+                    Invocation.Continued,
+                    Invocation.Resumed,
+                    Invocation.Completed,
+                }
+            )
+            broker.enqueue(
+                Invocation(routine="test", args=(), kwargs={}).serialize(),
+                queue="test",
+                priority=4,
+            )
+            consumer = queueio.consume(QueueSpec(queues=["test"], concurrency=1))
+            invocation = next(iter(consumer))
+
+            consumer.start(invocation)
+            generator, suspension = suspended()
+            consumer.suspend(invocation, generator, suspension, copy_context())
+            consumer.resolve(invocation, generator, None)
+            consumer.resume(invocation)
+            consumer.succeed(invocation, None)
+
+            # Events are received in the order they're published
+            event = events.get()
+            assert isinstance(event, Invocation.Completed)
+            assert event.id == invocation.id
+        finally:
+            queueio.shutdown()
+            ROUTINE_REGISTRY.clear()
+            ROUTINE_REGISTRY.update(original_registry)
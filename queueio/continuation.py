@@ -1,4 +1,5 @@
 from collections.abc import Callable
+from collections.abc import Coroutine
 from collections.abc import Generator
 from contextvars import Context
 from dataclasses import dataclass
@@ -16,7 +17,7 @@ from .result import Result
 class Continuation[T: Callable[..., Any] = Callable[..., Any]]:
     id: str = field(default_factory=random_id)
     invocation: Invocation
-    generator: Generator[Invocation, Any, Any]
+    generator: Generator[Invocation, Any, Any] | Coroutine[Invocation, Any, Any]
     result: Result[Any, BaseException]
     context: Context
 
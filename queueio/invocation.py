@@ -1,5 +1,6 @@
 import json
 from collections.abc import Callable
+from collections.abc import Coroutine
 from collections.abc import Generator
 from concurrent.futures import Future
 from contextlib import contextmanager
@@ -7,6 +8,7 @@ from contextvars import Context
 from contextvars import ContextVar
 from dataclasses import dataclass
 from dataclasses import field
+from time import time
 from typing import Any
 from typing import Self
 
@@ -23,6 +25,8 @@ class Invocation[R](Suspension[R]):
     args: tuple[Any, ...]
     kwargs: dict[str, Any]
     context: QueueContext = field(default_factory=QueueContext.capture)
+    # When the invocation was enqueued, as a Unix time, if it was received
+    enqueued_at: float | None = field(default=None, repr=False)
 
     __handler = ContextVar[Callable[[Self], Future] | None](
         "Invocation.handler", default=None
@@ -60,6 +64,7 @@ class Invocation[R](Suspension[R]):
                 "args": self.args,
                 "kwargs": self.kwargs,
                 "context": self.context.serialize(),
+                "enqueued_at": time(),
             }
         ).encode()
 
@@ -72,12 +77,13 @@ class Invocation[R](Suspension[R]):
             args=data["args"],
             kwargs=data["kwargs"],
             context=QueueContext.deserialize(data.get("context", {})),
+            enqueued_at=data.get("enqueued_at"),
         )
 
     @dataclass(eq=False, kw_only=True, repr=False)
     class Submitted(Suspension.Submitted):
         routine: str
-        args: tuple[Any]
+        args: tuple[Any, ...]
         kwargs: dict[str, Any]
         context: QueueContext
 
@@ -93,7 +99,9 @@ class Invocation[R](Suspension[R]):
     @dataclass(eq=False, kw_only=True)
     class LocalSuspended(BaseSuspended):
         suspension: Suspension = field(repr=False)
-        generator: Generator[Invocation, Any, Any] = field(repr=False)
+        generator: Generator[Invocation, Any, Any] | Coroutine[Invocation, Any, Any] = (
+            field(repr=False)
+        )
         invocation: Invocation = field(repr=False)
         context: Context = field(repr=False)
 
@@ -106,7 +114,9 @@ class Invocation[R](Suspension[R]):
 
     @dataclass(eq=False, kw_only=True)
     class LocalContinued(BaseContinued):
-        generator: Generator[Suspension, Any, Any] = field(repr=False)
+        generator: Generator[Suspension, Any, Any] | Coroutine[Suspension, Any, Any] = (
+            field(repr=False)
+        )
 
     @dataclass(eq=False, kw_only=True)
     class BaseThrew(Event):
@@ -117,7 +127,9 @@ class Invocation[R](Suspension[R]):
 
     @dataclass(eq=False, kw_only=True)
     class LocalThrew(BaseThrew):
-        generator: Generator[Suspension, Any, Any] = field(repr=False)
+        generator: Generator[Suspension, Any, Any] | Coroutine[Suspension, Any, Any] = (
+            field(repr=False)
+        )
 
     @dataclass(eq=False, kw_only=True)
     class Resumed(Event): ...
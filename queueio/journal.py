@@ -8,6 +8,15 @@ class Journal(ABC):
     def subscribe(self) -> Iterator[bytes]:
         raise NotImplementedError("Subclasses must implement this method.")
 
+    def subscribe_many(self) -> Iterator[list[bytes]]:
+        """Subscribe to messages, delivered in batches.
+
+        Journals that can receive several messages at once should override
+        this to reduce the per-message overhead for subscribers.
+        """
+        for message in self.subscribe():
+            yield [message]
+
     @abstractmethod
     def publish(self, message: bytes):
         raise NotImplementedError("Subclasses must implement this method.")
@@ -0,0 +1,68 @@
+import json
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from .routine import Routine
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    module: str
+    queue: str
+
+
+@dataclass(frozen=True)
+class Manifest:
+    """The module and queue of each routine.
+
+    A manifest lets processes import the module of a routine when it is
+    first used, or only the modules of the routines on their queues,
+    rather than every module that registers routines.
+    """
+
+    routines: dict[str, ManifestEntry]
+
+    @classmethod
+    def from_routines(cls, routines: Iterable[Routine], /) -> Manifest:
+        return cls(
+            {
+                routine.name: ManifestEntry(
+                    module=routine.fn.__module__, queue=routine.queue
+                )
+                for routine in sorted(routines, key=lambda routine: routine.name)
+            }
+        )
+
+    @classmethod
+    def load(cls, path: Path, /) -> Manifest:
+        with path.open() as f:
+            data = json.load(f)
+        return cls(
+            {
+                name: ManifestEntry(module=entry["module"], queue=entry["queue"])
+                for name, entry in data["routines"].items()
+            }
+        )
+
+    def dump(self, path: Path, /):
+        data = {
+            "routines": {
+                name: {"module": entry.module, "queue": entry.queue}
+                for name, entry in self.routines.items()
+            }
+        }
+        with path.open("w") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+
+    def modules(self, queues: Iterable[str] | None = None) -> list[str]:
+        """The modules of the routines on the queues, or of every routine."""
+        queues = None if queues is None else set(queues)
+        return sorted(
+            {
+                entry.module
+                for entry in self.routines.values()
+                if queues is None or entry.queue in queues
+            }
+        )
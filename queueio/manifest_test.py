@@ -0,0 +1,39 @@
+from .manifest import Manifest
+from .manifest import ManifestEntry
+from .samples import basic
+from .samples import priority
+
+
+def test_manifest_from_routines():
+    """The manifest records the module and queue of each routine."""
+    manifest = Manifest.from_routines([basic.yielding, priority.inherited_priority])
+
+    assert manifest.routines == {
+        "inherited_priority": ManifestEntry(
+            module="queueio.samples.priority", queue="priority"
+        ),
+        "yielding": ManifestEntry(module="queueio.samples.basic", queue="basic"),
+    }
+
+
+def test_manifest_round_trip(tmp_path):
+    """A manifest loads as it was dumped."""
+    path = tmp_path / "queueio-manifest.json"
+    manifest = Manifest.from_routines(
+        [basic.blocking, basic.yielding, priority.inherited_priority]
+    )
+
+    manifest.dump(path)
+
+    assert Manifest.load(path) == manifest
+
+
+def test_manifest_modules_by_queue():
+    """Only the modules of routines on the given queues are listed."""
+    manifest = Manifest.from_routines(
+        [basic.blocking, basic.yielding, priority.inherited_priority]
+    )
+
+    assert manifest.modules() == ["queueio.samples.basic", "queueio.samples.priority"]
+    assert manifest.modules(["priority"]) == ["queueio.samples.priority"]
+    assert manifest.modules(["other"]) == []
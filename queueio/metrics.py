@@ -0,0 +1,294 @@
+from bisect import bisect_left
+from collections.abc import Generator
+from contextlib import contextmanager
+from threading import Lock
+from threading import local
+from time import perf_counter
+from time import time
+from typing import cast
+
+from .invocation import Invocation
+from .queuespec import QueueSpec
+from .registry import lookup
+from .thread import Thread
+
+type Labels = tuple[tuple[str, str], ...]
+
+# The upper bounds of histogram buckets, in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_FAMILIES = {
+    "queueio_enqueued_total": ("counter", "Invocations enqueued."),
+    "queueio_completed_total": ("counter", "Invocations completed, by result."),
+    "queueio_in_flight": ("gauge", "Invocations received and not yet completed."),
+    "queueio_suspended": ("gauge", "Invocations suspended."),
+    "queueio_prefetch": ("gauge", "Invocations a consumer has capacity to receive."),
+    "queueio_queue_wait_seconds": (
+        "histogram",
+        "Seconds from enqueuing an invocation to starting it.",
+    ),
+    "queueio_runner_wait_seconds": (
+        "histogram",
+        "Seconds a received invocation or continuation waited for a runner.",
+    ),
+    "queueio_run_seconds": (
+        "histogram",
+        "Seconds an invocation ran, excluding its suspensions.",
+    ),
+    "queueio_suspension_seconds": (
+        "histogram",
+        "Seconds from suspending an invocation to continuing it.",
+    ),
+}
+
+
+class _Shard:
+    """The values recorded by one thread.
+
+    Only rendering contends for the lock, to copy the values while
+    the thread isn't halfway through recording one.
+    """
+
+    def __init__(self, buckets: int):
+        self.buckets = buckets
+        self.lock = Lock()
+        self.values = dict[tuple[str, Labels], float]()
+        # The count in each bucket, then the sum and the count
+        self.histograms = dict[tuple[str, Labels], list[float]]()
+
+    def add(self, name: str, labels: Labels, value: float):
+        key = (name, labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def observe(self, name: str, labels: Labels, bucket: int, value: float):
+        key = (name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * (self.buckets + 3)
+            histogram[bucket] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def snapshot(
+        self,
+    ) -> tuple[dict[tuple[str, Labels], float], dict[tuple[str, Labels], list[float]]]:
+        """Copy the values and histograms."""
+        with self.lock:
+            return dict(self.values), {
+                key: list(histogram) for key, histogram in self.histograms.items()
+            }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+class Metrics:
+    """Counters, gauges, and histograms of invocations by routine and queue.
+
+    Each thread records into its own shard, behind a lock that only rendering
+    contends for, and the shards are summed when the metrics are rendered in
+    the Prometheus text format.
+    """
+
+    def __init__(self, *, buckets: tuple[float, ...] = BUCKETS):
+        self.__buckets = buckets
+        self.__local = local()
+        self.__lock = Lock()
+        self.__shards = list[_Shard]()
+
+    def __shard(self) -> _Shard:
+        try:
+            return self.__local.shard
+        except AttributeError:
+            shard = self.__local.shard = _Shard(len(self.__buckets))
+            with self.__lock:
+                self.__shards.append(shard)
+            return shard
+
+    def add(self, name: str, labels: Labels, value: float = 1, /):
+        """Add to a counter or gauge."""
+        self.__shard().add(name, labels, value)
+
+    def observe(self, name: str, labels: Labels, value: float, /):
+        """Observe a value in a histogram."""
+        bucket = bisect_left(self.__buckets, value)
+        self.__shard().observe(name, labels, bucket, value)
+
+    def enqueued(self, invocation: Invocation, /, *, queue: str):
+        self.add(
+            "queueio_enqueued_total",
+            (("routine", invocation.routine), ("queue", queue)),
+        )
+
+    def consumer(self, queuespec: QueueSpec, /) -> ConsumerMetrics:
+        """Metrics for a consumer of the queues of a queuespec."""
+        return ConsumerMetrics(self, queuespec)
+
+    def render(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        values = dict[tuple[str, Labels], float]()
+        histograms = dict[tuple[str, Labels], list[float]]()
+        with self.__lock:
+            shards = list(self.__shards)
+        for shard in shards:
+            shard_values, shard_histograms = shard.snapshot()
+            for key, value in shard_values.items():
+                values[key] = values.get(key, 0) + value
+            for key, histogram in shard_histograms.items():
+                total = histograms.setdefault(key, [0] * len(histogram))
+                for i, count in enumerate(histogram):
+                    total[i] += count
+
+        lines = list[str]()
+        for name, (kind, help) in _FAMILIES.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (family, labels), value in sorted(values.items()):
+                if family == name:
+                    lines.append(f"{name}{_format(labels)} {value:g}")
+            for (family, labels), histogram in sorted(histograms.items()):
+                if family != name:
+                    continue
+                cumulative = 0
+                bounds = [f"{bound:g}" for bound in self.__buckets] + ["+Inf"]
+                for bound, count in zip(bounds, histogram, strict=False):
+                    cumulative += count
+                    bucket = _format((*labels, ("le", bound)))
+                    lines.append(f"{name}_bucket{bucket} {cumulative:g}")
+                lines.append(f"{name}_sum{_format(labels)} {histogram[-2]:g}")
+                lines.append(f"{name}_count{_format(labels)} {histogram[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+    @contextmanager
+    def serve(
+        self, port: int = 0, /, *, host: str = "127.0.0.1"
+    ) -> Generator[tuple[str, int]]:
+        """Serve the metrics over HTTP, yielding the address served.
+
+        Any path responds with the metrics, for Prometheus to scrape.
+        """
+        # The HTTP server is slow to import, and only needed to serve
+        from http.server import BaseHTTPRequestHandler
+        from http.server import ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        thread = Thread(target=server.serve_forever, name="queueio-metrics")
+        thread.start()
+        address, port = server.server_address[:2]
+        try:
+            yield cast(str, address), port
+        finally:
+            server.shutdown()
+            thread.join()
+            server.server_close()
+
+
+class ConsumerMetrics:
+    """Record the lifecycle of the invocations received by a consumer."""
+
+    def __init__(self, metrics: Metrics, queuespec: QueueSpec, /):
+        self.__metrics = metrics
+        self.__queues = (("queues", ",".join(queuespec.shares())),)
+        self.__labels = dict[str, Labels]()
+        # When each invocation's current run or suspension started,
+        # and how long it has run
+        self.__timings = dict[Invocation, tuple[float, float]]()
+        self.__metrics.add("queueio_prefetch", self.__queues, queuespec.concurrency)
+
+    def __label(self, invocation: Invocation) -> Labels:
+        labels = self.__labels.get(invocation.routine)
+        if labels is None:
+            try:
+                queue = lookup(invocation.routine).queue
+            except KeyError:
+                queue = ""
+            labels = (("routine", invocation.routine), ("queue", queue))
+            self.__labels[invocation.routine] = labels
+        return labels
+
+    def received(self, invocation: Invocation, /):
+        self.__metrics.add("queueio_in_flight", self.__label(invocation))
+
+    def started(self, invocation: Invocation, /, *, waited: float | None = None):
+        labels = self.__label(invocation)
+        if invocation.enqueued_at is not None:
+            self.__metrics.observe(
+                "queueio_queue_wait_seconds",
+                labels,
+                max(0.0, time() - invocation.enqueued_at),
+            )
+        if waited is not None:
+            self.__metrics.observe(
+                "queueio_runner_wait_seconds", (*labels, ("kind", "invocation")), waited
+            )
+        self.__timings[invocation] = (perf_counter(), 0.0)
+
+    def __timing(self, invocation: Invocation) -> tuple[float, float]:
+        return self.__timings.get(invocation) or (perf_counter(), 0.0)
+
+    def suspended(self, invocation: Invocation, /, *, paused: bool):
+        now = perf_counter()
+        started, ran = self.__timing(invocation)
+        self.__timings[invocation] = (now, ran + now - started)
+        self.__metrics.add("queueio_suspended", self.__label(invocation))
+        if paused:
+            self.__metrics.add("queueio_prefetch", self.__queues)
+
+    def continued(self, invocation: Invocation, /, *, paused: bool):
+        suspended, _ = self.__timing(invocation)
+        labels = self.__label(invocation)
+        self.__metrics.observe(
+            "queueio_suspension_seconds", labels, perf_counter() - suspended
+        )
+        self.__metrics.add("queueio_suspended", labels, -1)
+        if paused:
+            self.__metrics.add("queueio_prefetch", self.__queues, -1)
+
+    def resumed(self, invocation: Invocation, /, *, waited: float | None = None):
+        if waited is not None:
+            self.__metrics.observe(
+                "queueio_runner_wait_seconds",
+                (*self.__label(invocation), ("kind", "continuation")),
+                waited,
+            )
+        _, ran = self.__timing(invocation)
+        self.__timings[invocation] = (perf_counter(), ran)
+
+    def completed(self, invocation: Invocation, /, *, ok: bool):
+        started, ran = self.__timing(invocation)
+        self.__timings.pop(invocation, None)
+        labels = self.__label(invocation)
+        self.__metrics.observe(
+            "queueio_run_seconds", labels, ran + perf_counter() - started
+        )
+        self.__metrics.add(
+            "queueio_completed_total",
+            (*labels, ("result", "ok" if ok else "error")),
+        )
+        self.__metrics.add("queueio_in_flight", labels, -1)
+
+    def adjusted(self, change: int, /):
+        self.__metrics.add("queueio_prefetch", self.__queues, change)
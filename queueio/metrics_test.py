@@ -0,0 +1,141 @@
+from contextvars import copy_context
+from threading import Event
+from urllib.request import urlopen
+
+from .invocation import Invocation
+from .metrics import Metrics
+from .pause import pause
+from .queueio import QueueIO
+from .queuespec import QueueSpec
+from .scenarios import QUEUE
+from .scenarios import noop
+from .stub import StubBackend
+from .thread import Thread
+
+
+def samples(metrics: Metrics) -> dict[str, float]:
+    """The value of each sample in the rendered metrics."""
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in metrics.render().splitlines()
+        if not line.startswith("#")
+    }
+
+
+def test_metrics_sum_the_values_of_each_thread():
+    metrics = Metrics()
+    labels = (("routine", "noop"), ("queue", "bench"))
+
+    def record():
+        for _ in range(1000):
+            metrics.add("queueio_enqueued_total", labels)
+
+    threads = [Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert samples(metrics) == {
+        'queueio_enqueued_total{routine="noop",queue="bench"}': 4000
+    }
+
+
+def test_metrics_render_consistent_histograms_while_recording():
+    metrics = Metrics()
+    labels = (("routine", "noop"), ("queue", "bench"))
+    done = Event()
+
+    def record():
+        while not done.is_set():
+            metrics.observe("queueio_run_seconds", labels, 0.002)
+
+    bucket = 'queueio_run_seconds_bucket{routine="noop",queue="bench",le="+Inf"}'
+    count = 'queueio_run_seconds_count{routine="noop",queue="bench"}'
+    thread = Thread(target=record)
+    thread.start()
+    try:
+        # Every observation in the count is in a bucket
+        for _ in range(200):
+            rendered = samples(metrics)
+            assert rendered.get(bucket) == rendered.get(count)
+    finally:
+        done.set()
+        thread.join()
+
+
+def test_metrics_render_histograms():
+    """Buckets are cumulative and include values equal to their bound."""
+    metrics = Metrics(buckets=(0.1, 1))
+    labels = (("routine", "noop"), ("queue", 'say "hi"'))
+
+    for value in [0.05, 0.1, 0.5, 2]:
+        metrics.observe("queueio_run_seconds", labels, value)
+
+    rendered = metrics.render()
+    assert "# TYPE queueio_run_seconds histogram" in rendered
+    labelled = 'routine="noop",queue="say \\"hi\\""'
+    assert samples(metrics) == {
+        f'queueio_run_seconds_bucket{{{labelled},le="0.1"}}': 2,
+        f'queueio_run_seconds_bucket{{{labelled},le="1"}}': 3,
+        f'queueio_run_seconds_bucket{{{labelled},le="+Inf"}}': 4,
+        f"queueio_run_seconds_sum{{{labelled}}}": 2.65,
+        f"queueio_run_seconds_count{{{labelled}}}": 4,
+    }
+
+
+def test_metrics_record_the_consumer_lifecycle():
+    metrics = Metrics()
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = QueueIO(broker=broker, journal=journal, metrics=metrics)
+        try:
+            queueio.sync([QUEUE])
+            queueio.submit(noop())
+            consumer = queueio.consume(QueueSpec(queues=[QUEUE], concurrency=2))
+            invocation = next(iter(consumer))
+            labels = f'routine="queueio_bench_noop",queue="{QUEUE}"'
+
+            consumer.start(invocation)
+            assert samples(metrics)[f"queueio_in_flight{{{labels}}}"] == 1
+
+            async def routine():
+                await pause(0)
+
+            generator = routine().__await__()
+            suspension = generator.send(None)
+            consumer.suspend(invocation, generator, suspension, copy_context())
+            assert samples(metrics)[f"queueio_suspended{{{labels}}}"] == 1
+            assert samples(metrics)[f'queueio_prefetch{{queues="{QUEUE}"}}'] == 3
+
+            consumer.resolve(invocation, generator, None)
+            consumer.resume(invocation)
+            consumer.succeed(invocation, None)
+        finally:
+            queueio.shutdown()
+
+    values = samples(metrics)
+    assert values[f"queueio_enqueued_total{{{labels}}}"] == 1
+    assert values[f'queueio_completed_total{{{labels},result="ok"}}'] == 1
+    assert values[f"queueio_in_flight{{{labels}}}"] == 0
+    assert values[f"queueio_suspended{{{labels}}}"] == 0
+    assert values[f'queueio_prefetch{{queues="{QUEUE}"}}'] == 2
+    assert values[f"queueio_queue_wait_seconds_count{{{labels}}}"] == 1
+    assert values[f"queueio_run_seconds_count{{{labels}}}"] == 1
+    assert values[f"queueio_suspension_seconds_count{{{labels}}}"] == 1
+
+
+def test_metrics_serve_the_text_format():
+    metrics = Metrics()
+    metrics.enqueued(Invocation(routine="noop", args=(), kwargs={}), queue="bench")
+
+    with metrics.serve() as (host, port):
+        response = urlopen(f"http://{host}:{port}/metrics")
+        with response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            body = response.read().decode()
+
+    assert 'queueio_enqueued_total{routine="noop",queue="bench"} 1' in body
@@ -1,25 +1,150 @@
+from rich.segment import Segment
 from textual.app import App
 from textual.app import ComposeResult
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
 from textual.widgets import DataTable
 from textual.widgets import Footer
 from textual.widgets import Header
+from textual.widgets import Input
+from textual.widgets import Static
+from textual.widgets import TabbedContent
+from textual.widgets import TabPane
 
+from .activity import Activity
+from .activity import Row
+from .aggregate import Aggregate
+from .aggregate import Summary
 from .invocation import Invocation
 from .queue import ShutDown
 from .queueio import QueueIO
-from .result import Err
-from .result import Ok
 from .thread import Thread
 
+# The width of the leading columns, and the column headings
+_WIDTHS = (12, 32, 11)
+_HEADINGS = ("ID", "Name", "Status", "Queue")
+
+
+def _line(cells: tuple[str, ...]) -> str:
+    return " ".join(
+        [
+            *(
+                cell[: width - 1].ljust(width - 1)
+                for cell, width in zip(cells[:-1], _WIDTHS, strict=True)
+            ),
+            cells[-1],
+        ]
+    )
+
+
+_BARS = "▁▂▃▄▅▆▇█"
+
+
+def _sparkline(values: list[int]) -> str:
+    peak = max(values, default=0)
+    if not peak:
+        return _BARS[0] * len(values)
+    return "".join(_BARS[value * (len(_BARS) - 1) // peak] for value in values)
+
+
+def _seconds(value: float | None) -> str:
+    if value is None:
+        return "-"
+    if value < 1:
+        return f"{value * 1000:.3g}ms"
+    return f"{value:.3g}s"
+
+
+class Dashboard(DataTable):
+    """Rates, counts, and latencies of each routine and queue."""
+
+    def on_mount(self):
+        self.cursor_type = "row"
+        self.__columns = self.add_columns(
+            "Kind",
+            "Name",
+            "Submitted/s",
+            "Completed/s",
+            "Errors/s",
+            "Waiting",
+            "Running",
+            "Suspended",
+            "Wait p50/p90/p99",
+            "Run p50/p90/p99",
+            "Completed, last minute",
+        )
+
+    def show(self, summaries: list[Summary], /):
+        for summary in summaries:
+            key = f"{summary.kind}:{summary.name}"
+            cells = (
+                summary.kind,
+                summary.name,
+                f"{summary.submitted:.1f}",
+                f"{summary.rate:.1f}",
+                f"{summary.errors:.1f}",
+                str(summary.waiting),
+                str(summary.running),
+                str(summary.suspended),
+                " ".join(_seconds(value) for value in summary.wait.values()),
+                " ".join(_seconds(value) for value in summary.run.values()),
+                _sparkline(summary.history),
+            )
+            if key not in self.rows:
+                self.add_row(*cells, key=key)
+                continue
+            for column, cell in zip(self.__columns[2:], cells[2:], strict=True):
+                self.update_cell(key, column, cell)
+
+
+class InvocationTable(ScrollView):
+    """A table of invocations that renders only the visible rows."""
+
+    def __init__(self):
+        super().__init__()
+        self.__rows = list[Row]()
+
+    def show(self, rows: list[Row], /):
+        self.__rows = rows
+        self.virtual_size = Size(self.size.width, len(rows))
+        self.refresh()
+
+    def render_line(self, y: int) -> Strip:
+        index = self.scroll_offset.y + y
+        if index >= len(self.__rows):
+            return Strip.blank(self.size.width, self.rich_style)
+        row = self.__rows[index]
+        text = _line((row.id, row.routine, row.status, row.queue))
+        return Strip([Segment(text, self.rich_style)]).adjust_cell_length(
+            self.size.width, self.rich_style
+        )
+
 
 class Monitor(App):
-    """TUI for monitoring queueio events."""
+    """TUI for monitoring queueio events.
+
+    Events are applied in batches by a listener thread to the activity
+    of recent invocations and to the aggregate of each routine and queue.
+    The view is redrawn from them at a fixed frame rate.
+    """
 
     TITLE = "queueio Monitor"
+    CSS = """
+    #headings { text-style: bold; }
+    InvocationTable { height: 1fr; }
+    """
 
-    def __init__(self, queueio: QueueIO):
+    def __init__(self, queueio: QueueIO, *, capacity: int = 10_000, fps: float = 10):
         super().__init__()
         self.__queueio = queueio
+        self.__fps = fps
+        self.__queues = dict[str, str]()
+        self.__activity = Activity(self.__queue, capacity=capacity)
+        self.__aggregate = Aggregate(self.__queue)
+        self.__filters = dict[str, str]()
+        # The version of the activity and the filters that are shown
+        self.__shown: tuple[int, dict[str, str]] | None = None
         self.__thread = Thread(target=self.__listen)
         self.__events = self.__queueio.subscribe(
             {
@@ -33,88 +158,63 @@ class Monitor(App):
             }
         )
 
+    def __queue(self, routine: str) -> str:
+        if (queue := self.__queues.get(routine)) is None:
+            try:
+                queue = self.__queueio.routine(routine).queue
+            except KeyError:
+                queue = ""
+            self.__queues[routine] = queue
+        return queue
+
     def __listen(self):
         while True:
             try:
-                event = self.__events.get()
+                events = self.__events.get_many(1024)
             except ShutDown:
                 break
 
-            self.call_from_thread(self.handle_invocation_event, event)
-
-    def handle_invocation_event(
-        self,
-        event: Invocation.Submitted
-        | Invocation.Started
-        | Invocation.Suspended
-        | Invocation.Continued
-        | Invocation.Threw
-        | Invocation.Resumed
-        | Invocation.Completed,
-    ):
-        table = self.query_one(DataTable)
-        match event:
-            case Invocation.Submitted():
-                table.add_row(
-                    event.id,
-                    event.routine,
-                    "Submitted",
-                    self.__queueio.routine(event.routine).queue,
-                    key=event.id,
-                )
-            case Invocation.Started():
-                table.update_cell(
-                    event.id,
-                    self.__column_keys[2],
-                    "Started",
-                )
-            case Invocation.Suspended():
-                table.update_cell(
-                    event.id,
-                    self.__column_keys[2],
-                    "Suspended",
-                )
-            case Invocation.Continued():
-                table.update_cell(
-                    event.id,
-                    self.__column_keys[2],
-                    "Continued",
-                )
-            case Invocation.Threw():
-                table.update_cell(
-                    event.id,
-                    self.__column_keys[2],
-                    "Threw",
-                )
-            case Invocation.Resumed():
-                table.update_cell(
-                    event.id,
-                    self.__column_keys[2],
-                    "Resumed",
-                )
-            case Invocation.Completed(result=Ok()):
-                table.update_cell(
-                    event.id,
-                    self.__column_keys[2],
-                    "Succeeded",
-                )
-            case Invocation.Completed(result=Err()):
-                table.update_cell(
-                    event.id,
-                    self.__column_keys[2],
-                    "Errored",
-                )
+            self.__activity.apply(events)
+            self.__aggregate.apply(events)
 
     def compose(self) -> ComposeResult:
         yield Header()
-        yield DataTable(cursor_type="row", zebra_stripes=True)
+        with TabbedContent():
+            with TabPane("Invocations", id="invocations"):
+                yield Input(placeholder="Filter: routine=NAME queue=NAME status=STATUS")
+                yield Static(_line(_HEADINGS), id="headings")
+                yield InvocationTable()
+            with TabPane("Dashboard", id="dashboard"):
+                yield Dashboard()
         yield Footer()
 
     def on_mount(self):
-        table = self.query_one(DataTable)
-        self.__column_keys = table.add_columns("ID", "Name", "Status", "Queue")
+        self.set_interval(1 / self.__fps, self.__draw)
         self.__thread.start()
 
+    def on_input_changed(self, event: Input.Changed):
+        self.__filters = {
+            field: value
+            for field, _, value in (
+                token.partition("=") for token in event.value.split()
+            )
+            if field in {"routine", "queue", "status"} and value
+        }
+        self.__draw()
+
+    def __draw(self):
+        if self.query_one(TabbedContent).active == "dashboard":
+            # Rates change over time, so the dashboard is always redrawn
+            self.query_one(Dashboard).show(self.__aggregate.summarize())
+            return
+        shown = (self.__activity.version, self.__filters)
+        if shown == self.__shown:
+            return
+        self.__shown = shown
+        rows = self.__activity.select(**self.__filters)
+        self.query_one(InvocationTable).show(rows)
+        self.sub_title = f"{len(rows)} of {len(self.__activity)} invocations"
+
     def on_unmount(self) -> None:
         self.__queueio.shutdown()
         self.__thread.join()
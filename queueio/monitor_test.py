@@ -0,0 +1,66 @@
+import asyncio
+
+from textual.widgets import TabbedContent
+
+from .monitor import Dashboard
+from .monitor import InvocationTable
+from .monitor import Monitor
+from .queueio import QueueIO
+from .scenarios import QUEUE
+from .scenarios import noop
+from .stub import StubBackend
+
+
+def test_monitor_shows_a_bounded_filtered_table():
+    async def run(queueio: QueueIO) -> list[str]:
+        app = Monitor(queueio, capacity=5)
+        titles = list[str]()
+        async with app.run_test(size=(100, 20)) as pilot:
+            for _ in range(8):
+                queueio.submit(noop())
+            while not app.sub_title.startswith("5 of 5"):
+                await pilot.pause(0.05)
+            table = app.query_one(InvocationTable)
+            assert table.virtual_size.height == 5
+            assert "queueio_bench_noop" in table.render_line(0).text
+            titles.append(app.sub_title)
+
+            await pilot.click("Input")
+            await pilot.press(*"status=Started")
+            await pilot.pause(0.2)
+            titles.append(app.sub_title)
+        return titles
+
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = QueueIO(broker=broker, journal=journal)
+        queueio.sync([QUEUE])
+        titles = asyncio.run(run(queueio))
+
+    assert titles == ["5 of 5 invocations", "0 of 5 invocations"]
+
+
+def test_monitor_dashboard_summarizes_routines_and_queues():
+    async def run(queueio: QueueIO) -> list[str]:
+        app = Monitor(queueio)
+        async with app.run_test(size=(200, 20)) as pilot:
+            for _ in range(3):
+                queueio.submit(noop())
+            app.query_one(TabbedContent).active = "dashboard"
+            await pilot.pause(0.3)
+            dashboard = app.query_one(Dashboard)
+            return [str(dashboard.get_row_at(i)[1]) for i in range(dashboard.row_count)]
+
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = QueueIO(broker=broker, journal=journal)
+        queueio.sync([QUEUE])
+        names = asyncio.run(run(queueio))
+
+    assert names == [QUEUE, "queueio_bench_noop"]
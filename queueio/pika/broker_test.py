@@ -7,7 +7,7 @@ from . import PikaBackend
 
 class TestPikaBroker(BaseBrokerTest):
     supports_multiple_queues = True
-    supports_weighted_queue_subscriptions = False
+    supports_weighted_queue_subscriptions = True
 
     @pytest.fixture
     def broker(self):
@@ -1,15 +1,36 @@
 from collections.abc import Iterator
+from threading import Condition
 from threading import Lock
 from typing import cast
 
 from queueio.message import Message
+from queueio.queue import Queue
+from queueio.queue import ShutDown
 from queueio.queuespec import QueueSpec
 from queueio.receiver import Receiver
+from queueio.rotation import Rotation
+from queueio.select import select
 
+from .threadsafe import Messages
+from .threadsafe import ThreadsafeChannel
 from .threadsafe import ThreadsafeConnection
 
 
 class PikaReceiver(Receiver):
+    """Receive messages from RabbitMQ queues.
+
+    Queues with equal weights share one channel, and one prefetch for the
+    concurrency. When the weights differ, each queue consumes on its own
+    channel, and the receiver takes the deliveries of the channels by their
+    turns in a weighted rotation, up to the concurrency they share. So a
+    backlog on one queue only gets its weighted share while the others are
+    busy, and no capacity is left idle while any queue has messages.
+
+    RabbitMQ can't share a prefetch between channels, so each channel has
+    a prefetch for the whole concurrency, and may hold that many more
+    unacknowledged messages than the receiver has taken from it.
+    """
+
     def __init__(
         self,
         connection: ThreadsafeConnection,
@@ -19,40 +40,96 @@ class PikaReceiver(Receiver):
         if len(queuespec.queues) == 0:
             raise ValueError("Must specify at least one queue")
 
-        self.__channel = connection.channel()
-        self.__consumer_tag = dict[str, str]()
-        self.__tag = dict[Message, int]()
+        shares = queuespec.shares()
+        if len(set(shares.values())) > 1:
+            self.__rotation = Rotation(shares)
+            groups = [[queue] for queue in shares]
+        else:
+            self.__rotation = None
+            groups = [list(shares)]
 
-        self.__prefetch_lock = Lock()
-        self.__prefetch = 0
-        self.__adjust_prefetch(+queuespec.concurrency)
+        # Each channel delivers to its own messages queue
+        self.__channels = list[ThreadsafeChannel]()
+        self.__messages = dict[ThreadsafeChannel, Messages]()
+        self.__consumer_tag = dict[str, tuple[ThreadsafeChannel, str]]()
+        self.__tag = dict[Message, tuple[ThreadsafeChannel, int]]()
+
+        self.__condition = Condition()
+        self.__capacity = queuespec.concurrency
 
         self.__shutdown_lock = Lock()
         self.__shutdown = False
 
-        for queue in queuespec.queues:
-            result = self.__channel.consume(queue)
-            self.__consumer_tag[queue] = cast(str, result.method.consumer_tag)
-
-    def __adjust_prefetch(self, change: int) -> None:
+        self.__prefetch_lock = Lock()
+        self.__prefetch = dict[ThreadsafeChannel, int]()
+
+        for queues in groups:
+            messages: Messages = Queue()
+            channel = connection.channel(messages=messages)
+            self.__channels.append(channel)
+            self.__messages[channel] = messages
+            self.__prefetch[channel] = 0
+            self.__adjust_prefetch(channel, +queuespec.concurrency)
+            for queue in queues:
+                result = channel.consume(queue)
+                consumer_tag = cast(str, result.method.consumer_tag)
+                self.__consumer_tag[queue] = (channel, consumer_tag)
+
+    def __adjust_prefetch(self, channel: ThreadsafeChannel, change: int) -> None:
         with self.__prefetch_lock:
-            self.__prefetch += change
-            self.__channel.qos(prefetch_count=self.__prefetch, global_qos=True)
+            self.__prefetch[channel] += change
+            channel.qos(prefetch_count=self.__prefetch[channel], global_qos=True)
 
     def __iter__(self) -> Iterator[Message]:
-        for method, _, body in self.__channel.messages():
+        while True:
+            # Wait for capacity to take a delivery
+            with self.__condition:
+                while self.__capacity <= 0 and not self.__shutdown:
+                    self.__condition.wait()
+                if self.__shutdown:
+                    return
+                self.__capacity -= 1
+
+            # Take from the channels in the order of their next turns
+            if self.__rotation is None:
+                queues = []
+                channels = self.__channels
+            else:
+                queues = self.__rotation.order()
+                channels = [self.__consumer_tag[queue][0] for queue in queues]
+            try:
+                i, (method, _, body) = select(
+                    [self.__messages[channel].get.select() for channel in channels]
+                )
+            except ShutDown:
+                return
+            if self.__rotation is not None:
+                self.__rotation.take(queues[i])
+
             message = Message(body)
             tag = cast(int, method.delivery_tag)
-            self.__tag[message] = tag
+            self.__tag[message] = (channels[i], tag)
             yield message
 
+    def adjust(self, change: int, /):
+        """Adjust the capacity to receive messages."""
+        with self.__condition:
+            self.__capacity += change
+            self.__condition.notify()
+        for channel in self.__channels:
+            self.__adjust_prefetch(channel, change)
+
     def pause(self, message: Message, /):
         """Pause processing of a message.
 
         The message processing is not completed, and is expected to unpause,
         but its assigned capacity may be allocated elsewhere temporarily.
         """
-        self.__adjust_prefetch(+1)
+        channel, _ = self.__tag[message]
+        self.__adjust_prefetch(channel, +1)
+        with self.__condition:
+            self.__capacity += 1
+            self.__condition.notify()
 
     def unpause(self, message: Message, /):
         """Unpause processing of a message.
@@ -60,7 +137,10 @@ class PikaReceiver(Receiver):
         The previously paused message processing is resuming, so its assigned
         capacity is no longer available for allocation elsewhere.
         """
-        self.__adjust_prefetch(-1)
+        channel, _ = self.__tag[message]
+        with self.__condition:
+            self.__capacity -= 1
+        self.__adjust_prefetch(channel, -1)
 
     def finish(self, message: Message, /):
         """Finish processing a message.
@@ -68,14 +148,21 @@ class PikaReceiver(Receiver):
         The message is done processing, and its assigned capacity may be
         allocated elsewhere permanently.
         """
-        self.__channel.ack(delivery_tag=self.__tag.pop(message))
+        channel, tag = self.__tag.pop(message)
+        channel.ack(delivery_tag=tag)
+        with self.__condition:
+            self.__capacity += 1
+            self.__condition.notify()
 
     def shutdown(self):
         with self.__shutdown_lock:
             if self.__shutdown:
                 return
-            self.__shutdown = True
-
-            for consumer_tag in self.__consumer_tag.values():
-                self.__channel.cancel(consumer_tag=consumer_tag)
-            self.__channel.close()
+            with self.__condition:
+                self.__shutdown = True
+                self.__condition.notify_all()
+
+            for channel, consumer_tag in self.__consumer_tag.values():
+                channel.cancel(consumer_tag=consumer_tag)
+            for channel in self.__channels:
+                channel.close()
@@ -5,8 +5,6 @@ from collections.abc import Mapping
 from concurrent.futures import Future
 from contextlib import contextmanager
 from contextlib import suppress
-from queue import Queue
-from queue import ShutDown
 from threading import Event
 from threading import Thread
 from typing import Any
@@ -20,6 +18,11 @@ from pika.channel import Channel
 from pika.connection import Parameters
 from pika.exceptions import ConnectionClosedByClient
 
+from queueio.queue import Queue
+from queueio.queue import ShutDown
+
+type Messages = Queue[tuple[spec.Basic.Deliver, spec.BasicProperties, bytes]]
+
 
 class ThreadsafeConnection:
     def __init__(self, connection_params: Parameters):
@@ -43,7 +46,17 @@ class ThreadsafeConnection:
         )
         event.wait()
 
-    def channel(self, channel_number: int | None = None) -> ThreadsafeChannel:
+    def channel(
+        self,
+        channel_number: int | None = None,
+        *,
+        messages: Messages | None = None,
+    ) -> ThreadsafeChannel:
+        """Open a channel.
+
+        The channel delivers its consumed messages to the messages queue,
+        so a receiver can select from the queues of several channels.
+        """
         future = Future[Channel]()
         self.__wait(
             lambda: self.__connection.channel(
@@ -51,7 +64,7 @@ class ThreadsafeConnection:
                 on_open_callback=future.set_result,
             )
         )
-        return ThreadsafeChannel(self.__wait, future.result())
+        return ThreadsafeChannel(self.__wait, future.result(), messages)
 
     def close(self, reply_code: int = 200, reply_text: str = "Normal shutdown"):
         self.__wait(
@@ -71,13 +84,12 @@ class ThreadsafeChannel:
         self,
         wait: Callable[[Callable[[], Any]], None],
         channel: Channel,
+        messages: Messages | None = None,
     ):
         self.__wait = wait
         self.__channel = channel
         self.__pending: set[Future] = set()
-        self.__messages = Queue[
-            tuple[spec.Basic.Deliver, spec.BasicProperties, bytes]
-        ]()
+        self.__messages: Messages = Queue() if messages is None else messages
         self.__channel.add_on_close_callback(self.__on_close)
 
     def __on_close(self, channel: Channel, reason: Exception):
@@ -0,0 +1,180 @@
+import sys
+from collections import Counter
+from collections.abc import Callable
+from contextlib import suppress
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import UTC
+from datetime import datetime
+from pathlib import Path
+from threading import Event as Flag
+from threading import RLock
+from threading import get_ident
+from time import monotonic
+from types import FrameType
+from typing import Any
+
+from .event import Event
+from .invocation import Invocation
+from .queue import Queue
+from .queue import ShutDown
+from .thread import Thread
+
+# Frames of these modules run invocations, so stacks are cut off below them
+_RUNNER_MODULES = {"queueio.worker", "queueio.continuation"}
+
+
+def _stack(frame: FrameType | None) -> str:
+    """Collapse the frames running an invocation, outermost first."""
+    frames = list[str]()
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "?")
+        if module in _RUNNER_MODULES:
+            break
+        frames.append(f"{module}:{frame.f_code.co_qualname}")
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+
+@dataclass
+class Profile:
+    """Stack samples of the routines that were running, and their invocations.
+
+    Stacks are collapsed into frames separated by semicolons, outermost
+    first, as flame graph tools such as flamegraph.pl and speedscope read.
+    """
+
+    started: datetime
+    interval: float
+    routines: dict[str, Counter[str]] = field(default_factory=dict)
+    invocations: Counter[tuple[str, str]] = field(default_factory=Counter)
+
+    def collapsed(self, routine: str, /) -> str:
+        """The collapsed stacks of a routine, with their sample counts."""
+        return "".join(
+            f"{stack} {count}\n"
+            for stack, count in sorted(self.routines.get(routine, Counter()).items())
+        )
+
+    def dump(self, directory: Path, /) -> list[Path]:
+        """Write the collapsed stacks of each routine to a file."""
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = self.started.strftime("%Y%m%dT%H%M%S")
+        paths = list[Path]()
+        for routine in sorted(self.routines):
+            path = directory / f"{stamp}-{routine}.folded"
+            path.write_text(self.collapsed(routine))
+            paths.append(path)
+        return paths
+
+
+class Profiler:
+    """Sample the stacks of routines running on the runner threads.
+
+    Runner threads record which invocation they're running through the
+    consumer's lifecycle hooks, which costs a dictionary update while
+    no profile is running. A profile samples those threads at an interval
+    for a bounded duration, and attributes each stack to the routine
+    and invocation running on its thread.
+
+    Triggered profiles are written to the directory, and written is called
+    with each profile and the paths of its files.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        /,
+        *,
+        interval: float = 0.01,
+        duration: float = 30,
+        written: Callable[[Profile, list[Path]], None] | None = None,
+    ):
+        self.__directory = directory
+        self.__written = written
+        self.__interval = interval
+        self.__duration = duration
+        # The routine and invocation id running on each runner thread
+        self.__running = dict[int, tuple[str, str]]()
+        # Reentrant, because signal handlers interrupt the main thread
+        self.__lock = RLock()
+        self.__profiling = False
+        self.__threads = list[Thread]()
+        self.__stopping = Flag()
+
+    def started(self, invocation: Invocation, /):
+        self.__running[get_ident()] = (invocation.routine, invocation.id)
+
+    def stopped(self, invocation: Invocation, /):
+        self.__running.pop(get_ident(), None)
+
+    def profile(self, duration: float | None = None, /) -> Profile | None:
+        """Sample stacks for the duration, unless a profile is running."""
+        with self.__lock:
+            if self.__profiling or self.__stopping.is_set():
+                return None
+            self.__profiling = True
+        try:
+            return self.__sample(self.__duration if duration is None else duration)
+        finally:
+            with self.__lock:
+                self.__profiling = False
+
+    def __sample(self, duration: float) -> Profile:
+        profile = Profile(started=datetime.now(tz=UTC), interval=self.__interval)
+        deadline = monotonic() + duration
+        while monotonic() < deadline and not self.__stopping.wait(self.__interval):
+            frames = sys._current_frames()
+            for ident, (routine, id) in list(self.__running.items()):
+                if (frame := frames.get(ident)) is None:
+                    continue
+                if stack := _stack(frame):
+                    profile.routines.setdefault(routine, Counter())[stack] += 1
+                    profile.invocations[routine, id] += 1
+        return profile
+
+    def __start(self, target: Callable[..., None], *args: Any):
+        thread = Thread(target=target, args=args, name="queueio-profiler")
+        with self.__lock:
+            self.__threads = [t for t in self.__threads if t.is_alive()]
+            self.__threads.append(thread)
+        thread.start()
+
+    def trigger(self, duration: float | None = None, /):
+        """Profile in the background, and write the profile to the directory.
+
+        This is safe to call from a signal handler.
+        """
+        self.__start(self.__write, duration)
+
+    def __write(self, duration: float | None):
+        if (profile := self.profile(duration)) is None:
+            return
+        paths = profile.dump(self.__directory)
+        if self.__written is not None:
+            self.__written(profile, paths)
+
+    def listen(self, requests: Queue[Profiler.Requested], /):
+        """Profile when requested, until the requests are shut down."""
+
+        def listen():
+            with suppress(ShutDown):
+                while True:
+                    self.trigger(requests.get().duration)
+
+        self.__start(listen)
+
+    def shutdown(self):
+        """Stop profiling, and wait for the profile to be written."""
+        self.__stopping.set()
+        with self.__lock:
+            threads = list(self.__threads)
+        for thread in threads:
+            thread.join()
+
+    @dataclass(eq=False, kw_only=True)
+    class Requested(Event):
+        """Request that workers profile their routines for a duration."""
+
+        # Each worker's default duration is used when this is None
+        duration: float | None = None
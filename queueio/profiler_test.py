@@ -0,0 +1,124 @@
+import sys
+from collections import Counter
+from datetime import UTC
+from datetime import datetime
+from pathlib import Path
+from threading import Event as Flag
+from time import sleep
+
+from .invocation import Invocation
+from .profiler import Profile
+from .profiler import Profiler
+from .profiler import _stack
+from .queue import Queue
+from .thread import Thread
+
+
+def test_stack_collapses_frames_outermost_first():
+    def inner():
+        return _stack(sys._getframe())
+
+    def outer():
+        return inner()
+
+    stack = outer().split(";")
+
+    assert stack[-2:] == [
+        f"{__name__}:test_stack_collapses_frames_outermost_first.<locals>.outer",
+        f"{__name__}:test_stack_collapses_frames_outermost_first.<locals>.inner",
+    ]
+
+
+def test_profile_dumps_collapsed_stacks_of_each_routine(tmp_path):
+    profile = Profile(
+        started=datetime(2025, 1, 2, 3, 4, 5, tzinfo=UTC),
+        interval=0.01,
+        routines={
+            "fetch": Counter({"app:fetch;http:get": 3, "app:fetch": 1}),
+            "store": Counter({"app:store": 2}),
+        },
+    )
+
+    paths = profile.dump(tmp_path)
+
+    assert [path.name for path in paths] == [
+        "20250102T030405-fetch.folded",
+        "20250102T030405-store.folded",
+    ]
+    assert paths[0].read_text() == "app:fetch 1\napp:fetch;http:get 3\n"
+
+
+def busy(stop: Flag):
+    while not stop.is_set():
+        sum(range(100))
+
+
+def test_profiler_attributes_samples_to_running_invocations(tmp_path):
+    profiler = Profiler(tmp_path, interval=0.001)
+    invocation = Invocation(routine="busy", args=(), kwargs={})
+    stop = Flag()
+
+    def run():
+        profiler.started(invocation)
+        busy(stop)
+        profiler.stopped(invocation)
+
+    thread = Thread(target=run)
+    thread.start()
+    try:
+        profile = profiler.profile(0.2)
+    finally:
+        stop.set()
+        thread.join()
+        profiler.shutdown()
+
+    assert profile is not None
+    assert list(profile.routines) == ["busy"]
+    assert profile.invocations[("busy", invocation.id)] > 0
+    assert any(stack.endswith(f"{__name__}:busy") for stack in profile.routines["busy"])
+
+
+def test_profiler_profiles_once_at_a_time(tmp_path):
+    profiler = Profiler(tmp_path, interval=0.001)
+    results = list[Profile | None]()
+    thread = Thread(target=lambda: results.append(profiler.profile(0.2)))
+    thread.start()
+    sleep(0.05)
+
+    assert profiler.profile(0.01) is None
+
+    thread.join()
+    profiler.shutdown()
+    assert results[0] is not None
+
+
+def test_profiler_writes_profiles_when_requested(tmp_path):
+    written = Queue[list[Path]]()
+    profiler = Profiler(
+        tmp_path, interval=0.001, written=lambda _, paths: written.put(paths)
+    )
+    invocation = Invocation(routine="busy", args=(), kwargs={})
+    stop = Flag()
+
+    def run():
+        profiler.started(invocation)
+        busy(stop)
+        profiler.stopped(invocation)
+
+    thread = Thread(target=run)
+    thread.start()
+    requests = Queue[Profiler.Requested]()
+    try:
+        profiler.listen(requests)
+        requests.put(Profiler.Requested(id="profile", duration=0.1))
+        paths = written.get.within(5)()
+    finally:
+        stop.set()
+        thread.join()
+        requests.shutdown()
+        profiler.shutdown()
+
+    (path,) = tmp_path.glob("*.folded")
+    assert paths == [path]
+    assert path.name.endswith("-busy.folded")
+    assert f"{__name__}:busy " in path.read_text()
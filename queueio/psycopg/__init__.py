@@ -0,0 +1,24 @@
+from collections.abc import Generator
+from contextlib import AbstractContextManager
+from contextlib import contextmanager
+
+from queueio.backend import Backend
+
+from .broker import PsycopgBroker
+from .journal import PsycopgJournal
+
+
+class PsycopgBackend(Backend):
+    def __init__(self, uri: str):
+        self.__uri = uri
+
+    @classmethod
+    @contextmanager
+    def connect(cls, uri: str, /) -> Generator[PsycopgBackend]:
+        yield cls(uri)
+
+    def broker(self) -> AbstractContextManager[PsycopgBroker]:
+        return PsycopgBroker.connect(self.__uri)
+
+    def journal(self) -> AbstractContextManager[PsycopgJournal]:
+        return PsycopgJournal.connect(self.__uri)
@@ -0,0 +1,137 @@
+"""WARNING: This module is a work in progress.
+
+The PsycopgBroker implementation has not been reviewed or tested against
+a PostgreSQL database, and may contain bugs or design flaws.
+You shouldn't use this yet.
+"""
+
+from collections.abc import Generator
+from collections.abc import Iterable
+from contextlib import contextmanager
+from contextlib import suppress
+from threading import Lock
+
+import psycopg
+
+from queueio.broker import Broker
+from queueio.queuespec import QueueSpec
+
+from .receiver import PsycopgReceiver
+
+
+class PsycopgBroker(Broker):
+    """A broker that queues messages in a PostgreSQL table.
+
+    Receivers claim batches of messages with ``FOR UPDATE SKIP LOCKED``,
+    and are woken by a notification on the queue's channel when messages
+    are enqueued.
+    """
+
+    @classmethod
+    @contextmanager
+    def connect(cls, uri: str) -> Generator[PsycopgBroker]:
+        broker = cls(uri)
+        try:
+            yield broker
+        finally:
+            broker.shutdown()
+
+    def __init__(self, uri: str):
+        self.__uri = uri
+        self.__conn = psycopg.connect(uri, autocommit=True)
+        self.__lock = Lock()
+        self.__receivers = set[PsycopgReceiver]()
+        self.__shutdown_lock = Lock()
+        self.__shutdown = False
+
+        with self.__lock, self.__conn.transaction():
+            self.__conn.execute("""
+                CREATE TABLE IF NOT EXISTS queueio_queues (
+                    name TEXT PRIMARY KEY,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+            """)
+            self.__conn.execute("""
+                CREATE TABLE IF NOT EXISTS queueio_tasks (
+                    id BIGSERIAL PRIMARY KEY,
+                    queue TEXT NOT NULL
+                        REFERENCES queueio_queues (name) ON DELETE CASCADE,
+                    body BYTEA NOT NULL,
+                    priority INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker_id TEXT,
+                    heartbeat TIMESTAMPTZ,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+            """)
+            # Claims scan only the pending rows, in the order they're claimed
+            self.__conn.execute("""
+                CREATE INDEX IF NOT EXISTS queueio_tasks_claimable
+                ON queueio_tasks (queue, priority DESC, id)
+                WHERE status = 'pending'
+            """)
+            # Heartbeats, reclaims, and returns scan only the processing rows
+            self.__conn.execute("""
+                CREATE INDEX IF NOT EXISTS queueio_tasks_processing
+                ON queueio_tasks (worker_id, heartbeat)
+                WHERE status = 'processing'
+            """)
+
+    def sync(self, queues: Iterable[str], *, recreate: bool = False):
+        queues = list(queues)
+        with self.__lock, self.__conn.transaction():
+            if recreate:
+                self.__conn.execute(
+                    t"DELETE FROM queueio_queues WHERE name = ANY({queues})"
+                )
+            self.__conn.execute(
+                t"""
+                INSERT INTO queueio_queues (name)
+                SELECT unnest({queues}::text[])
+                ON CONFLICT (name) DO NOTHING
+                """
+            )
+
+    def enqueue(self, body: bytes, /, *, queue: str, priority: int):
+        self.enqueue_many([body], queue=queue, priority=priority)
+
+    def enqueue_many(self, bodies: Iterable[bytes], /, *, queue: str, priority: int):
+        """Enqueue messages with a single multi-row insert and notification."""
+        bodies = list(bodies)
+        if not bodies:
+            return
+        # The notification is sent when the insert commits
+        with self.__lock:
+            self.__conn.execute(
+                t"""
+                WITH inserted AS (
+                    INSERT INTO queueio_tasks (queue, body, priority)
+                    SELECT {queue}, unnest({bodies}::bytea[]), {priority}
+                    RETURNING queue
+                )
+                SELECT pg_notify('queueio_tasks', {queue})
+                WHERE EXISTS (SELECT FROM inserted)
+                """
+            )
+
+    def purge(self, *, queue: str):
+        with self.__lock:
+            self.__conn.execute(t"DELETE FROM queueio_tasks WHERE queue = {queue}")
+
+    def receive(self, queuespec: QueueSpec, /) -> PsycopgReceiver:
+        receiver = PsycopgReceiver(self.__uri, queuespec)
+        self.__receivers.add(receiver)
+        return receiver
+
+    def shutdown(self):
+        with self.__shutdown_lock:
+            if self.__shutdown:
+                return
+            self.__shutdown = True
+
+            for receiver in set(self.__receivers):
+                receiver.shutdown()
+            self.__receivers.clear()
+
+            with suppress(Exception):
+                self.__conn.close()
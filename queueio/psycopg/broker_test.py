@@ -0,0 +1,61 @@
+import os
+import threading
+
+import pytest
+
+psycopg = pytest.importorskip(
+    "psycopg", reason="psycopg not available", exc_type=ImportError
+)
+
+from queueio.broker_test import BaseBrokerTest  # noqa: E402
+from queueio.queuespec import QueueSpec  # noqa: E402
+
+from . import PsycopgBackend  # noqa: E402
+
+PSYCOPG_TEST_URI = os.environ.get(
+    "QUEUEIO_PSYCOPG_TEST", "postgresql://postgres@localhost/queueio_test"
+)
+
+
+def psycopg_available() -> bool:
+    try:
+        conn = psycopg.connect(PSYCOPG_TEST_URI)
+        conn.close()
+        return True
+    except Exception:
+        return False
+
+
+pytestmark = pytest.mark.skipif(
+    not psycopg_available(), reason="PostgreSQL not available"
+)
+
+
+class TestPsycopgBroker(BaseBrokerTest):
+    supports_multiple_queues = True
+    supports_weighted_queue_subscriptions = True
+
+    @pytest.fixture
+    def broker(self):
+        with (
+            PsycopgBackend.connect(PSYCOPG_TEST_URI) as backend,
+            backend.broker() as broker,
+        ):
+            yield broker
+
+    def test_enqueue_many_is_received(self, broker):
+        """Messages enqueued in bulk are all received."""
+        broker.sync(["test-queue"])
+        broker.purge(queue="test-queue")
+        bodies = [f"msg{i}".encode() for i in range(10)]
+        broker.enqueue_many(bodies, queue="test-queue", priority=4)
+
+        received = []
+        receiver = broker.receive(QueueSpec(queues=["test-queue"], concurrency=10))
+        thread = threading.Thread(target=lambda: received.extend(receiver))
+        thread.start()
+        thread.join(timeout=0.5)
+        assert sorted(message.body for message in received) == sorted(bodies)
+
+        broker.shutdown()
+        thread.join(timeout=1.0)
@@ -1,13 +1,20 @@
 """WARNING: This module is a work in progress.
 
-The PsycopgJournal implementation has not been extensively reviewed. It passes
-the base test suite but may contain bugs or design flaws. You shouldn't use this yet.
+The PsycopgJournal implementation has not been extensively reviewed. It passed
+the base test suite before publishes were grouped and the journal was partitioned
+by day, which haven't been tested against a PostgreSQL database.
+It may contain bugs or design flaws. You shouldn't use this yet.
 """
 
 from collections.abc import Generator
 from collections.abc import Iterator
+from concurrent.futures import Future
 from contextlib import contextmanager
 from contextlib import suppress
+from datetime import UTC
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
 from threading import Lock
 
 import psycopg
@@ -16,30 +23,53 @@ from queueio.journal import Journal
 
 
 class PsycopgJournal(Journal):
+    """A journal of messages appended to a PostgreSQL table.
+
+    Concurrent publishes are grouped into a single multi-row insert, and
+    each insert notifies subscribers with the highest id that it inserted,
+    so subscribers that have already read that far don't query again.
+
+    The table is partitioned by day. Partitions older than the retention
+    are dropped, which is much cheaper than deleting their rows.
+    """
+
+    __max_batch = 1000
+    __fetch_size = 1000
+    __poll_interval = 1.0
+
     @classmethod
     @contextmanager
-    def connect(cls, uri: str) -> Generator[PsycopgJournal]:
-        journal = cls(uri)
+    def connect(
+        cls, uri: str, *, retention: timedelta = timedelta(days=7)
+    ) -> Generator[PsycopgJournal]:
+        journal = cls(uri, retention=retention)
         try:
             yield journal
         finally:
             journal.shutdown()
 
-    def __init__(self, uri: str):
+    def __init__(self, uri: str, *, retention: timedelta = timedelta(days=7)):
+        self.__retention = retention
         self.__publish_conn = psycopg.connect(uri, autocommit=True)
         self.__subscribe_conn = psycopg.connect(uri, autocommit=True)
         self.__publish_lock = Lock()
+        self.__pending_lock = Lock()
+        self.__pending = list[tuple[bytes, Future[None]]]()
+        self.__partitioned: date | None = None
         self.__shutdown_lock = Lock()
         self.__shutdown = False
 
         # Ensure schema exists
         self.__publish_conn.execute("""
             CREATE TABLE IF NOT EXISTS queueio_journal (
-                id BIGSERIAL PRIMARY KEY,
+                id BIGSERIAL,
                 body BYTEA NOT NULL,
-                created_at TIMESTAMPTZ NOT NULL DEFAULT now()
-            )
+                created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at)
         """)
+        with self.__publish_lock:
+            self.__partition()
 
         # LISTEN before SELECT to avoid race condition:
         # any NOTIFY after LISTEN will be buffered, and the subsequent
@@ -51,38 +81,140 @@ class PsycopgJournal(Journal):
         assert row is not None
         self.__last_id: int = row[0]
 
+    def __partition(self):
+        """Create partitions for today and tomorrow, and drop expired ones.
+
+        This runs when the date changes, with the publish lock held.
+        """
+        today = datetime.now(UTC).date()
+        if self.__partitioned == today:
+            return
+
+        # Journals created before partitioning keep their rows forever
+        row = self.__publish_conn.execute(
+            "SELECT relkind FROM pg_class WHERE oid = 'queueio_journal'::regclass"
+        ).fetchone()
+        if row is None or row[0] != "p":
+            self.__partitioned = today
+            return
+
+        for day in [today, today + timedelta(days=1)]:
+            name = f"queueio_journal_{day:%Y%m%d}"
+            start = datetime.combine(day, datetime.min.time(), UTC)
+            end = start + timedelta(days=1)
+            # Other journals may be creating the same partition
+            with suppress(psycopg.errors.DuplicateTable):
+                self.__publish_conn.execute(
+                    t"""
+                    CREATE TABLE IF NOT EXISTS {name:i}
+                    PARTITION OF queueio_journal
+                    FOR VALUES FROM ({start.isoformat():l}) TO ({end.isoformat():l})
+                    """
+                )
+
+        expired = f"queueio_journal_{today - self.__retention:%Y%m%d}"
+        partitions = self.__publish_conn.execute(
+            """
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = 'queueio_journal'::regclass
+            """
+        ).fetchall()
+        for (partition,) in partitions:
+            if partition < expired:
+                self.__publish_conn.execute(t"DROP TABLE IF EXISTS {partition:i}")
+
+        self.__partitioned = today
+
     def publish(self, message: bytes):
-        with self.__publish_lock, self.__publish_conn.transaction():
+        """Publish a message, grouped with any others waiting to publish.
+
+        The first publisher to take the publish lock inserts every message
+        that is waiting, while the others wait for it to finish.
+        """
+        future = Future[None]()
+        with self.__pending_lock:
+            self.__pending.append((message, future))
+
+        with self.__publish_lock:
+            if not future.done():
+                with self.__pending_lock:
+                    pending, self.__pending = self.__pending, []
+                for start in range(0, len(pending), self.__max_batch):
+                    self.__insert(pending[start : start + self.__max_batch])
+
+        future.result()
+
+    def __insert(self, batch: list[tuple[bytes, Future[None]]]):
+        bodies = [body for body, _ in batch]
+        try:
+            self.__partition()
             self.__publish_conn.execute(
-                t"INSERT INTO queueio_journal (body) VALUES ({message})"
+                t"""
+                WITH inserted AS (
+                    INSERT INTO queueio_journal (body)
+                    SELECT unnest({bodies}::bytea[])
+                    RETURNING id
+                )
+                SELECT pg_notify('queueio_journal', max(id)::text) FROM inserted
+                """
             )
-            self.__publish_conn.execute("NOTIFY queueio_journal")
+        except BaseException as exception:
+            for _, future in batch:
+                future.set_exception(exception)
+        else:
+            for _, future in batch:
+                future.set_result(None)
 
     def subscribe(self) -> Iterator[bytes]:
+        for messages in self.subscribe_many():
+            yield from messages
+
+    def subscribe_many(self) -> Iterator[list[bytes]]:
         try:
             while not self.__shutdown:
-                rows = self.__subscribe_conn.execute(
-                    t"""
-                    SELECT id, body FROM queueio_journal
-                    WHERE id > {self.__last_id}
-                    ORDER BY id
-                    """
-                ).fetchall()
+                caught_up = True
+                for batch in self.__catch_up():
+                    caught_up = False
+                    yield batch
 
-                for row in rows:
-                    self.__last_id = row[0]
-                    yield row[1]
-
-                if not rows and not self.__shutdown:
-                    # Wait for a notification to wake us up
-                    for _ in self.__subscribe_conn.notifies(timeout=1.0):
-                        break  # Got one, go back to query loop
+                if caught_up and not self.__shutdown:
+                    self.__wait()
         finally:
             with suppress(Exception):
                 self.__subscribe_conn.execute("UNLISTEN queueio_journal")
             with suppress(Exception):
                 self.__subscribe_conn.close()
 
+    def __catch_up(self) -> Iterator[list[bytes]]:
+        """Read the messages after the last id with a server-side cursor."""
+        with (
+            self.__subscribe_conn.transaction(),
+            self.__subscribe_conn.cursor(name="queueio_journal_catch_up") as cursor,
+        ):
+            cursor.execute(
+                t"""
+                SELECT id, body FROM queueio_journal
+                WHERE id > {self.__last_id}
+                ORDER BY id
+                """
+            )
+            while rows := cursor.fetchmany(self.__fetch_size):
+                self.__last_id = rows[-1][0]
+                yield [row[1] for row in rows]
+
+    def __wait(self):
+        """Wait for a notification of messages that haven't been read yet.
+
+        Notifications carry the highest id that was inserted, so those
+        for messages that were already read are skipped without a query.
+        """
+        for notify in self.__subscribe_conn.notifies(timeout=self.__poll_interval):
+            if self.__shutdown or not notify.payload:
+                return
+            if int(notify.payload) > self.__last_id:
+                return
+
     def shutdown(self):
         with self.__shutdown_lock:
             if self.__shutdown:
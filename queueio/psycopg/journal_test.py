@@ -1,4 +1,5 @@
 import os
+from datetime import timedelta
 
 import pytest
 
@@ -38,3 +39,34 @@ class TestPsycopgJournal(BaseJournalTest):
                 conn.execute("TRUNCATE queueio_journal")
 
             yield journal
+
+    def test_notification_skipped_when_already_read(self, journal):
+        journal.publish(b"first")
+        subscriber = journal.subscribe_many()
+        assert next(subscriber) == [b"first"]
+
+        # A stale notification doesn't wake the subscriber to query again
+        with psycopg.connect(PSYCOPG_TEST_URI, autocommit=True) as conn:
+            conn.execute("NOTIFY queueio_journal, '0'")
+        journal.publish(b"second")
+        assert next(subscriber) == [b"second"]
+
+
+def test_expired_partitions_are_dropped():
+    # Ensure the partitioned table exists
+    with PsycopgJournal.connect(PSYCOPG_TEST_URI):
+        pass
+
+    with psycopg.connect(PSYCOPG_TEST_URI, autocommit=True) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS queueio_journal_20000101
+            PARTITION OF queueio_journal
+            FOR VALUES FROM ('2000-01-01') TO ('2000-01-02')
+        """)
+
+    with PsycopgJournal.connect(PSYCOPG_TEST_URI, retention=timedelta(days=1)):
+        pass
+
+    with psycopg.connect(PSYCOPG_TEST_URI, autocommit=True) as conn:
+        row = conn.execute("SELECT to_regclass('queueio_journal_20000101')").fetchone()
+    assert row == (None,)
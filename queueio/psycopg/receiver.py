@@ -0,0 +1,222 @@
+"""WARNING: This module is a work in progress.
+
+The PsycopgReceiver implementation has not been reviewed or tested against
+a PostgreSQL database, and may contain bugs or design flaws.
+You shouldn't use this yet.
+"""
+
+from collections.abc import Iterator
+from contextlib import suppress
+from threading import Condition
+from threading import Event
+from threading import Lock
+
+import psycopg
+
+from queueio.id import random_id
+from queueio.message import Message
+from queueio.queuespec import QueueSpec
+from queueio.receiver import Receiver
+from queueio.rotation import Rotation
+from queueio.thread import Thread
+
+
+class PsycopgReceiver(Receiver):
+    """Receive messages by claiming them from the PostgreSQL tasks table.
+
+    Each claim takes as many messages as there is capacity in one round trip.
+    When there are none to claim, the receiver waits for a notification that
+    more were enqueued, or for the poll interval to pass.
+
+    Claimed messages are owned by the receiver's worker id, which heartbeats
+    to keep them. Messages with a heartbeat older than the lease timeout are
+    returned to be claimed again by the next heartbeat of any receiver, so
+    claims only scan the pending messages. On shutdown, unfinished messages
+    are returned to be claimed again.
+
+    The queues share the capacity. Queues with equal weights are claimed
+    from together. When the weights differ, each claim is split between the
+    queues by their turns in a weighted rotation, and the capacity that
+    queues without pending messages leave goes to the others. So a backlog
+    on one queue only gets its weighted share while the others are busy,
+    and no capacity is left idle while any queue has messages.
+    """
+
+    lease_timeout = 60.0
+    poll_interval = 1.0
+
+    def __init__(self, uri: str, queuespec: QueueSpec, /):
+        if len(queuespec.queues) == 0:
+            raise ValueError("Must specify at least one queue")
+
+        shares = queuespec.shares()
+        self.__queues = list(shares)
+        self.__rotation = Rotation(shares) if len(set(shares.values())) > 1 else None
+        self.__capacity = queuespec.concurrency
+        self.__worker_id = random_id()
+        self.__condition = Condition()
+        self.__ids = dict[Message, int]()
+        self.__shutdown = False
+        self.__stopping = Event()
+
+        # Claims and finishes share a connection, separate from listening
+        self.__lock = Lock()
+        self.__conn = psycopg.connect(uri, autocommit=True)
+        self.__listen_conn = psycopg.connect(uri, autocommit=True)
+        self.__listen_conn.execute("LISTEN queueio_tasks")
+
+        self.__heartbeat_thread = Thread(
+            target=self.__heartbeat, name="queueio-psycopg-heartbeat"
+        )
+        self.__heartbeat_thread.start()
+
+    def __heartbeat(self):
+        """Keep the claimed messages, and return those of dead receivers."""
+        while not self.__stopping.wait(self.lease_timeout / 3):
+            with self.__lock:
+                self.__conn.execute(
+                    t"""
+                    UPDATE queueio_tasks SET heartbeat = now()
+                    WHERE worker_id = {self.__worker_id} AND status = 'processing'
+                    """
+                )
+                returned = self.__conn.execute(
+                    t"""
+                    UPDATE queueio_tasks
+                    SET status = 'pending', worker_id = NULL, heartbeat = NULL
+                    WHERE status = 'processing'
+                    AND heartbeat < now() - make_interval(secs => {self.lease_timeout})
+                    """
+                ).rowcount
+                if returned:
+                    self.__conn.execute("NOTIFY queueio_tasks")
+
+    def __claim(self, capacity: int) -> list[tuple[int, bytes]]:
+        """Claim up to the capacity of pending messages."""
+        with self.__lock:
+            if self.__rotation is None:
+                return self.__claim_queues(self.__queues, capacity)
+
+            # Split what's left of the capacity again between the queues
+            # that had enough pending messages for their turns, or no turns
+            claimed = list[tuple[int, bytes]]()
+            busy = self.__queues
+            while capacity > 0 and busy:
+                limits = self.__rotation.split(capacity, busy)
+                busy = [queue for queue in busy if queue not in limits]
+                for queue, limit in limits.items():
+                    rows = self.__claim_queues([queue], limit)
+                    claimed.extend(rows)
+                    capacity -= len(rows)
+                    if len(rows) == limit:
+                        busy.append(queue)
+            return claimed
+
+    def __claim_queues(self, queues: list[str], limit: int) -> list[tuple[int, bytes]]:
+        rows = self.__conn.execute(
+            t"""
+            WITH claimed AS (
+                SELECT id FROM queueio_tasks
+                WHERE queue = ANY({queues}) AND status = 'pending'
+                ORDER BY priority DESC, id
+                LIMIT {limit}
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE queueio_tasks
+            SET status = 'processing',
+                worker_id = {self.__worker_id},
+                heartbeat = now()
+            FROM claimed
+            WHERE queueio_tasks.id = claimed.id
+            RETURNING queueio_tasks.id, queueio_tasks.body, queueio_tasks.priority
+            """
+        ).fetchall()
+        # Returned rows aren't ordered, so restore the claim order
+        rows.sort(key=lambda row: (-row[2], row[0]))
+        return [(id, body) for id, body, _ in rows]
+
+    def __wait_for_notification(self):
+        """Wait for messages to be enqueued, or for the poll interval."""
+        for _ in self.__listen_conn.notifies(timeout=self.poll_interval, stop_after=1):
+            pass
+
+    def __iter__(self) -> Iterator[Message]:
+        try:
+            while True:
+                # Wait for capacity to claim messages
+                with self.__condition:
+                    while self.__capacity <= 0 and not self.__shutdown:
+                        self.__condition.wait()
+                    if self.__shutdown:
+                        return
+                    capacity = self.__capacity
+
+                rows = self.__claim(capacity)
+                if not rows:
+                    self.__wait_for_notification()
+                    continue
+
+                with self.__condition:
+                    self.__capacity -= len(rows)
+
+                for id, body in rows:
+                    message = Message(body)
+                    self.__ids[message] = id
+                    yield message
+        except psycopg.Error:
+            # The connections are closed at shutdown
+            if not self.__shutdown:
+                raise
+
+    def pause(self, message: Message, /):
+        with self.__condition:
+            self.__capacity += 1
+            self.__condition.notify()
+
+    def unpause(self, message: Message, /):
+        with self.__condition:
+            self.__capacity -= 1
+
+    def finish(self, message: Message, /):
+        id = self.__ids.pop(message)
+        with self.__lock:
+            self.__conn.execute(
+                t"""
+                DELETE FROM queueio_tasks
+                WHERE id = {id}
+                AND worker_id = {self.__worker_id} AND status = 'processing'
+                """
+            )
+        with self.__condition:
+            self.__capacity += 1
+            self.__condition.notify()
+
+    def adjust(self, change: int, /):
+        with self.__condition:
+            self.__capacity += change
+            self.__condition.notify()
+
+    def shutdown(self):
+        with self.__condition:
+            if self.__shutdown:
+                return
+            self.__shutdown = True
+            self.__condition.notify_all()
+
+        self.__stopping.set()
+        self.__heartbeat_thread.join()
+
+        # Return unfinished messages to be claimed again, and wake the listener
+        with self.__lock, suppress(Exception):
+            self.__conn.execute(
+                t"""
+                UPDATE queueio_tasks
+                SET status = 'pending', worker_id = NULL, heartbeat = NULL
+                WHERE worker_id = {self.__worker_id} AND status = 'processing'
+                """
+            )
+            self.__conn.execute("NOTIFY queueio_tasks")
+        with suppress(Exception):
+            self.__conn.close()
+        with suppress(Exception):
+            self.__listen_conn.close()
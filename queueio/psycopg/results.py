@@ -0,0 +1,86 @@
+"""WARNING: This module is a work in progress.
+
+The PsycopgResultStore implementation has not been extensively reviewed.
+You shouldn't use this yet.
+"""
+
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextlib import suppress
+from threading import Lock
+from time import monotonic
+from typing import Any
+
+import psycopg
+
+import dill
+from queueio.result import Result
+from queueio.results import ResultStore
+
+
+class PsycopgResultStore(ResultStore):
+    """Store results in PostgreSQL, indexed by invocation id.
+
+    Expired results are ignored when they are looked up, and deleted
+    in bulk at most once per time to live when results are stored.
+    """
+
+    @classmethod
+    @contextmanager
+    def connect(
+        cls, uri: str, *, ttl: float | None = None
+    ) -> Generator[PsycopgResultStore]:
+        results = cls(uri, ttl=ttl)
+        try:
+            yield results
+        finally:
+            results.shutdown()
+
+    def __init__(self, uri: str, *, ttl: float | None = None):
+        self.__ttl = ttl
+        self.__purged = monotonic()
+        self.__lock = Lock()
+        self.__conn = psycopg.connect(uri, autocommit=True)
+        self.__conn.execute("""
+            CREATE TABLE IF NOT EXISTS queueio_results (
+                id TEXT PRIMARY KEY,
+                body BYTEA NOT NULL,
+                expires_at TIMESTAMPTZ
+            )
+        """)
+
+    def put(self, id: str, result: Result[Any, BaseException], /):
+        body = dill.dumps(result)
+        with self.__lock:
+            self.__conn.execute(
+                t"""
+                INSERT INTO queueio_results (id, body, expires_at)
+                VALUES (
+                    {id},
+                    {body},
+                    now() + make_interval(secs => {self.__ttl})
+                )
+                ON CONFLICT (id) DO UPDATE
+                SET body = EXCLUDED.body, expires_at = EXCLUDED.expires_at
+                """
+            )
+            if self.__ttl is not None and monotonic() - self.__purged >= self.__ttl:
+                self.__purged = monotonic()
+                self.__conn.execute(
+                    "DELETE FROM queueio_results WHERE expires_at <= now()"
+                )
+
+    def get(self, id: str, /) -> Result[Any, BaseException] | None:
+        with self.__lock:
+            row = self.__conn.execute(
+                t"""
+                SELECT body FROM queueio_results
+                WHERE id = {id}
+                AND (expires_at IS NULL OR expires_at > now())
+                """
+            ).fetchone()
+        return None if row is None else dill.loads(row[0])
+
+    def shutdown(self):
+        with self.__lock, suppress(Exception):
+            self.__conn.close()
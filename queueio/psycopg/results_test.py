@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+psycopg = pytest.importorskip(
+    "psycopg", reason="psycopg not available", exc_type=ImportError
+)
+
+from queueio.results_test import BaseResultStoreTest  # noqa: E402
+
+from .results import PsycopgResultStore  # noqa: E402
+
+PSYCOPG_TEST_URI = os.environ.get(
+    "QUEUEIO_PSYCOPG_TEST", "postgresql://postgres@localhost/queueio_test"
+)
+
+
+def psycopg_available() -> bool:
+    try:
+        conn = psycopg.connect(PSYCOPG_TEST_URI)
+        conn.close()
+        return True
+    except Exception:
+        return False
+
+
+pytestmark = pytest.mark.skipif(
+    not psycopg_available(), reason="PostgreSQL not available"
+)
+
+
+class TestPsycopgResultStore(BaseResultStoreTest):
+    @pytest.fixture
+    def results(self):
+        with PsycopgResultStore.connect(PSYCOPG_TEST_URI) as results:
+            # Truncate to isolate tests
+            with psycopg.connect(PSYCOPG_TEST_URI, autocommit=True) as conn:
+                conn.execute("TRUNCATE queueio_results")
+
+            yield results
+
+    @pytest.fixture
+    def expiring_results(self):
+        with PsycopgResultStore.connect(PSYCOPG_TEST_URI, ttl=0.1) as results:
+            with psycopg.connect(PSYCOPG_TEST_URI, autocommit=True) as conn:
+                conn.execute("TRUNCATE queueio_results")
+
+            yield results
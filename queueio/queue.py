@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 from collections import deque
+from collections.abc import Iterable
 from contextlib import ExitStack
+from functools import partial
 from threading import Lock
+from typing import Any
 
 from .select import SelectorGuard
+from .select import Withdraw
 from .select import selectmethod
 
 
@@ -16,6 +20,14 @@ class Collision(Exception):
     """Selectors from the same selection collided."""
 
 
+def _remove(waiters: deque[tuple[SelectorGuard[Any], Any]], guard: SelectorGuard):
+    """Remove a waiting guard, if it is still waiting."""
+    for i, (waiting_guard, _) in enumerate(waiters):
+        if waiting_guard is guard:
+            del waiters[i]
+            return
+
+
 class SwapQueue[L, R]:
     """A swap queue trades values between two sides atomically."""
 
@@ -31,7 +43,7 @@ class SwapQueue[L, R]:
         other_queue: deque[tuple[SelectorGuard[I], O]],
         guard: SelectorGuard[O],
         value: I,
-    ):
+    ) -> Withdraw | None:
         with self.__lock:
             if self.__shutdown:
                 with guard as selector:
@@ -49,20 +61,26 @@ class SwapQueue[L, R]:
                         break
                 else:
                     queue.append((guard, value))
-                    return
+                    return partial(self.__withdraw, queue, guard)
 
                 with guard as selector:
                     if selector:
                         selector.result(other_value)
                         other_selector.result(value)
 
+    def __withdraw(
+        self, queue: deque[tuple[SelectorGuard[Any], Any]], guard: SelectorGuard
+    ):
+        with self.__lock:
+            _remove(queue, guard)
+
     @selectmethod
     def left(self, guard: SelectorGuard[R], value: L):
-        self.__swap(self.__left, self.__right, guard, value)
+        return self.__swap(self.__left, self.__right, guard, value)
 
     @selectmethod
     def right(self, guard: SelectorGuard[L], value: R):
-        self.__swap(self.__right, self.__left, guard, value)
+        return self.__swap(self.__right, self.__left, guard, value)
 
     def shutdown(self):
         with self.__lock:
@@ -104,66 +122,127 @@ class Queue[T]:
         self.__full_shutdown: bool = False
         self.__maxsize = maxsize
         self.__queue = deque[T]()
-        self.__putters = deque[tuple[SelectorGuard[None], T]]()
-        self.__getters = deque[tuple[SelectorGuard[T], None]]()
+        # Putters carry all the values they will add. Getters carry the
+        # maximum number of values to take, or None for a single value.
+        self.__putters = deque[tuple[SelectorGuard[None], list[T]]]()
+        self.__getters = deque[tuple[SelectorGuard[Any], int | None]]()
 
-    @selectmethod
-    def get(self, guard: SelectorGuard[T]):
-        """Obtain a selectable to get a value from the queue."""
+    def __fits(self, count: int) -> bool:
+        return not self.__maxsize or len(self.__queue) + count <= self.__maxsize
+
+    def __take(self, count: int | None) -> T | list[T]:
+        if count is None:
+            return self.__queue.popleft()
+        return [self.__queue.popleft() for _ in range(min(count, len(self.__queue)))]
+
+    def __transfer(self):
+        """Hand values from waiting putters through the queue to waiting getters.
+
+        Guards that were abandoned by their selection are discarded.
+        """
+        while True:
+            if self.__putters and self.__fits(len(self.__putters[0][1])):
+                guard, values = self.__putters.popleft()
+                with guard as selector:
+                    if selector:
+                        selector.result(None)
+                        self.__queue.extend(values)
+            elif self.__getters and self.__queue:
+                guard, count = self.__getters.popleft()
+                with guard as selector:
+                    if selector:
+                        selector.result(self.__take(count))
+            else:
+                break
+
+    def __withdraw(
+        self, waiters: deque[tuple[SelectorGuard[Any], Any]], guard: SelectorGuard
+    ):
+        with self.__lock:
+            _remove(waiters, guard)
+            # A withdrawn putter may have been holding back smaller putters
+            self.__transfer()
+
+    def __get(self, guard: SelectorGuard[Any], count: int | None) -> Withdraw | None:
+        withdraw = None
         with self.__lock:
             if self.__full_shutdown:
                 with guard as selector:
                     if selector:
                         selector.error(ShutDown())
-                    return
+                    return None
 
             if self.__queue:
                 with guard as selector:
                     if selector:
-                        value = self.__queue.popleft()
-                        selector.result(value)
+                        selector.result(self.__take(count))
             else:
-                self.__getters.append((guard, None))
+                self.__getters.append((guard, count))
+                withdraw = partial(self.__withdraw, self.__getters, guard)
+
+            self.__transfer()
 
             if not self.__queue and self.__half_shutdown:
                 self.__full_shutdown = True
+        return withdraw
 
-            while (
-                self.__maxsize and self.__putters and self.__maxsize > len(self.__queue)
-            ):
-                other_guard, other_value = self.__putters.popleft()
-                with other_guard as other_selector:
-                    if other_selector:
-                        other_selector.result(None)
-                        self.__queue.append(other_value)
-
-    @selectmethod
-    def put(self, guard: SelectorGuard[None], value: T):
-        """Obtain a selectable to put the value on the queue."""
+    def __put(self, guard: SelectorGuard[None], values: list[T]) -> Withdraw | None:
+        withdraw = None
         with self.__lock:
             if self.__half_shutdown:
                 with guard as selector:
                     if selector:
                         selector.error(ShutDown())
-                    return
+                    return None
 
-            if not self.__maxsize or len(self.__queue) < self.__maxsize:
+            # Waiting putters go first, so a small put can't overtake a large one
+            if not self.__putters and self.__fits(len(values)):
                 with guard as selector:
                     if selector:
                         selector.result(None)
-                        self.__queue.append(value)
+                        self.__queue.extend(values)
             else:
-                self.__putters.append((guard, value))
+                self.__putters.append((guard, values))
+                withdraw = partial(self.__withdraw, self.__putters, guard)
 
-            while self.__getters and self.__queue:
-                other_guard, other_value = self.__getters.popleft()
-                queue_value = self.__queue.popleft()
-                with other_guard as other_selector:
-                    if other_selector:
-                        other_selector.result(queue_value)
-                    else:
-                        self.__getters.appendleft((other_guard, other_value))
-                        self.__queue.appendleft(queue_value)
+            self.__transfer()
+        return withdraw
+
+    @selectmethod
+    def get(self, guard: SelectorGuard[T]):
+        """Obtain a selectable to get a value from the queue."""
+        return self.__get(guard, None)
+
+    @selectmethod
+    def get_many(self, guard: SelectorGuard[list[T]], max_items: int):
+        """Obtain a selectable to get up to max_items values from the queue.
+
+        Waits until at least one value is available, then takes as many
+        values as are available, up to max_items, in a single operation.
+        """
+        if max_items <= 0:
+            raise ValueError(f"max_items must be a positive integer, got: {max_items}")
+        return self.__get(guard, max_items)
+
+    @selectmethod
+    def put(self, guard: SelectorGuard[None], value: T):
+        """Obtain a selectable to put the value on the queue."""
+        return self.__put(guard, [value])
+
+    @selectmethod
+    def put_many(self, guard: SelectorGuard[None], values: Iterable[T]):
+        """Obtain a selectable to put all the values on the queue.
+
+        The values are added together in a single operation, waiting until
+        there is room in the queue for all of them.
+        """
+        values = list(values)
+        if self.__maxsize and len(values) > self.__maxsize:
+            raise ValueError(
+                f"Cannot put {len(values)} values on a queue "
+                f"with maxsize {self.__maxsize}"
+            )
+        return self.__put(guard, values)
 
     def shutdown(self, *, immediate: bool = False):
         with self.__lock:
@@ -403,6 +403,199 @@ class TestQueue:
         index, result = select([queue.get.select()])
         assert result == "item1"
 
+    def test_abandoned_getter_does_not_block_put(self):
+        """A getter abandoned by its selection is skipped by later puts."""
+        queue1 = Queue[str]()
+        queue2 = Queue[str]()
+
+        def multi_queue_get():
+            return select([queue1.get.select(), queue2.get.select()])
+
+        thread = Thread(target=multi_queue_get)
+        thread.start()
+        time.sleep(0.1)
+
+        queue1.put("first")
+        thread.join()
+        assert thread.future.result() == (0, "first")
+
+        # queue2 still holds the abandoned getter
+        queue2.put("second")
+        assert queue2.get() == "second"
+
+    def test_put_many_get_many(self):
+        """Batches of values move through the queue in order."""
+        queue = Queue[int]()
+
+        queue.put_many([1, 2, 3, 4, 5])
+
+        assert queue.get_many(2) == [1, 2]
+        assert queue.get_many(10) == [3, 4, 5]
+
+    def test_get_many_waits_for_values(self):
+        """get_many waits for at least one value, then takes what's available."""
+        queue = Queue[int]()
+
+        getter_thread = Thread(target=queue.get_many, args=(10,))
+        getter_thread.start()
+        time.sleep(0.1)
+        assert getter_thread.is_alive()
+
+        queue.put_many([1, 2, 3])
+        getter_thread.join()
+
+        assert getter_thread.future.result() == [1, 2, 3]
+
+    def test_put_many_respects_maxsize(self):
+        """put_many waits until there is room for all the values."""
+        queue = Queue[int](maxsize=3)
+        queue.put_many([1, 2])
+
+        putter_thread = Thread(target=queue.put_many, args=([3, 4],))
+        putter_thread.start()
+        time.sleep(0.1)
+        assert putter_thread.is_alive()
+
+        assert queue.get() == 1
+        putter_thread.join()
+
+        assert queue.get_many(10) == [2, 3, 4]
+
+    def test_put_many_larger_than_maxsize(self):
+        """put_many rejects more values than could ever fit."""
+        queue = Queue[int](maxsize=2)
+
+        with pytest.raises(ValueError, match="maxsize"):
+            queue.put_many([1, 2, 3])
+
+    def test_get_many_rejects_non_positive_max_items(self):
+        queue = Queue[int]()
+
+        with pytest.raises(ValueError, match="max_items"):
+            queue.get_many(0)
+
+    def test_batch_operations_select_with_single_operations(self):
+        """Batch operations can be selected alongside single operations."""
+        queue1 = Queue[int]()
+        queue2 = Queue[int]()
+        queue2.put_many([1, 2])
+
+        index, result = select([queue1.get.select(), queue2.get_many.select(5)])
+
+        assert index == 1
+        assert result == [1, 2]
+
+    def test_batch_operations_shutdown(self):
+        """Batch operations follow both shutdown modes."""
+        queue = Queue[int]()
+        queue.put_many([1, 2, 3])
+        queue.shutdown()
+
+        with pytest.raises(ShutDown):
+            queue.put_many([4])
+        assert queue.get_many(2) == [1, 2]
+        assert queue.get_many(2) == [3]
+        with pytest.raises(ShutDown):
+            queue.get_many(2)
+
+        immediate = Queue[int]()
+        immediate.put_many([1, 2, 3])
+        immediate.shutdown(immediate=True)
+
+        with pytest.raises(ShutDown):
+            immediate.get_many(2)
+
+    def test_get_timeout(self):
+        """A get that times out is withdrawn and doesn't take a later value."""
+        queue = Queue[str]()
+
+        with pytest.raises(TimeoutError):
+            queue.get.within(0.05)()
+
+        queue.put("value")
+        assert queue.get.within(0.05)() == "value"
+
+    def test_put_timeout(self):
+        """A put that times out is withdrawn without adding its value."""
+        queue = Queue[str](maxsize=1)
+        queue.put("first")
+
+        with pytest.raises(TimeoutError):
+            queue.put.within(0.05)("second")
+
+        assert queue.get() == "first"
+        with pytest.raises(TimeoutError):
+            queue.get.within(0.05)()
+
+    def test_withdrawn_putter_releases_waiting_putters(self):
+        """Withdrawing a large waiting put lets smaller waiting puts proceed."""
+        queue = Queue[int](maxsize=3)
+        queue.put_many([1, 2])
+
+        large_putter = Thread(target=queue.put_many.within(0.1), args=([3, 4],))
+        large_putter.start()
+        time.sleep(0.05)
+        small_putter = Thread(target=queue.put, args=(5,))
+        small_putter.start()
+
+        large_putter.join()
+        small_putter.join()
+
+        with pytest.raises(TimeoutError):
+            large_putter.future.result()
+        assert small_putter.future.result() is None
+        assert queue.get_many(10) == [1, 2, 5]
+
+    def test_within_times_out_from_each_call(self):
+        """The timeout starts when the operation is called, not created."""
+        queue = Queue[str]()
+        get = queue.get.within(0.1)
+
+        time.sleep(0.15)
+        queue.put("value")
+        assert get() == "value"
+
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            get()
+        assert time.monotonic() - start >= 0.1
+
+    def test_get_deadline(self):
+        """An absolute deadline from time.monotonic() is honored."""
+        queue = Queue[str]()
+
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            queue.get.within(deadline=start + 0.05)()
+        assert time.monotonic() - start >= 0.05
+
+    def test_select_timeout_across_queues(self):
+        """A timed out select withdraws from every queue it waited on."""
+        queue1 = Queue[str]()
+        queue2 = Queue[str]()
+
+        with pytest.raises(TimeoutError):
+            select([queue1.get.select(), queue2.get.select()], timeout=0.05)
+
+        queue1.put("first")
+        queue2.put("second")
+        assert queue1.get() == "first"
+        assert queue2.get() == "second"
+
+    def test_select_earliest_of_timeout_and_deadline(self):
+        queue = Queue[str]()
+
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            select([queue.get.select()], timeout=0.05, deadline=start + 10)
+        assert time.monotonic() - start < 5
+
+    def test_select_succeeds_before_timeout(self):
+        queue = Queue[str]()
+        queue.put("value")
+
+        assert select([queue.get.select()], timeout=0) == (0, "value")
+
 
 class TestSwapQueue:
     def test_basic_swap(self):
@@ -631,6 +824,20 @@ class TestSwapQueue:
         with pytest.raises(Collision):
             thread2.future.result()
 
+    def test_swap_timeout(self):
+        """A swap that times out is withdrawn from its side of the queue."""
+        queue = SwapQueue[str, int]()
+
+        with pytest.raises(TimeoutError):
+            queue.left.within(0.05)("withdrawn")
+
+        right_thread = Thread(target=queue.right, args=(42,))
+        right_thread.start()
+        time.sleep(0.05)
+        assert queue.left("hello") == 42
+        right_thread.join()
+        assert right_thread.future.result() == "hello"
+
 
 class TestSyncQueue:
     def test_basic_put_get(self):
@@ -727,3 +934,12 @@ class TestSyncQueue:
         assert put_result is None
         assert isinstance(get_result, str)
         assert get_result == "test"
+
+    def test_sync_queue_timeout(self):
+        """Timed out puts and gets on a SyncQueue are withdrawn."""
+        queue = SyncQueue[str]()
+
+        with pytest.raises(TimeoutError):
+            queue.put.within(0.05)("withdrawn")
+        with pytest.raises(TimeoutError):
+            queue.get.within(0.05)()
@@ -3,34 +3,59 @@ import os
 import tomllib
 from collections.abc import Generator
 from collections.abc import Iterable
+from collections.abc import Mapping
 from concurrent.futures import Future
 from contextlib import AbstractContextManager
 from contextlib import contextmanager
+from contextlib import nullcontext
+from contextlib import suppress
 from contextvars import ContextVar
+from functools import cache
 from pathlib import Path
+from threading import Lock
+from time import monotonic
+from typing import Any
 from typing import Self
 
 from .backend import Backend
 from .broker import Broker
+from .cache import Cache
 from .consumer import Consumer
 from .django import setup as _django_setup
+from .event import Event
 from .invocation import Invocation
 from .journal import Journal
+from .manifest import Manifest
 from .message import Message
+from .metrics import Metrics
+from .profiler import Profiler
 from .queue import Queue
 from .queue import ShutDown
 from .queuespec import QueueSpec
 from .queuevar import QueueVar
+from .registry import ROUTINE_MODULES
 from .registry import ROUTINE_REGISTRY
+from .registry import lookup
 from .result import Err
 from .result import Ok
+from .results import ResultStore
 from .routine import Routine
+from .routine import Verbosity
 from .stream import Stream
 from .thread import Thread
+from .tracing import Tracer
 
 priority: QueueVar[int] = QueueVar("priority", default=4)
 
 
+@cache
+def _load_config(pyproject: Path, mtime_ns: int) -> dict:
+    """Parse the queueio configuration, once for each version of the file."""
+    with pyproject.open("rb") as f:
+        config = tomllib.load(f)
+    return config.get("tool", {}).get("queueio", {})
+
+
 class QueueIO:
     __active = ContextVar[Self | None]("active", default=None)
 
@@ -43,14 +68,34 @@ class QueueIO:
 
     @classmethod
     @contextmanager
-    def default(cls) -> Generator[Self]:
-        """Create a QueueIO from configuration with proper lifecycle management."""
+    def default(
+        cls,
+        *,
+        metrics: Metrics | None = None,
+        tracer: Tracer | None = None,
+        profiler: Profiler | None = None,
+        events: Mapping[str, Verbosity] | None = None,
+    ) -> Generator[Self]:
+        """Create a QueueIO from configuration with proper lifecycle management.
+
+        The event verbosity of queues is configured in [tool.queueio.events],
+        and may be overridden by the given events.
+        """
         with (
             cls.__connect() as backend,
             backend.broker() as broker,
             backend.journal() as journal,
+            cls.__connect_results() as results,
         ):
-            instance = cls(broker=broker, journal=journal)
+            instance = cls(
+                broker=broker,
+                journal=journal,
+                results=results,
+                metrics=metrics,
+                tracer=tracer,
+                profiler=profiler,
+                events={**cls.__events(), **(events or {})},
+            )
             try:
                 yield instance
             finally:
@@ -61,11 +106,23 @@ class QueueIO:
         *,
         broker: Broker,
         journal: Journal,
+        results: ResultStore | None = None,
+        metrics: Metrics | None = None,
+        tracer: Tracer | None = None,
+        profiler: Profiler | None = None,
+        events: Mapping[str, Verbosity] | None = None,
     ):
         self.__broker = broker
+        self.__results = results
+        self.__metrics = metrics
+        self.__tracer = tracer
+        self.__profiler = profiler
+        # The verbosity of each queue, and of each routine as it's used
+        self.__queue_verbosity = dict(events or {})
+        self.__verbosity = dict[str, Verbosity]()
         self.__stream = Stream(journal)
         self.__invocations = dict[Invocation, Message]()
-        self.__register_routines()
+        self.register_routines()
 
     @contextmanager
     def activate(self):
@@ -89,9 +146,7 @@ class QueueIO:
     def __config() -> dict:
         pyproject = QueueIO.__pyproject()
         if pyproject:
-            with pyproject.open("rb") as f:
-                config = tomllib.load(f)
-            return config.get("tool", {}).get("queueio", {})
+            return _load_config(pyproject, pyproject.stat().st_mtime_ns)
         return {}
 
     @staticmethod
@@ -113,20 +168,102 @@ class QueueIO:
 
             return PikaBackend.connect(uri)
         if uri.startswith("postgresql://") or uri.startswith("postgres://"):
-            raise ValueError("Broker 'psycopg' is not yet implemented.")
+            from .psycopg import PsycopgBackend
+
+            return PsycopgBackend.connect(uri)
+        if uri.startswith("sqlite://"):
+            from .sqlite import SqliteBackend
+
+            return SqliteBackend.connect(uri.removeprefix("sqlite://"))
+        if uri.startswith("unix://"):
+            from .unix import UnixBackend
+
+            return UnixBackend.connect(uri.removeprefix("unix://"))
         raise ValueError(f"Unsupported URI scheme: {uri}")
 
-    def __register_routines(self):
-        """Load routine modules from pyproject.toml."""
+    @staticmethod
+    def __connect_results() -> AbstractContextManager[ResultStore | None]:
+        config = QueueIO.__config()
+        uri = os.environ.get("QUEUEIO_RESULTS") or config.get("results")
+        if not uri:
+            return nullcontext()
+        raw_ttl = os.environ.get("QUEUEIO_RESULTS_TTL") or config.get("results_ttl")
+        ttl = float(raw_ttl) if raw_ttl else None
+        if uri == "memory://":
+            from .stub.results import StubResultStore
+
+            return StubResultStore.create(ttl=ttl)
+        if uri.startswith("sqlite://"):
+            from .sqlite.results import SqliteResultStore
+
+            return SqliteResultStore.connect(uri.removeprefix("sqlite://"), ttl=ttl)
+        if uri.startswith("postgresql://") or uri.startswith("postgres://"):
+            from .psycopg.results import PsycopgResultStore
+
+            return PsycopgResultStore.connect(uri, ttl=ttl)
+        raise ValueError(f"Unsupported result store URI scheme: {uri}")
+
+    @staticmethod
+    def __events() -> dict[str, Verbosity]:
+        events = dict[str, Verbosity]()
+        for queue, level in QueueIO.__config().get("events", {}).items():
+            try:
+                events[queue] = Verbosity(level)
+            except ValueError:
+                levels = ", ".join(repr(str(v)) for v in Verbosity)
+                raise ValueError(
+                    f"Invalid event verbosity {level!r} for queue {queue!r} "
+                    f"in [tool.queueio.events]. Use one of {levels}."
+                ) from None
+        return events
+
+    @staticmethod
+    def __manifest() -> Manifest | None:
+        pyproject = QueueIO.__pyproject()
+        path = QueueIO.__config().get("manifest")
+        if pyproject is None or path is None:
+            return None
+        return Manifest.load(pyproject.parent / path)
+
+    @staticmethod
+    def register_routines(*, manifest: bool = True):
+        """Load routine modules from pyproject.toml.
+
+        This doesn't need a connection, so commands that only inspect
+        routines can load them without connecting to the broker.
+
+        When a routine manifest is configured, routine modules are not
+        imported until their routines are used, or they're imported with
+        import_routines(). Pass manifest=False to import them regardless.
+        """
         for hook in [_django_setup]:
             hook()
 
+        if manifest and (routines := QueueIO.__manifest()) is not None:
+            ROUTINE_MODULES.update(
+                {name: entry.module for name, entry in routines.routines.items()}
+            )
+            return
+
         config = QueueIO.__config()
         modules = config.get("register", [])
 
         for module_name in modules:
             importlib.import_module(module_name)
 
+    @staticmethod
+    def import_routines(queues: Iterable[str] | None = None):
+        """Import the modules of routines from the manifest.
+
+        Import the modules of routines on the given queues, or all of them,
+        so that the routines don't wait to be imported when they're used.
+        """
+        if (manifest := QueueIO.__manifest()) is None:
+            return
+
+        for module_name in manifest.modules(queues):
+            importlib.import_module(module_name)
+
     def run[R](self, invocation: Invocation[R], /) -> R:
         with self.invocation_handler():
             return invocation.submit().result()
@@ -138,10 +275,32 @@ class QueueIO:
         self.__broker.purge(queue=queue)
 
     def routine(self, routine_name: str, /) -> Routine:
-        return ROUTINE_REGISTRY[routine_name]
+        return lookup(routine_name)
+
+    def verbosity(self, routine_name: str, /) -> Verbosity:
+        """Which lifecycle events are published for invocations of a routine.
+
+        A routine's own verbosity takes precedence over its queue's.
+        Routines with a cache or single-flight publish their submissions.
+        """
+        if (verbosity := self.__verbosity.get(routine_name)) is None:
+            try:
+                routine = lookup(routine_name)
+            except KeyError:
+                return Verbosity.FULL
+            verbosity = routine.events or self.__queue_verbosity.get(
+                routine.queue, Verbosity.FULL
+            )
+            if verbosity is Verbosity.COMPLETIONS and (
+                routine.cache is not None or routine.singleflight is not None
+            ):
+                verbosity = Verbosity.TERMINAL
+            self.__verbosity[routine_name] = verbosity
+        return verbosity
 
     def routines(self) -> list[Routine]:
         """Return all registered routines."""
+        self.import_routines()
         return list(ROUTINE_REGISTRY.values())
 
     def subscribe[T](self, types: Iterable[type[T]]) -> Queue[T]:
@@ -150,10 +309,39 @@ class QueueIO:
     def unsubscribe(self, queue: Queue):
         return self.__stream.unsubscribe(queue)
 
+    def publish(self, event: Event, /):
+        """Publish an event to all subscribers."""
+        self.__stream.publish(event)
+
     @contextmanager
     def invocation_handler(self) -> Generator[Future]:
-        waiting: dict[str, Future] = {}
-        events = self.subscribe({Invocation.Completed})
+        lock = Lock()
+        waiting: dict[str, list[Future]] = {}
+        # Keys of submitted invocations of cached routines, to fill the cache
+        caching: dict[str, tuple[Cache, str]] = {}
+        # In-flight invocations of single-flight routines by key, with the
+        # time that their leases expire, and the keys of those invocations.
+        flights: dict[str, tuple[str, float]] = {}
+        flight_keys: dict[str, str] = {}
+        # Invocations that failed to enqueue, until their completion arrives
+        failed: set[str] = set()
+
+        events = self.subscribe({Invocation.Submitted, Invocation.Completed})
+
+        def fly(key: str, invocation_id: str, lease: float):
+            """Record an in-flight invocation, unless its key has another."""
+            current = flights.get(key)
+            if current is None or current[1] <= monotonic():
+                flights[key] = (invocation_id, monotonic() + lease)
+                flight_keys[invocation_id] = key
+
+        def land(invocation_id: str) -> list[Future]:
+            """Remove a completed invocation, returning its waiting futures."""
+            caching.pop(invocation_id, None)
+            key = flight_keys.pop(invocation_id, None)
+            if key is not None and flights.get(key, ("", 0))[0] == invocation_id:
+                del flights[key]
+            return waiting.pop(invocation_id, [])
 
         def resolver():
             while True:
@@ -163,22 +351,85 @@ class QueueIO:
                     break
 
                 match event:
+                    case Invocation.Submitted(
+                        id=invocation_id, routine=name, args=args, kwargs=kwargs
+                    ):
+                        try:
+                            routine = lookup(name)
+                        except KeyError:
+                            continue
+                        with lock:
+                            if invocation_id in failed:
+                                continue
+                            if routine.cache is not None:
+                                key = Cache.key(name, args, kwargs)
+                                caching[invocation_id] = (routine.cache, key)
+                            if routine.singleflight is not None:
+                                key = routine.singleflight.key(name, args, kwargs)
+                                fly(key, invocation_id, routine.singleflight.lease)
                     case Invocation.Completed(id=invocation_id, result=Ok(value)):
-                        if invocation_id in waiting:
-                            future = waiting.pop(invocation_id)
-                            future.set_result(value)
+                        with lock:
+                            if invocation_id in caching:
+                                cache, key = caching[invocation_id]
+                                cache.set(key, value)
+                            futures = land(invocation_id)
+                        for future in futures:
+                            if not future.done():
+                                future.set_result(value)
                     case Invocation.Completed(id=invocation_id, result=Err(exception)):
-                        if invocation_id in waiting:
-                            future = waiting.pop(invocation_id)
-                            future.set_exception(exception)
+                        with lock:
+                            failed.discard(invocation_id)
+                            futures = land(invocation_id)
+                        for future in futures:
+                            if not future.done():
+                                future.set_exception(exception)
 
         resolver_thread = Thread(target=resolver)
         resolver_thread.start()
 
         def handler(invocation: Invocation, /) -> Future:
             future = Future()
-            waiting[invocation.id] = future
-            self.submit(invocation)
+            routine = self.routine(invocation.routine)
+            args, kwargs = invocation.args, invocation.kwargs
+            if routine.cache is not None:
+                key = Cache.key(invocation.routine, args, kwargs)
+                if (result := routine.cache.get(key)) is not None:
+                    future.set_result(result.value)
+                    return future
+
+            with lock:
+                if routine.singleflight is not None:
+                    key = routine.singleflight.key(invocation.routine, args, kwargs)
+                    flight = flights.get(key)
+                    if flight is not None:
+                        flight_id, expires = flight
+                        if monotonic() < expires:
+                            waiting.setdefault(flight_id, []).append(future)
+                            return future
+                        # Wait for the new invocation instead of the lost one
+                        waiting.setdefault(invocation.id, []).extend(
+                            waiting.pop(flight_id, [])
+                        )
+                    fly(key, invocation.id, routine.singleflight.lease)
+                waiting.setdefault(invocation.id, []).append(future)
+            try:
+                self.submit(invocation)
+            except Exception as exception:
+                # The invocation wasn't enqueued, so submissions that joined
+                # its flight fail with it instead of waiting for the lease.
+                with lock:
+                    failed.add(invocation.id)
+                    futures = land(invocation.id)
+                for joined in futures:
+                    if not joined.done():
+                        joined.set_exception(exception)
+                # Its submitted event may have been published, so complete it
+                # for the processes and the resolver that would wait for it.
+                with suppress(Exception):
+                    self.__stream.publish(
+                        Invocation.Completed(id=invocation.id, result=Err(exception))
+                    )
+                raise
             return future
 
         try:
@@ -188,30 +439,63 @@ class QueueIO:
             self.unsubscribe(events)
             resolver_thread.join()
 
+    def result(self, invocation_id: str, /, *, timeout: float | None = None) -> Any:
+        """Wait for the result of an invocation from the result store.
+
+        Returns the value of a successful invocation, or raises the exception
+        of a failed one, even if it completed before this was called.
+        """
+        if self.__results is None:
+            raise RuntimeError("No result store is configured")
+        match self.__results.wait(invocation_id, timeout=timeout):
+            case Ok(value):
+                return value
+            case Err(exception):
+                raise exception
+
     def submit(self, invocation: Invocation, /):
         """Submit an invocation to be run in the background."""
         routine = self.routine(invocation.routine)
-        self.__stream.publish(
-            Invocation.Submitted(
-                id=invocation.id,
-                routine=invocation.routine,
-                args=invocation.args,
-                kwargs=invocation.kwargs,
-                context=invocation.context,
-            )
-        )
         queue = routine.queue
-        self.__broker.enqueue(
-            invocation.serialize(),
-            queue=queue,
-            priority=invocation.context.get(priority, priority.get()),
+        tracing = (
+            nullcontext()
+            if self.__tracer is None
+            else self.__tracer.enqueue(invocation, queue=queue)
         )
+        with tracing:
+            if self.verbosity(invocation.routine) is not Verbosity.COMPLETIONS:
+                self.__stream.publish(
+                    Invocation.Submitted(
+                        id=invocation.id,
+                        routine=invocation.routine,
+                        args=invocation.args,
+                        kwargs=invocation.kwargs,
+                        context=invocation.context,
+                    )
+                )
+            self.__broker.enqueue(
+                invocation.serialize(),
+                queue=queue,
+                priority=invocation.context.get(priority, priority.get()),
+            )
+        if self.__metrics is not None:
+            self.__metrics.enqueued(invocation, queue=queue)
 
-    def consume(self, queuespec: QueueSpec, /) -> Consumer:
+    def consume(
+        self, queuespec: QueueSpec, /, *, max_suspended: int | None = None
+    ) -> Consumer:
         return Consumer(
             stream=self.__stream,
             receiver=self.__broker.receive(queuespec),
             deserialize=Invocation.deserialize,
+            max_suspended=max_suspended,
+            results=self.__results,
+            metrics=None
+            if self.__metrics is None
+            else self.__metrics.consumer(queuespec),
+            tracer=self.__tracer,
+            profiler=self.__profiler,
+            verbosity=self.verbosity,
         )
 
     def shutdown(self):
@@ -1,8 +1,11 @@
 import os
+from threading import Event
 
 import pytest
 
 from .queueio import QueueIO
+from .queuespec import QueueSpec
+from .registry import ROUTINE_MODULES
 from .registry import ROUTINE_REGISTRY
 from .stub import StubBackend
 
@@ -244,8 +247,9 @@ def test_queueio_with_invalid_environment_variable(monkeypatch):
         ROUTINE_REGISTRY.update(original_registry)
 
 
-def test_queueio_with_psycopg_not_yet_implemented(tmp_path):
-    """QueueIO recognizes psycopg broker but it is not yet implemented."""
+def test_queueio_with_psycopg_broker(tmp_path):
+    """QueueIO connects to a psycopg broker for postgresql URIs."""
+    psycopg = pytest.importorskip("psycopg")
 
     config_dir = tmp_path / "psycopg_config"
     config_dir.mkdir()
@@ -256,7 +260,7 @@ def test_queueio_with_psycopg_not_yet_implemented(tmp_path):
         version = "0.1.0"
 
         [tool.queueio]
-        broker = "postgresql://localhost:5432"
+        broker = "postgresql://localhost:1/queueio"
         """)
 
     original_cwd = os.getcwd()
@@ -267,7 +271,7 @@ def test_queueio_with_psycopg_not_yet_implemented(tmp_path):
 
     try:
         with (
-            pytest.raises(ValueError, match="not yet implemented"),
+            pytest.raises(psycopg.OperationalError),
             QueueIO.default(),
         ):
             pass
@@ -307,3 +311,387 @@ def test_queueio_with_no_broker_configured(tmp_path):
         os.chdir(original_cwd)
         ROUTINE_REGISTRY.clear()
         ROUTINE_REGISTRY.update(original_registry)
+
+
+def test_invocation_handler_uses_routine_cache():
+    """Invocations of cached routines complete from the cache."""
+    from .cache import Cache
+    from .invocation import Invocation
+    from .result import Ok
+    from .routine import Routine
+
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = QueueIO(broker=broker, journal=journal)
+
+        original_registry = dict(ROUTINE_REGISTRY)
+        cache = Cache()
+        ROUTINE_REGISTRY["cached"] = Routine(
+            lambda x: x * 2, name="cached", queue="queueio", cache=cache
+        )
+
+        try:
+            queueio.sync(["queueio"])
+            with queueio.invocation_handler():
+                invocation = ROUTINE_REGISTRY["cached"](21)
+                future = invocation.submit()
+                assert not future.done()
+                assert cache.stats().misses == 1
+
+                queueio.publish(Invocation.Completed(id=invocation.id, result=Ok(42)))
+                assert future.result(timeout=1) == 42
+
+                cached = ROUTINE_REGISTRY["cached"](21).submit()
+                assert cached.done()
+                assert cached.result() == 42
+                assert cache.stats().hits == 1
+        finally:
+            queueio.shutdown()
+            ROUTINE_REGISTRY.clear()
+            ROUTINE_REGISTRY.update(original_registry)
+
+
+def test_invocation_handler_shares_single_flight():
+    """Identical submissions of single-flight routines share an invocation."""
+    import time
+
+    from .invocation import Invocation
+    from .result import Ok
+    from .routine import Routine
+    from .singleflight import SingleFlight
+
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = QueueIO(broker=broker, journal=journal)
+
+        original_registry = dict(ROUTINE_REGISTRY)
+        ROUTINE_REGISTRY["single"] = Routine(
+            lambda x: x * 2,
+            name="single",
+            queue="queueio",
+            singleflight=SingleFlight(lease=0.2),
+        )
+
+        try:
+            queueio.sync(["queueio"])
+            submitted = queueio.subscribe({Invocation.Submitted})
+            with queueio.invocation_handler():
+                first = ROUTINE_REGISTRY["single"](21)
+                future1 = first.submit()
+                future2 = ROUTINE_REGISTRY["single"](21).submit()
+                other = ROUTINE_REGISTRY["single"](1).submit()
+                assert submitted.get().id == first.id
+                assert list(submitted.get().args) == [1]
+
+                # A lost invocation's lease expires, and its waiters move
+                time.sleep(0.2)
+                second = ROUTINE_REGISTRY["single"](21)
+                future3 = second.submit()
+                assert submitted.get().id == second.id
+
+                queueio.publish(Invocation.Completed(id=second.id, result=Ok(42)))
+                assert future1.result(timeout=1) == 42
+                assert future2.result(timeout=1) == 42
+                assert future3.result(timeout=1) == 42
+                assert not other.done()
+        finally:
+            queueio.shutdown()
+            ROUTINE_REGISTRY.clear()
+            ROUTINE_REGISTRY.update(original_registry)
+
+
+def test_failed_single_flight_submissions_land():
+    """A submission that can't be enqueued doesn't keep its flight."""
+    from .routine import Routine
+    from .singleflight import SingleFlight
+    from .stub.broker import StubBroker
+
+    failing = Event()
+    failing.set()
+
+    class FailingBroker(StubBroker):
+        def enqueue(self, body: bytes, /, *, queue: str, priority: int):
+            if failing.is_set():
+                raise ConnectionError("broker is down")
+            super().enqueue(body, queue=queue, priority=priority)
+
+    with (
+        StubBackend.connect() as backend,
+        FailingBroker.create() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = QueueIO(broker=broker, journal=journal)
+
+        original_registry = dict(ROUTINE_REGISTRY)
+        ROUTINE_REGISTRY["single"] = Routine(
+            lambda x: x * 2,
+            name="single",
+            queue="queueio",
+            singleflight=SingleFlight(),
+        )
+
+        try:
+            queueio.sync(["queueio"])
+            with queueio.invocation_handler():
+                with pytest.raises(ConnectionError):
+                    ROUTINE_REGISTRY["single"](21).submit()
+
+                # The next identical submission is enqueued, not joined
+                failing.clear()
+                second = ROUTINE_REGISTRY["single"](21)
+                future = second.submit()
+                consumer = queueio.consume(QueueSpec(queues=["queueio"], concurrency=1))
+                assert next(iter(consumer)).id == second.id
+                assert not future.done()
+        finally:
+            queueio.shutdown()
+            ROUTINE_REGISTRY.clear()
+            ROUTINE_REGISTRY.update(original_registry)
+
+
+def test_queueio_result_from_result_store():
+    """Completed invocations can be fetched from the result store."""
+    from .invocation import Invocation
+    from .stub.results import StubResultStore
+
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+        StubResultStore.create() as results,
+    ):
+        queueio = QueueIO(broker=broker, journal=journal, results=results)
+        try:
+            queueio.sync(["queueio"])
+            for _ in range(2):
+                broker.enqueue(
+                    Invocation(routine="test", args=(), kwargs={}).serialize(),
+                    queue="queueio",
+                    priority=4,
+                )
+            consumer = queueio.consume(QueueSpec(queues=["queueio"], concurrency=2))
+            received = iter(consumer)
+            succeeded, errored = next(received), next(received)
+            consumer.succeed(succeeded, 42)
+            consumer.error(errored, ValueError("bad"))
+
+            assert queueio.result(succeeded.id, timeout=1) == 42
+            with pytest.raises(ValueError, match="bad"):
+                queueio.result(errored.id, timeout=1)
+            with pytest.raises(TimeoutError):
+                queueio.result("missing", timeout=0.05)
+        finally:
+            queueio.shutdown()
+
+
+def test_queueio_result_without_result_store():
+    """Fetching results requires a result store."""
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = QueueIO(broker=broker, journal=journal)
+        try:
+            with pytest.raises(RuntimeError, match="No result store"):
+                queueio.result("missing")
+        finally:
+            queueio.shutdown()
+
+
+def test_queueio_with_sqlite_broker(tmp_path, monkeypatch):
+    """QueueIO connects to a SQLite broker and journal for sqlite URIs."""
+    monkeypatch.setenv("QUEUEIO_BROKER", f"sqlite://{tmp_path / 'queueio.db'}")
+
+    original_registry = dict(ROUTINE_REGISTRY)
+    ROUTINE_REGISTRY.clear()
+
+    try:
+        with QueueIO.default() as queueio:
+            queueio.sync(["queueio"])
+    finally:
+        ROUTINE_REGISTRY.clear()
+        ROUTINE_REGISTRY.update(original_registry)
+
+
+def test_queueio_with_unix_broker(tmp_path, monkeypatch):
+    """QueueIO connects to a hub for unix URIs."""
+    from .unix.hub import Hub
+
+    path = str(tmp_path / "queueio.sock")
+    monkeypatch.setenv("QUEUEIO_BROKER", f"unix://{path}")
+
+    original_registry = dict(ROUTINE_REGISTRY)
+    ROUTINE_REGISTRY.clear()
+
+    try:
+        with Hub.serve(path), QueueIO.default() as queueio:
+            queueio.sync(["queueio"])
+    finally:
+        ROUTINE_REGISTRY.clear()
+        ROUTINE_REGISTRY.update(original_registry)
+
+
+def test_queueio_parses_configuration_once(tmp_path, monkeypatch):
+    """The configuration is parsed once, however many settings are read."""
+    import tomllib
+    from types import SimpleNamespace
+
+    config_file = tmp_path / "pyproject.toml"
+    config_file.write_text(f"""
+        [tool.queueio]
+        broker = "sqlite://{tmp_path / "queueio.db"}"
+        results = "memory://"
+        """)
+    monkeypatch.chdir(tmp_path)
+
+    loads = 0
+    load = tomllib.load
+
+    def counting_load(*args, **kwargs):
+        nonlocal loads
+        loads += 1
+        return load(*args, **kwargs)
+
+    monkeypatch.setattr("queueio.queueio.tomllib", SimpleNamespace(load=counting_load))
+
+    original_registry = dict(ROUTINE_REGISTRY)
+    ROUTINE_REGISTRY.clear()
+
+    try:
+        with QueueIO.default():
+            pass
+        with QueueIO.default():
+            pass
+    finally:
+        ROUTINE_REGISTRY.clear()
+        ROUTINE_REGISTRY.update(original_registry)
+
+    assert loads == 1
+
+
+def test_queueio_imports_routines_from_manifest(tmp_path, monkeypatch):
+    """With a manifest, routine modules are imported when they're used."""
+    import sys
+
+    (tmp_path / "lazy_routines.py").write_text(
+        "from queueio import routine\n"
+        "\n"
+        "\n"
+        '@routine(name="lazy", queue="lazy")\n'
+        "def lazy():\n"
+        "    pass\n"
+    )
+    (tmp_path / "queueio-manifest.json").write_text(
+        '{"routines": {"lazy": {"module": "lazy_routines", "queue": "lazy"}}}'
+    )
+    (tmp_path / "pyproject.toml").write_text(f"""
+        [tool.queueio]
+        broker = "sqlite://{tmp_path / "queueio.db"}"
+        register = ["lazy_routines"]
+        manifest = "queueio-manifest.json"
+        """)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(tmp_path)
+
+    original_registry = dict(ROUTINE_REGISTRY)
+    ROUTINE_REGISTRY.clear()
+
+    try:
+        with QueueIO.default() as queueio:
+            assert "lazy_routines" not in sys.modules
+            assert queueio.routine("lazy").fn.__module__ == "lazy_routines"
+    finally:
+        sys.modules.pop("lazy_routines", None)
+        ROUTINE_MODULES.clear()
+        ROUTINE_REGISTRY.clear()
+        ROUTINE_REGISTRY.update(original_registry)
+
+
+def test_queueio_event_verbosity_of_routines():
+    """Routines publish the events of their own or their queue's verbosity."""
+    from .cache import Cache
+    from .invocation import Invocation
+    from .routine import Routine
+    from .routine import Verbosity
+
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = QueueIO(
+            broker=broker, journal=journal, events={"quiet": Verbosity.COMPLETIONS}
+        )
+
+        original_registry = dict(ROUTINE_REGISTRY)
+        for name, queue, options in [
+            ("loud", "queueio", {}),
+            ("quiet", "quiet", {}),
+            ("terminal", "quiet", {"events": Verbosity.TERMINAL}),
+            ("cached", "quiet", {"cache": Cache()}),
+        ]:
+            ROUTINE_REGISTRY[name] = Routine(
+                lambda: None, name=name, queue=queue, **options
+            )
+
+        try:
+            assert queueio.verbosity("loud") is Verbosity.FULL
+            assert queueio.verbosity("quiet") is Verbosity.COMPLETIONS
+            assert queueio.verbosity("terminal") is Verbosity.TERMINAL
+            # Other processes need submissions to share cached results
+            assert queueio.verbosity("cached") is Verbosity.TERMINAL
+            assert queueio.verbosity("unknown") is Verbosity.FULL
+
+            queueio.sync(["queueio", "quiet"])
+            submitted = queueio.subscribe({Invocation.Submitted})
+            queueio.submit(ROUTINE_REGISTRY["quiet"]())
+            loud = ROUTINE_REGISTRY["loud"]()
+            queueio.submit(loud)
+            assert submitted.get().id == loud.id
+        finally:
+            queueio.shutdown()
+            ROUTINE_REGISTRY.clear()
+            ROUTINE_REGISTRY.update(original_registry)
+
+
+def test_queueio_loads_event_verbosity_from_pyproject(tmp_path, monkeypatch):
+    from .routine import Verbosity
+
+    config_file = tmp_path / "pyproject.toml"
+    config_file.write_text(f"""
+        [tool.queueio]
+        broker = "sqlite://{tmp_path / "queueio.db"}"
+
+        [tool.queueio.events]
+        quiet = "completions"
+        """)
+    monkeypatch.chdir(tmp_path)
+
+    original_registry = dict(ROUTINE_REGISTRY)
+    ROUTINE_REGISTRY.clear()
+
+    try:
+        with QueueIO.default() as queueio:
+            from .routine import Routine
+
+            ROUTINE_REGISTRY["quiet"] = Routine(
+                lambda: None, name="quiet", queue="quiet"
+            )
+            assert queueio.verbosity("quiet") is Verbosity.COMPLETIONS
+
+        config_file.write_text(config_file.read_text().replace("completions", "some"))
+        with (
+            pytest.raises(ValueError, match="Invalid event verbosity 'some'"),
+            QueueIO.default(),
+        ):
+            pass
+    finally:
+        ROUTINE_REGISTRY.clear()
+        ROUTINE_REGISTRY.update(original_registry)
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from dataclasses import field
 from typing import Self
 
 
@@ -9,10 +10,46 @@ class QueueSpec:
     The queues are all the queues that are assigned to this amount of
     concurrency. The exact implementation is broker-specific, but invocations
     will often be roughly taken in round-robin order between the queues.
+
+    Each queue has a weight, defaulting to 1, that gives it a proportional
+    share of the invocations taken when several queues have work available.
+    Listing a queue more than once adds its weights together.
+
+    When there is a maximum concurrency, the concurrency is adaptive. It
+    starts at the given concurrency, which is also its minimum, and the
+    worker adjusts it up to the maximum as the workload allows.
     """
 
     queues: list[str]
     concurrency: int
+    weights: list[int] = field(default_factory=list)
+    max_concurrency: int | None = None
+
+    def __post_init__(self):
+        if not self.weights:
+            self.weights = [1] * len(self.queues)
+        if len(self.weights) != len(self.queues):
+            raise ValueError(
+                f"Expected one weight per queue, got {len(self.weights)} weights "
+                f"for {len(self.queues)} queues"
+            )
+        if self.max_concurrency is not None and self.max_concurrency < self.concurrency:
+            raise ValueError(
+                f"Maximum concurrency {self.max_concurrency} is less than "
+                f"the minimum concurrency {self.concurrency}"
+            )
+
+    @property
+    def adaptive(self) -> bool:
+        """Whether the worker adjusts the concurrency to the workload."""
+        return self.max_concurrency is not None
+
+    def shares(self) -> dict[str, int]:
+        """The total weight of each distinct queue, in order of appearance."""
+        shares = dict[str, int]()
+        for queue, weight in zip(self.queues, self.weights, strict=True):
+            shares[queue] = shares.get(queue, 0) + weight
+        return shares
 
     @classmethod
     def parse(cls, value: str) -> Self:
@@ -20,10 +57,12 @@ class QueueSpec:
 
         Examples:
 
-        | queuespec          | queues               | concurrency      |
-        +--------------------+----------------------+------------------+
-        | queue2=5           | ['queue2']           | 5                |
-        | queue1,queue2=10   | ['queue1', 'queue2'] | 10               |
+        | queuespec           | queues               | weights | concurrency |
+        +---------------------+----------------------+---------+-------------+
+        | queue2=5            | ['queue2']           | [1]     | 5           |
+        | queue1,queue2=10    | ['queue1', 'queue2'] | [1, 1]  | 10          |
+        | critical:5,bulk=20  | ['critical', 'bulk'] | [5, 1]  | 20          |
+        | queue1=auto:4..64   | ['queue1']           | [1]     | 4 up to 64  |
         """
 
         if not value or value.strip() == "":
@@ -38,22 +77,58 @@ class QueueSpec:
         # Left split instead of right split to make = invalid for queue names
         raw_queues, raw_concurrency = value.split("=", 1)
 
-        try:
-            concurrency = int(raw_concurrency)
-        except ValueError:
-            raise ValueError(
-                f"Concurrency must be a positive integer, "
-                f"got: '{raw_concurrency}' in '{value}'"
-            ) from None
-        if concurrency <= 0:
-            raise ValueError(
-                f"Concurrency must be a positive integer, "
-                f"got: '{raw_concurrency}' in '{value}'"
-            )
+        max_concurrency = None
+        kind, _, raw_range = raw_concurrency.strip().partition(":")
+        if kind == "auto":
+            raw_min, sep, raw_max = raw_range.partition("..")
+            try:
+                concurrency = int(raw_min)
+                max_concurrency = int(raw_max)
+            except ValueError:
+                concurrency = max_concurrency = 0
+            if not sep or concurrency <= 0 or max_concurrency < concurrency:
+                raise ValueError(
+                    f"Adaptive concurrency must be auto:MIN..MAX with positive "
+                    f"integers where MIN <= MAX, got: '{raw_concurrency}' in '{value}'"
+                )
+        else:
+            try:
+                concurrency = int(raw_concurrency)
+            except ValueError:
+                raise ValueError(
+                    f"Concurrency must be a positive integer, "
+                    f"got: '{raw_concurrency}' in '{value}'"
+                ) from None
+            if concurrency <= 0:
+                raise ValueError(
+                    f"Concurrency must be a positive integer, "
+                    f"got: '{raw_concurrency}' in '{value}'"
+                )
 
-        queues = [q.strip() for q in raw_queues.split(",") if q.strip()]
+        queues = []
+        weights = []
+        for raw_queue in raw_queues.split(","):
+            queue, _, raw_weight = raw_queue.partition(":")
+            if not queue.strip():
+                continue
+            try:
+                weight = int(raw_weight) if raw_weight.strip() else 1
+            except ValueError:
+                weight = 0
+            if weight <= 0:
+                raise ValueError(
+                    f"Weight must be a positive integer, "
+                    f"got: '{raw_weight.strip()}' in '{value}'"
+                )
+            queues.append(queue.strip())
+            weights.append(weight)
 
         if not queues:
             raise ValueError(f"No valid queue names found in '{value}'")
 
-        return cls(queues=queues, concurrency=concurrency)
+        return cls(
+            queues=queues,
+            concurrency=concurrency,
+            weights=weights,
+            max_concurrency=max_concurrency,
+        )
@@ -65,3 +65,66 @@ def test_empty_queue_names_in_list():
     spec = QueueSpec.parse("queue1,,queue2=5")
     assert spec.queues == ["queue1", "queue2"]
     assert spec.concurrency == 5
+
+
+def test_default_weights():
+    spec = QueueSpec.parse("queue1,queue2=5")
+    assert spec.weights == [1, 1]
+    assert QueueSpec(queues=["queue1", "queue2"], concurrency=5) == spec
+
+
+def test_weighted_parsing():
+    spec = QueueSpec.parse(" critical : 5 , bulk:1 = 20")
+    assert spec.queues == ["critical", "bulk"]
+    assert spec.weights == [5, 1]
+    assert spec.concurrency == 20
+
+
+def test_mixed_weighted_and_unweighted_parsing():
+    spec = QueueSpec.parse("critical:3,bulk=4")
+    assert spec.queues == ["critical", "bulk"]
+    assert spec.weights == [3, 1]
+
+
+def test_zero_weight_error():
+    with pytest.raises(ValueError, match="Weight must be a positive integer"):
+        QueueSpec.parse("critical:0=5")
+
+
+def test_invalid_weight_error():
+    with pytest.raises(ValueError, match="Weight must be a positive integer"):
+        QueueSpec.parse("critical:high=5")
+
+
+def test_mismatched_weights_error():
+    with pytest.raises(ValueError, match="one weight per queue"):
+        QueueSpec(queues=["queue1", "queue2"], concurrency=5, weights=[1])
+
+
+def test_shares_combine_duplicates():
+    spec = QueueSpec.parse("high:2,low,high=5")
+    assert spec.shares() == {"high": 3, "low": 1}
+
+
+def test_adaptive_concurrency_parsing():
+    spec = QueueSpec.parse("queue1=auto:4..64")
+    assert spec.concurrency == 4
+    assert spec.max_concurrency == 64
+    assert spec.adaptive
+
+
+def test_fixed_concurrency_is_not_adaptive():
+    spec = QueueSpec.parse("queue1=4")
+    assert spec.max_concurrency is None
+    assert not spec.adaptive
+
+
+@pytest.mark.parametrize("concurrency", ["auto", "auto:4", "auto:0..4", "auto:8..4"])
+def test_invalid_adaptive_concurrency_error(concurrency):
+    with pytest.raises(ValueError, match="Adaptive concurrency must be"):
+        QueueSpec.parse(f"queue1={concurrency}")
+
+
+def test_max_concurrency_below_concurrency_error():
+    with pytest.raises(ValueError, match="less than the minimum"):
+        QueueSpec(queues=["queue1"], concurrency=5, max_concurrency=4)
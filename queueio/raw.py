@@ -0,0 +1,130 @@
+import json
+from collections import OrderedDict
+from collections.abc import Callable
+from collections.abc import Collection
+from dataclasses import fields
+from dataclasses import is_dataclass
+from datetime import datetime
+from enum import StrEnum
+from typing import Any
+from typing import TextIO
+from zlib import crc32
+
+from .queue import Queue
+from .queue import ShutDown
+from .result import Err
+from .result import Ok
+
+
+class Format(StrEnum):
+    """How raw events are written."""
+
+    REPR = "repr"
+    JSONL = "jsonl"
+
+
+def _default(value: Any) -> Any:
+    match value:
+        case datetime():
+            return value.isoformat()
+        case Ok():
+            return {"ok": value.value}
+        case Err():
+            return {"error": repr(value.error)}
+        case _:
+            return repr(value)
+
+
+def encode(event: Any, /) -> str:
+    """Encode an event as a line of JSON, with its type and its fields."""
+    data: dict[str, Any] = {"type": type(event).__qualname__}
+    if is_dataclass(event):
+        data.update((f.name, getattr(event, f.name)) for f in fields(event))
+    else:
+        data["repr"] = repr(event)
+    return json.dumps(data, default=_default)
+
+
+class EventFilter:
+    """Choose events by type, routine, and queue, and sample invocations.
+
+    Only submissions name their routine, so the routine of each invocation
+    is remembered, up to the capacity, to match its later events.
+    When filtering by routine or queue, events of invocations that weren't
+    seen being submitted are dropped. Sampling chooses whole invocations,
+    so that every event of a sampled invocation is kept.
+    """
+
+    def __init__(
+        self,
+        queue: Callable[[str], str],
+        /,
+        *,
+        types: Collection[str] = (),
+        routines: Collection[str] = (),
+        queues: Collection[str] = (),
+        sample: float = 1.0,
+        capacity: int = 100_000,
+    ):
+        if not 0 <= sample <= 1:
+            raise ValueError(f"Sample rate {sample} is not between 0 and 1")
+        self.__queue = queue
+        self.__types = set(types)
+        self.__routines = set(routines)
+        self.__queues = set(queues)
+        self.__threshold = sample * 2**32
+        self.__capacity = capacity
+        # The routine of each invocation that was submitted
+        self.__invocations = OrderedDict[str, str]()
+
+    def __type(self, event: Any) -> bool:
+        name = type(event).__qualname__
+        return name in self.__types or name.rpartition(".")[2] in self.__types
+
+    def __invocation(self, event: Any) -> bool:
+        if (routine := getattr(event, "routine", None)) is None:
+            routine = self.__invocations.get(event.id)
+        elif isinstance(routine, str):
+            self.__invocations[event.id] = routine
+            if len(self.__invocations) > self.__capacity:
+                self.__invocations.popitem(last=False)
+        if routine is None:
+            return False
+        if self.__routines and routine not in self.__routines:
+            return False
+        return not self.__queues or self.__queue(routine) in self.__queues
+
+    def __call__(self, event: Any, /) -> bool:
+        """Whether to keep the event."""
+        id = getattr(event, "id", None)
+        if (self.__routines or self.__queues) and (
+            id is None or not self.__invocation(event)
+        ):
+            return False
+        if self.__types and not self.__type(event):
+            return False
+        if self.__threshold >= 2**32:
+            return True
+        key = id if isinstance(id, str) else getattr(event, "event_id", repr(event))
+        return crc32(key.encode()) < self.__threshold
+
+
+def write(
+    events: Queue[Any],
+    output: TextIO,
+    /,
+    *,
+    format: Format = Format.REPR,
+    keep: Callable[[Any], bool] = lambda event: True,
+    batch: int = 1024,
+):
+    """Write the events that are kept, a batch at a time, until shutdown."""
+    line = encode if format is Format.JSONL else repr
+    while True:
+        try:
+            received = events.get_many(batch)
+        except ShutDown:
+            break
+        if chunk := "".join(line(event) + "\n" for event in received if keep(event)):
+            output.write(chunk)
+            output.flush()
@@ -0,0 +1,105 @@
+import json
+from datetime import UTC
+from datetime import datetime
+from io import StringIO
+
+from .invocation import Invocation
+from .queue import Queue
+from .queuevar import QueueContext
+from .raw import EventFilter
+from .raw import Format
+from .raw import encode
+from .raw import write
+from .result import Err
+from .result import Ok
+
+
+def submitted(id: str, routine: str) -> Invocation.Submitted:
+    return Invocation.Submitted(
+        id=id, routine=routine, args=(1,), kwargs={}, context=QueueContext({})
+    )
+
+
+def queue_of(routine: str) -> str:
+    return "fast" if routine == "add" else "slow"
+
+
+def test_encode_writes_the_type_and_fields_of_events():
+    timestamp = datetime(2025, 1, 2, 3, 4, 5, tzinfo=UTC)
+
+    ok = json.loads(
+        encode(Invocation.Completed(id="a", result=Ok(3), timestamp=timestamp))
+    )
+    err = json.loads(encode(Invocation.Completed(id="b", result=Err(ValueError()))))
+    started = json.loads(encode(Invocation.Started(id="c")))
+
+    assert ok["type"] == "Invocation.Completed"
+    assert ok["id"] == "a"
+    assert ok["timestamp"] == "2025-01-02T03:04:05+00:00"
+    assert ok["result"] == {"ok": 3}
+    assert err["result"] == {"error": "ValueError()"}
+    assert started["type"] == "Invocation.Started"
+    assert set(started) == {"type", "event_id", "timestamp", "id"}
+
+
+def test_event_filter_matches_types():
+    keep = EventFilter(queue_of, types={"Completed", "Invocation.Started"})
+
+    assert keep(Invocation.Started(id="a"))
+    assert keep(Invocation.Completed(id="a", result=Ok(None)))
+    assert not keep(submitted("a", "add"))
+
+
+def test_event_filter_matches_the_routine_and_queue_of_invocations():
+    by_routine = EventFilter(queue_of, routines={"add"})
+    by_queue = EventFilter(queue_of, queues={"slow"}, types={"Started"})
+    events = [
+        submitted("a", "add"),
+        submitted("b", "fetch"),
+        Invocation.Started(id="a"),
+        Invocation.Started(id="b"),
+        Invocation.Started(id="unknown"),
+    ]
+
+    assert [event.id for event in events if by_routine(event)] == ["a", "a"]
+    assert [event.id for event in events if by_queue(event)] == ["b"]
+
+
+def test_event_filter_samples_whole_invocations():
+    keep = EventFilter(queue_of, sample=0.5)
+    ids = [f"id{i}" for i in range(1000)]
+
+    submissions = {id for id in ids if keep(submitted(id, "add"))}
+    starts = {id for id in ids if keep(Invocation.Started(id=id))}
+
+    assert submissions == starts
+    assert 400 < len(submissions) < 600
+    assert not EventFilter(queue_of, sample=0)(Invocation.Started(id="a"))
+
+
+def test_write_writes_kept_events_until_shutdown():
+    events = Queue[object]()
+    events.put_many(
+        [
+            submitted("a", "add"),
+            Invocation.Started(id="a"),
+            Invocation.Completed(id="a", result=Ok(None)),
+        ]
+    )
+    events.shutdown()
+    output = StringIO()
+
+    write(
+        events,
+        output,
+        format=Format.JSONL,
+        keep=EventFilter(queue_of, types={"Submitted", "Completed"}),
+    )
+
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [line["type"] for line in lines] == [
+        "Invocation.Submitted",
+        "Invocation.Completed",
+    ]
+    assert lines[0]["routine"] == "add"
+    assert lines[0]["args"] == [1]
@@ -45,3 +45,15 @@ class Receiver(Iterable[Message], ABC):
         allocated elsewhere permanently.
         """
         raise NotImplementedError("Subclasses must implement this method.")
+
+    def adjust(self, change: int, /):
+        """Adjust the capacity to receive messages.
+
+        A positive change allows more messages to be processed at once.
+        A negative change takes effect as messages finish, and does not
+        interrupt the messages that are already being processed.
+
+        Receivers that can't adjust their capacity don't override this,
+        and workers keep the concurrency of their queuespecs fixed.
+        """
+        raise NotImplementedError(f"{type(self).__name__} can't adjust its capacity.")
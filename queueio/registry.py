@@ -1,15 +1,54 @@
+import importlib
 from collections.abc import Callable
 
+from .cache import Cache
 from .routine import Routine
+from .routine import Verbosity
+from .singleflight import SingleFlight
 
 ROUTINE_REGISTRY: dict[str, Routine] = {}
 
+# The module that registers each routine in the manifest, to import lazily
+ROUTINE_MODULES: dict[str, str] = {}
 
-def routine(*, name: str, queue: str):
-    """Decorate a function to make it a routine."""
+
+def lookup(name: str, /) -> Routine:
+    """Find a registered routine, importing its module from the manifest."""
+    if name not in ROUTINE_REGISTRY and name in ROUTINE_MODULES:
+        importlib.import_module(ROUTINE_MODULES[name])
+        if name not in ROUTINE_REGISTRY:
+            raise KeyError(
+                f"Routine {name!r} was not registered by {ROUTINE_MODULES[name]}. "
+                "Regenerate the manifest with 'queueio routine manifest'."
+            )
+    return ROUTINE_REGISTRY[name]
+
+
+def routine(
+    *,
+    name: str,
+    queue: str,
+    cache: Cache | None = None,
+    singleflight: SingleFlight | None = None,
+    events: Verbosity | None = None,
+):
+    """Decorate a function to make it a routine.
+
+    Routines that are pure functions of their arguments may use a cache
+    to complete invocations with a known result, without running them,
+    and may share in-flight invocations between identical submissions.
+    Routines may publish fewer lifecycle events than their queue does.
+    """
 
     def create_routine[**A, R](fn: Callable[A, R]) -> Routine[A, R]:
-        routine = Routine(fn, name=name, queue=queue)
+        routine = Routine(
+            fn,
+            name=name,
+            queue=queue,
+            cache=cache,
+            singleflight=singleflight,
+            events=events,
+        )
         ROUTINE_REGISTRY.setdefault(routine.name, routine)
         assert ROUTINE_REGISTRY[routine.name] == routine, (
             f"Failed to register {routine}"
@@ -0,0 +1,53 @@
+from abc import ABC
+from abc import abstractmethod
+from time import monotonic
+from time import sleep
+from typing import Any
+
+from .result import Result
+
+
+class ResultStore(ABC):
+    """Store the results of completed invocations by invocation id.
+
+    Results are kept so that they can be fetched or awaited by processes
+    that weren't subscribed to the journal when the invocation completed.
+    Stores may expire results after a time to live.
+    """
+
+    __poll_interval = 0.05
+    __max_poll_interval = 1.0
+
+    @abstractmethod
+    def put(self, id: str, result: Result[Any, BaseException], /):
+        """Store the result of an invocation."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    @abstractmethod
+    def get(self, id: str, /) -> Result[Any, BaseException] | None:
+        """Get the result of an invocation, if it is stored and not expired."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def wait(
+        self, id: str, /, *, timeout: float | None = None
+    ) -> Result[Any, BaseException]:
+        """Wait for the result of an invocation to be stored.
+
+        Stores that can be notified of new results should override this
+        instead of polling.
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        interval = self.__poll_interval
+        while (result := self.get(id)) is None:
+            if deadline is not None and monotonic() + interval > deadline:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No result for invocation {id!r}")
+                interval = remaining
+            sleep(interval)
+            interval = min(interval * 2, self.__max_poll_interval)
+        return result
+
+    @abstractmethod
+    def shutdown(self):
+        raise NotImplementedError("Subclasses must implement this method.")
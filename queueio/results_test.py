@@ -0,0 +1,81 @@
+"""Base test class for result store implementations.
+
+Example usage for a new result store implementation:
+
+```python
+# queueio/mystore/results_test.py
+import pytest
+from queueio.results_test import BaseResultStoreTest
+from .results import MyResultStore
+
+class TestMyResultStore(BaseResultStoreTest):
+
+    @pytest.fixture
+    def results(self):
+        with MyResultStore.connect("connection_string") as results:
+            yield results
+
+    @pytest.fixture
+    def expiring_results(self):
+        with MyResultStore.connect("connection_string", ttl=0.1) as results:
+            yield results
+```
+"""
+
+import threading
+import time
+
+import pytest
+
+from .result import Err
+from .result import Ok
+
+
+class BaseResultStoreTest:
+    """Base test class that all result store implementations should pass."""
+
+    def test_get_missing_result(self, results):
+        """Results that were never stored are missing."""
+        assert results.get("missing") is None
+
+    def test_put_and_get_ok(self, results):
+        """Successful results are stored by invocation id."""
+        results.put("invocation", Ok({"answer": 42}))
+        assert results.get("invocation") == Ok({"answer": 42})
+
+    def test_put_and_get_err(self, results):
+        """Errored results keep their exception."""
+        results.put("invocation", Err(ValueError("bad")))
+        result = results.get("invocation")
+        assert isinstance(result, Err)
+        assert isinstance(result.error, ValueError)
+        assert str(result.error) == "bad"
+
+    def test_put_replaces_result(self, results):
+        """Storing a result again replaces it."""
+        results.put("invocation", Ok(1))
+        results.put("invocation", Ok(2))
+        assert results.get("invocation") == Ok(2)
+
+    @pytest.mark.timeout(2)
+    def test_wait_for_result(self, results):
+        """Waiting returns a result once it is stored."""
+        timer = threading.Timer(0.05, results.put, args=("invocation", Ok(42)))
+        timer.start()
+        try:
+            assert results.wait("invocation", timeout=1) == Ok(42)
+        finally:
+            timer.join()
+
+    @pytest.mark.timeout(2)
+    def test_wait_times_out(self, results):
+        """Waiting for a result that isn't stored times out."""
+        with pytest.raises(TimeoutError):
+            results.wait("missing", timeout=0.05)
+
+    def test_results_expire(self, expiring_results):
+        """Results expire after the time to live."""
+        expiring_results.put("invocation", Ok(42))
+        assert expiring_results.get("invocation") == Ok(42)
+        time.sleep(0.15)
+        assert expiring_results.get("invocation") is None
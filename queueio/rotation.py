@@ -0,0 +1,61 @@
+from collections import deque
+from collections.abc import Iterable
+from random import randrange
+
+
+def interleave(weights: list[int]) -> list[int]:
+    """Order indexes by smooth weighted round-robin.
+
+    Each index appears as many times as its weight, spread out as evenly
+    as possible, so that no index gets a long run of turns.
+    """
+    total = sum(weights)
+    current = [0] * len(weights)
+    order = []
+    for _ in range(total):
+        for i, weight in enumerate(weights):
+            current[i] += weight
+        chosen = max(range(len(weights)), key=current.__getitem__)
+        current[chosen] -= total
+        order.append(chosen)
+    return order
+
+
+class Rotation:
+    """Take turns between weighted queues that share one capacity.
+
+    Each queue has as many turns in the rotation as its share. Capacity goes
+    to the queues with the next turns, skipping those that have nothing to
+    receive, so busy queues get their weighted shares of the capacity and
+    idle queues don't leave any of it unused.
+    """
+
+    def __init__(self, shares: dict[str, int]):
+        queues = list(shares)
+        self.__turns = deque(queues[i] for i in interleave(list(shares.values())))
+        # Randomize the starting position, so receivers don't move in step
+        self.__turns.rotate(-randrange(len(self.__turns)))
+
+    def order(self) -> list[str]:
+        """The queues in the order of their next turns."""
+        return list(dict.fromkeys(self.__turns))
+
+    def take(self, queue: str):
+        """Take the next turn of the queue, moving the rotation past it."""
+        self.__turns.rotate(-self.__turns.index(queue) - 1)
+
+    def split(self, capacity: int, queues: Iterable[str]) -> dict[str, int]:
+        """Split the capacity between the queues by their next turns.
+
+        The limits are in the order of the queues' first turns, and the
+        rotation moves past the turns that were taken or skipped.
+        """
+        queues = set(queues).intersection(self.__turns)
+        limits = dict[str, int]()
+        while capacity > 0 and queues:
+            queue = self.__turns[0]
+            self.__turns.rotate(-1)
+            if queue in queues:
+                limits[queue] = limits.get(queue, 0) + 1
+                capacity -= 1
+        return limits
@@ -0,0 +1,29 @@
+from .rotation import Rotation
+from .rotation import interleave
+
+
+def test_interleave_spreads_turns_by_weight():
+    assert interleave([3, 1]) == [0, 0, 1, 0]
+    assert interleave([1, 1, 1]) == [0, 1, 2]
+
+
+def test_rotation_splits_capacity_by_weight():
+    rotation = Rotation({"critical": 3, "bulk": 1})
+    limits = rotation.split(8, ["critical", "bulk"])
+    assert limits == {"critical": 6, "bulk": 2}
+
+
+def test_rotation_gives_idle_turns_to_busy_queues():
+    rotation = Rotation({"critical": 3, "bulk": 1})
+    assert rotation.split(4, ["bulk"]) == {"bulk": 4}
+    assert rotation.split(4, []) == {}
+    assert rotation.split(4, ["unknown"]) == {}
+
+
+def test_rotation_moves_past_taken_turns():
+    rotation = Rotation({"a": 1, "b": 1})
+    first, second = rotation.order()
+    rotation.take(first)
+    assert rotation.order() == [second, first]
+    assert rotation.split(1, [first, second]) == {second: 1}
+    assert rotation.order() == [first, second]
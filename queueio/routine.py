@@ -1,16 +1,85 @@
 from collections.abc import Callable
+from concurrent.futures import Future
+from enum import StrEnum
 
+from .cache import Cache
+from .coalesce import Coalescer
 from .invocation import Invocation
+from .singleflight import SingleFlight
+
+
+class Verbosity(StrEnum):
+    """Which lifecycle events of a routine's invocations are published.
+
+    Completions are always published, because awaiting an invocation
+    waits for its completion. Routines with a cache or single-flight
+    also publish their submissions, which other processes use to share
+    their results.
+    """
+
+    # Every event, from submitting to completing
+    FULL = "full"
+    # Submissions and completions
+    TERMINAL = "terminal"
+    # Only completions
+    COMPLETIONS = "completions"
 
 
 class Routine[**A, R]:
-    def __init__(self, fn: Callable[A, R], *, name: str, queue: str):
+    def __init__(
+        self,
+        fn: Callable[A, R],
+        *,
+        name: str,
+        queue: str,
+        cache: Cache | None = None,
+        singleflight: SingleFlight | None = None,
+        events: Verbosity | None = None,
+    ):
         self.fn = fn
         self.name = name
         self.queue = queue
+        self.cache = cache
+        self.singleflight = singleflight
+        self.events = events
+        self.__coalescer = Coalescer()
 
     def __repr__(self):
         return f"<{type(self).__name__} {self.name!r}>"
 
     def __call__(self, *args: A.args, **kwargs: A.kwargs) -> Invocation[R]:
         return Invocation(routine=self.name, args=args, kwargs=kwargs)
+
+    def debounce(
+        self, key: str, window: float, *, leading: bool = False
+    ) -> Callable[A, Future[R]]:
+        """Submit once for each burst of submissions with the same key.
+
+        A burst ends when the window, in seconds, passes without another
+        submission. The last invocation of the burst is submitted when it
+        ends, or the first is submitted immediately if leading.
+        """
+
+        def submit(*args: A.args, **kwargs: A.kwargs) -> Future[R]:
+            return self.__coalescer.debounce(
+                key, window, self(*args, **kwargs), leading=leading
+            )
+
+        return submit
+
+    def throttle(
+        self, key: str, rate: float, *, trailing: bool = True
+    ) -> Callable[A, Future[R]]:
+        """Submit at most rate times per second for the same key.
+
+        The first invocation is submitted immediately. The last invocation
+        submitted while throttled is submitted when the throttle ends,
+        unless trailing is false.
+        """
+
+        def submit(*args: A.args, **kwargs: A.kwargs) -> Future[R]:
+            return self.__coalescer.throttle(
+                key, rate, self(*args, **kwargs), trailing=trailing
+            )
+
+        return submit
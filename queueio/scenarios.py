@@ -0,0 +1,54 @@
+from collections.abc import Callable
+from functools import partial
+
+from .gather import gather
+from .invocation import Invocation
+from .pause import pause
+from .registry import routine
+
+# The queue of the routines that queueio bench runs
+QUEUE = "queueio-bench"
+
+
+@routine(name="queueio_bench_noop", queue=QUEUE)
+def noop():
+    pass
+
+
+@routine(name="queueio_bench_echo", queue=QUEUE)
+def echo(payload: str) -> str:
+    return payload
+
+
+@routine(name="queueio_bench_awaits", queue=QUEUE)
+async def awaits(count: int):
+    for _ in range(count):
+        await noop()
+
+
+@routine(name="queueio_bench_fanout", queue=QUEUE)
+async def fanout(width: int):
+    await gather(*(noop() for _ in range(width)))
+
+
+@routine(name="queueio_bench_chain", queue=QUEUE)
+async def chain(depth: int):
+    if depth > 1:
+        await chain(depth - 1)
+
+
+@routine(name="queueio_bench_pauses", queue=QUEUE)
+async def pauses(count: int):
+    for _ in range(count):
+        await pause(0)
+
+
+# Create an invocation of each scenario
+SCENARIOS: dict[str, Callable[[], Invocation]] = {
+    "noop": noop,
+    "awaits": partial(awaits, 10),
+    "fanout": partial(fanout, 10),
+    "chain": partial(chain, 10),
+    "pauses": partial(pauses, 10),
+    "payload": partial(echo, "x" * 65536),
+}
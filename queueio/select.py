@@ -8,6 +8,7 @@ from contextlib import AbstractContextManager
 from functools import update_wrapper
 from threading import Condition
 from threading import Lock
+from time import monotonic
 from typing import Concatenate
 from typing import cast
 
@@ -35,6 +36,13 @@ class SelectorGuard[R](AbstractContextManager[Selector[R] | None], ABC):
         raise NotImplementedError
 
 
+type Withdraw = Callable[[], None]
+"""Withdraw a pending guard so that it holds no resources after selection."""
+
+type Selectable[R] = Callable[[SelectorGuard[R]], Withdraw | None]
+"""Offer a guard to an operation, returning how to withdraw it if it's pending."""
+
+
 class NotGiven(Exception):
     pass
 
@@ -130,20 +138,56 @@ class SelectionSelectorGuard[T, R](SelectorGuard[R]):
         )
 
 
-def select[R](selectors: Iterable[Callable[[SelectorGuard[R]], None]]) -> tuple[int, R]:
-    """Simultaneously wait multiple selector functions and complete exactly one."""
+def _deadline(timeout: float | None, deadline: float | None) -> float | None:
+    """Combine a relative timeout and an absolute deadline into a deadline.
+
+    Deadlines are measured with ``time.monotonic()``. The earlier of the two
+    is used when both are given, and None means to wait forever.
+    """
+    if timeout is None:
+        return deadline
+    if deadline is None:
+        return monotonic() + timeout
+    return min(deadline, monotonic() + timeout)
+
+
+def select[R](
+    selectors: Iterable[Selectable[R]],
+    *,
+    timeout: float | None = None,
+    deadline: float | None = None,
+) -> tuple[int, R]:
+    """Simultaneously wait multiple selector functions and complete exactly one.
+
+    If none complete within the timeout in seconds, or by the deadline from
+    ``time.monotonic()``, raise TimeoutError. Pending guards are withdrawn
+    once the selection is made or has timed out.
+    """
+    until = _deadline(timeout, deadline)
     selection = Selection[int, R]()
+    withdrawals = list[Withdraw]()
     with (condition := Condition()):
         for i, selector_fn in enumerate(selectors):
             guard = SelectionSelectorGuard(i, condition, selection)
-            selector_fn(guard)
+            if withdraw := selector_fn(guard):
+                withdrawals.append(withdraw)
         while not selection.given():
-            condition.wait()
-        return selection.take()
+            if until is None:
+                condition.wait()
+            elif (remaining := until - monotonic()) > 0:
+                condition.wait(remaining)
+            else:
+                # Guards check the selection while holding the condition,
+                # so none of them can complete after this.
+                selection.error(-1, TimeoutError("Selection timed out"))
+    # Withdraw outside the condition to keep a consistent lock order
+    for withdraw in withdrawals:
+        withdraw()
+    return selection.take()
 
 
 class selectfunction[**P, R]:
-    def __init__(self, fn: Callable[Concatenate[SelectorGuard[R], P], None]):
+    def __init__(self, fn: Callable[Concatenate[SelectorGuard[R], P], Withdraw | None]):
         self.__fn = fn
         update_wrapper(self, fn)
 
@@ -153,14 +197,27 @@ class selectfunction[**P, R]:
     def __repr__(self):
         return f"<selectfunction of {self.__fn!r}>"
 
-    def select(
-        self, *args: P.args, **kwargs: P.kwargs
-    ) -> Callable[[SelectorGuard[R]], None]:
+    def select(self, *args: P.args, **kwargs: P.kwargs) -> Selectable[R]:
         return lambda guard: self.__fn(guard, *args, **kwargs)
 
+    def within(
+        self, timeout: float | None = None, *, deadline: float | None = None
+    ) -> Callable[P, R]:
+        """Call with a timeout in seconds or a ``time.monotonic()`` deadline.
+
+        The timeout starts when the returned callable is called, each time
+        it is called. It raises TimeoutError if the operation doesn't
+        complete in time, and the pending operation is withdrawn.
+        """
+        return lambda *args, **kwargs: select(
+            [self.select(*args, **kwargs)], timeout=timeout, deadline=deadline
+        )[1]
+
 
 class selectmethod[**P, R, T]:
-    def __init__(self, fn: Callable[Concatenate[T, SelectorGuard[R], P], None]):
+    def __init__(
+        self, fn: Callable[Concatenate[T, SelectorGuard[R], P], Withdraw | None]
+    ):
         self.__fn = fn
 
     def __get__(self, obj: T | None, objtype: type[T]) -> selectfunction[P, R]:
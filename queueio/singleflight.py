@@ -0,0 +1,43 @@
+from collections.abc import Callable
+from collections.abc import Mapping
+from typing import Any
+
+from .cache import Cache
+
+
+class SingleFlight:
+    """Share one in-flight invocation between identical submissions.
+
+    While an invocation of a routine is in flight, submitting another with
+    the same key attaches to the in-flight invocation instead of enqueuing.
+    The key defaults to a hash of the arguments, or is given by calling the
+    key function with the arguments.
+
+    Submissions are shared immediately within a process, and across processes
+    once the submitted event arrives from the journal, so simultaneous
+    submissions from different processes may still both run.
+
+    An invocation is in flight for at most the lease, in seconds, after
+    it was submitted. If the invocation is lost with a dead worker, the next
+    submission enqueues a new invocation, and those that attached to the
+    lost invocation wait for the new one instead.
+    """
+
+    def __init__(
+        self,
+        *,
+        lease: float = 300.0,
+        key: Callable[..., str] | None = None,
+    ):
+        if lease <= 0:
+            raise ValueError(f"lease must be positive, got {lease}")
+        self.lease = lease
+        self.__key = key
+
+    def key(
+        self, routine: str, args: tuple[Any, ...], kwargs: Mapping[str, Any]
+    ) -> str:
+        """The key that identical submissions of the routine share."""
+        if self.__key is None:
+            return Cache.key(routine, args, kwargs)
+        return f"{routine}:{self.__key(*args, **kwargs)}"
@@ -0,0 +1,20 @@
+import pytest
+
+from .cache import Cache
+from .singleflight import SingleFlight
+
+
+def test_default_key_hashes_arguments():
+    singleflight = SingleFlight()
+    assert singleflight.key("r", (1,), {"a": 2}) == Cache.key("r", (1,), {"a": 2})
+
+
+def test_explicit_key():
+    singleflight = SingleFlight(key=lambda entity, **_: str(entity))
+    assert singleflight.key("reindex", (7,), {"full": True}) == "reindex:7"
+    assert singleflight.key("reindex", (7,), {}) == "reindex:7"
+
+
+def test_invalid_lease_error():
+    with pytest.raises(ValueError, match="lease must be positive"):
+        SingleFlight(lease=0)
@@ -0,0 +1,24 @@
+from collections.abc import Generator
+from contextlib import AbstractContextManager
+from contextlib import contextmanager
+
+from queueio.backend import Backend
+
+from .broker import SqliteBroker
+from .journal import SqliteJournal
+
+
+class SqliteBackend(Backend):
+    def __init__(self, path: str):
+        self.__path = path
+
+    @classmethod
+    @contextmanager
+    def connect(cls, path: str, /) -> Generator[SqliteBackend]:
+        yield cls(path)
+
+    def broker(self) -> AbstractContextManager[SqliteBroker]:
+        return SqliteBroker.connect(self.__path)
+
+    def journal(self) -> AbstractContextManager[SqliteJournal]:
+        return SqliteJournal.connect(self.__path)
@@ -0,0 +1,135 @@
+from collections.abc import Generator
+from collections.abc import Iterable
+from contextlib import contextmanager
+from threading import Lock
+from time import time
+
+from queueio.broker import Broker
+from queueio.queuespec import QueueSpec
+
+from .database import Channel
+from .database import connect
+from .receiver import SqliteReceiver
+
+
+class SqliteBroker(Broker):
+    """A broker that queues messages in a SQLite table.
+
+    The database file may be shared by the processes on one host.
+    Receivers claim batches of messages in a single statement, and are
+    woken immediately by brokers in the same process when messages
+    are enqueued, or otherwise by polling.
+    """
+
+    @classmethod
+    @contextmanager
+    def connect(cls, path: str) -> Generator[SqliteBroker]:
+        broker = cls(path)
+        try:
+            yield broker
+        finally:
+            broker.shutdown()
+
+    def __init__(self, path: str):
+        self.__path = path
+        self.__conn = connect(path)
+        self.__channel = Channel.get(path, "queueio_tasks")
+        self.__lock = Lock()
+        self.__receivers = set[SqliteReceiver]()
+        self.__shutdown_lock = Lock()
+        self.__shutdown = False
+
+        with self.__lock:
+            self.__conn.executescript("""
+                BEGIN;
+                CREATE TABLE IF NOT EXISTS queueio_queues (
+                    name TEXT PRIMARY KEY,
+                    created_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS queueio_tasks (
+                    id INTEGER PRIMARY KEY,
+                    queue TEXT NOT NULL
+                        REFERENCES queueio_queues (name) ON DELETE CASCADE,
+                    body BLOB NOT NULL,
+                    priority INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker_id TEXT,
+                    heartbeat REAL,
+                    created_at REAL NOT NULL
+                );
+                -- Claims scan only the pending rows, in the order they're claimed
+                CREATE INDEX IF NOT EXISTS queueio_tasks_claimable
+                ON queueio_tasks (queue, priority DESC, id)
+                WHERE status = 'pending';
+                -- Heartbeats and returns scan only the processing rows
+                CREATE INDEX IF NOT EXISTS queueio_tasks_processing
+                ON queueio_tasks (worker_id, heartbeat)
+                WHERE status = 'processing';
+                COMMIT;
+            """)
+
+    def sync(self, queues: Iterable[str], *, recreate: bool = False):
+        now = time()
+        queues = list(queues)
+        with self.__lock:
+            self.__conn.execute("BEGIN IMMEDIATE")
+            try:
+                if recreate:
+                    self.__conn.executemany(
+                        "DELETE FROM queueio_queues WHERE name = ?",
+                        [(queue,) for queue in queues],
+                    )
+                self.__conn.executemany(
+                    "INSERT OR IGNORE INTO queueio_queues (name, created_at) "
+                    "VALUES (?, ?)",
+                    [(queue, now) for queue in queues],
+                )
+            except BaseException:
+                self.__conn.execute("ROLLBACK")
+                raise
+            self.__conn.execute("COMMIT")
+
+    def enqueue(self, body: bytes, /, *, queue: str, priority: int):
+        self.enqueue_many([body], queue=queue, priority=priority)
+
+    def enqueue_many(self, bodies: Iterable[bytes], /, *, queue: str, priority: int):
+        """Enqueue messages in a single transaction."""
+        now = time()
+        rows = [(queue, body, priority, now) for body in bodies]
+        if not rows:
+            return
+        with self.__lock:
+            self.__conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.__conn.executemany(
+                    "INSERT INTO queueio_tasks (queue, body, priority, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+            except BaseException:
+                self.__conn.execute("ROLLBACK")
+                raise
+            self.__conn.execute("COMMIT")
+        self.__channel.notify()
+
+    def purge(self, *, queue: str):
+        with self.__lock:
+            self.__conn.execute("DELETE FROM queueio_tasks WHERE queue = ?", (queue,))
+
+    def receive(self, queuespec: QueueSpec, /) -> SqliteReceiver:
+        receiver = SqliteReceiver(self.__path, queuespec)
+        self.__receivers.add(receiver)
+        return receiver
+
+    def shutdown(self):
+        with self.__shutdown_lock:
+            if self.__shutdown:
+                return
+            self.__shutdown = True
+
+            for receiver in set(self.__receivers):
+                receiver.shutdown()
+            self.__receivers.clear()
+
+            with self.__lock:
+                self.__conn.close()
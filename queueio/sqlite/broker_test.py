@@ -0,0 +1,46 @@
+import pytest
+
+from queueio.broker_test import BaseBrokerTest
+from queueio.queuespec import QueueSpec
+
+from . import SqliteBackend
+from .broker import SqliteBroker
+
+
+class TestSqliteBroker(BaseBrokerTest):
+    supports_multiple_queues = True
+    supports_weighted_queue_subscriptions = True
+
+    @pytest.fixture
+    def broker(self, tmp_path):
+        path = str(tmp_path / "queueio.db")
+        with SqliteBackend.connect(path) as backend, backend.broker() as broker:
+            yield broker
+
+    @pytest.mark.timeout(2)
+    def test_messages_are_shared_between_connections(self, tmp_path):
+        """Messages enqueued by one connection are received by another."""
+        path = str(tmp_path / "queueio.db")
+        with (
+            SqliteBroker.connect(path) as producer,
+            SqliteBroker.connect(path) as consumer,
+        ):
+            producer.sync(["test-queue"])
+            producer.enqueue_many([b"1", b"2"], queue="test-queue", priority=4)
+
+            receiver = consumer.receive(QueueSpec(queues=["test-queue"], concurrency=2))
+            messages = iter(receiver)
+            assert [next(messages).body, next(messages).body] == [b"1", b"2"]
+
+    @pytest.mark.timeout(2)
+    def test_unfinished_messages_are_returned_at_shutdown(self, tmp_path):
+        path = str(tmp_path / "queueio.db")
+        with SqliteBroker.connect(path) as broker:
+            broker.sync(["test-queue"])
+            broker.enqueue(b"unfinished", queue="test-queue", priority=4)
+            receiver = broker.receive(QueueSpec(queues=["test-queue"], concurrency=1))
+            assert next(iter(receiver)).body == b"unfinished"
+            receiver.shutdown()
+
+            receiver = broker.receive(QueueSpec(queues=["test-queue"], concurrency=1))
+            assert next(iter(receiver)).body == b"unfinished"
@@ -0,0 +1,59 @@
+import os
+import sqlite3
+from threading import Condition
+from threading import Lock
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Connect to a SQLite database that is shared by threads and processes.
+
+    Connections are in autocommit mode, and may be used from any thread
+    with a lock. Write-ahead logging lets readers and a writer proceed at
+    once, and writers wait for the lock held by other processes.
+    """
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+class Channel:
+    """Notify waiters in this process of changes to a SQLite database.
+
+    SQLite has no notifications, so waiters in other processes find
+    changes by polling. Waiters in this process are woken immediately.
+    """
+
+    @classmethod
+    def get(cls, path: str, name: str, /) -> Channel:
+        key = (os.path.realpath(path), name)
+        with _lock:
+            if key not in _channels:
+                _channels[key] = cls()
+            return _channels[key]
+
+    def __init__(self):
+        self.__condition = Condition()
+        self.__version = 0
+
+    @property
+    def version(self) -> int:
+        """The current version, to wait for changes after it."""
+        with self.__condition:
+            return self.__version
+
+    def notify(self):
+        with self.__condition:
+            self.__version += 1
+            self.__condition.notify_all()
+
+    def wait(self, version: int, /, timeout: float) -> bool:
+        """Wait for a notification after the version, or for the timeout."""
+        with self.__condition:
+            return self.__condition.wait_for(lambda: self.__version != version, timeout)
+
+
+_lock = Lock()
+_channels = dict[tuple[str, str], Channel]()
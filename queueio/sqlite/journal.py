@@ -0,0 +1,110 @@
+from collections.abc import Generator
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import timedelta
+from threading import Lock
+from time import time
+
+from queueio.journal import Journal
+
+from .database import Channel
+from .database import connect
+
+
+class SqliteJournal(Journal):
+    """A journal of messages appended to a SQLite table.
+
+    Subscribers are woken immediately by journals in the same process when
+    messages are published, or otherwise by polling. Messages older than
+    the retention are deleted as new messages are published.
+    """
+
+    __fetch_size = 1000
+    __poll_interval = 0.1
+    __prune_interval = 60.0
+
+    @classmethod
+    @contextmanager
+    def connect(
+        cls, path: str, *, retention: timedelta = timedelta(days=7)
+    ) -> Generator[SqliteJournal]:
+        journal = cls(path, retention=retention)
+        try:
+            yield journal
+        finally:
+            journal.shutdown()
+
+    def __init__(self, path: str, *, retention: timedelta = timedelta(days=7)):
+        self.__retention = retention.total_seconds()
+        self.__pruned = 0.0
+        self.__channel = Channel.get(path, "queueio_journal")
+        self.__publish_lock = Lock()
+        self.__publish_conn = connect(path)
+        self.__subscribe_lock = Lock()
+        self.__subscribe_conn = connect(path)
+        self.__shutdown_lock = Lock()
+        self.__shutdown = False
+
+        # AUTOINCREMENT keeps ids from being reused after pruning
+        self.__publish_conn.execute("""
+            CREATE TABLE IF NOT EXISTS queueio_journal (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                body BLOB NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        row = self.__subscribe_conn.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM queueio_journal"
+        ).fetchone()
+        self.__last_id: int = row[0]
+
+    def publish(self, message: bytes):
+        now = time()
+        with self.__publish_lock:
+            self.__publish_conn.execute(
+                "INSERT INTO queueio_journal (body, created_at) VALUES (?, ?)",
+                (message, now),
+            )
+            if now - self.__pruned >= self.__prune_interval:
+                self.__pruned = now
+                self.__publish_conn.execute(
+                    "DELETE FROM queueio_journal WHERE created_at < ?",
+                    (now - self.__retention,),
+                )
+        self.__channel.notify()
+
+    def subscribe(self) -> Iterator[bytes]:
+        for messages in self.subscribe_many():
+            yield from messages
+
+    def subscribe_many(self) -> Iterator[list[bytes]]:
+        while not self.__shutdown:
+            # Take the version before reading, to not miss notifications
+            version = self.__channel.version
+            with self.__subscribe_lock:
+                if self.__shutdown:
+                    return
+                rows = self.__subscribe_conn.execute(
+                    "SELECT id, body FROM queueio_journal "
+                    "WHERE id > ? ORDER BY id LIMIT ?",
+                    (self.__last_id, self.__fetch_size),
+                ).fetchall()
+            if rows:
+                self.__last_id = rows[-1][0]
+                yield [body for _, body in rows]
+            else:
+                self.__channel.wait(version, timeout=self.__poll_interval)
+
+    def shutdown(self):
+        with self.__shutdown_lock:
+            if self.__shutdown:
+                return
+            self.__shutdown = True
+
+            with self.__publish_lock:
+                self.__publish_conn.close()
+            with self.__subscribe_lock:
+                self.__subscribe_conn.close()
+
+            # Wake up the subscribers
+            self.__channel.notify()
@@ -0,0 +1,38 @@
+import sqlite3
+from contextlib import closing
+from datetime import timedelta
+
+import pytest
+
+from queueio.journal_test import BaseJournalTest
+
+from .journal import SqliteJournal
+
+
+class TestSqliteJournal(BaseJournalTest):
+    @pytest.fixture
+    def journal(self, tmp_path):
+        with SqliteJournal.connect(str(tmp_path / "queueio.db")) as journal:
+            yield journal
+
+    @pytest.mark.timeout(2)
+    def test_messages_are_shared_between_connections(self, tmp_path):
+        """Messages published by one connection are received by another."""
+        path = str(tmp_path / "queueio.db")
+        with (
+            SqliteJournal.connect(path) as publisher,
+            SqliteJournal.connect(path) as subscriber,
+        ):
+            publisher.publish(b"message")
+            assert next(subscriber.subscribe()) == b"message"
+
+    def test_expired_messages_are_pruned(self, tmp_path):
+        path = str(tmp_path / "queueio.db")
+        with SqliteJournal.connect(path) as journal:
+            journal.publish(b"expired")
+        with SqliteJournal.connect(path, retention=timedelta(0)) as journal:
+            journal.publish(b"kept")
+
+        with closing(sqlite3.connect(path)) as conn:
+            rows = conn.execute("SELECT body FROM queueio_journal").fetchall()
+        assert rows == [(b"kept",)]
@@ -0,0 +1,75 @@
+from collections.abc import Generator
+from contextlib import contextmanager
+from threading import Lock
+from time import time
+from typing import Any
+
+import dill
+from queueio.result import Result
+from queueio.results import ResultStore
+
+from .database import connect
+
+
+class SqliteResultStore(ResultStore):
+    """Store results in a SQLite database, indexed by invocation id.
+
+    Expired results are deleted when they are next looked up, and
+    in bulk at most once per time to live when results are stored.
+    """
+
+    @classmethod
+    @contextmanager
+    def connect(
+        cls, path: str, *, ttl: float | None = None
+    ) -> Generator[SqliteResultStore]:
+        results = cls(path, ttl=ttl)
+        try:
+            yield results
+        finally:
+            results.shutdown()
+
+    def __init__(self, path: str, *, ttl: float | None = None):
+        self.__ttl = ttl
+        self.__purged = time()
+        self.__lock = Lock()
+        self.__conn = connect(path)
+        self.__conn.execute("""
+            CREATE TABLE IF NOT EXISTS queueio_results (
+                id TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                expires_at REAL
+            )
+        """)
+
+    def put(self, id: str, result: Result[Any, BaseException], /):
+        now = time()
+        expires_at = None if self.__ttl is None else now + self.__ttl
+        with self.__lock:
+            self.__conn.execute(
+                "INSERT OR REPLACE INTO queueio_results (id, body, expires_at) "
+                "VALUES (?, ?, ?)",
+                (id, dill.dumps(result), expires_at),
+            )
+            if self.__ttl is not None and now - self.__purged >= self.__ttl:
+                self.__purged = now
+                self.__conn.execute(
+                    "DELETE FROM queueio_results WHERE expires_at <= ?", (now,)
+                )
+
+    def get(self, id: str, /) -> Result[Any, BaseException] | None:
+        with self.__lock:
+            row = self.__conn.execute(
+                "SELECT body, expires_at FROM queueio_results WHERE id = ?", (id,)
+            ).fetchone()
+            if row is None:
+                return None
+            body, expires_at = row
+            if expires_at is not None and expires_at <= time():
+                self.__conn.execute("DELETE FROM queueio_results WHERE id = ?", (id,))
+                return None
+        return dill.loads(body)
+
+    def shutdown(self):
+        with self.__lock:
+            self.__conn.close()
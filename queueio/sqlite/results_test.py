@@ -0,0 +1,30 @@
+import pytest
+
+from queueio.results_test import BaseResultStoreTest
+
+from .results import SqliteResultStore
+
+
+class TestSqliteResultStore(BaseResultStoreTest):
+    @pytest.fixture
+    def results(self, tmp_path):
+        with SqliteResultStore.connect(str(tmp_path / "results.db")) as results:
+            yield results
+
+    @pytest.fixture
+    def expiring_results(self, tmp_path):
+        path = str(tmp_path / "results.db")
+        with SqliteResultStore.connect(path, ttl=0.1) as results:
+            yield results
+
+    def test_results_are_shared_between_connections(self, tmp_path):
+        """Results stored by one connection can be fetched by another."""
+        from queueio.result import Ok
+
+        path = str(tmp_path / "results.db")
+        with (
+            SqliteResultStore.connect(path) as writer,
+            SqliteResultStore.connect(path) as reader,
+        ):
+            writer.put("invocation", Ok(42))
+            assert reader.get("invocation") == Ok(42)
@@ -17,8 +17,8 @@ class Stream:
         self.__listener.start()
 
     def __listen(self):
-        for message in self.__journal.subscribe():
-            self.__remote_receive(message)
+        for messages in self.__journal.subscribe_many():
+            self.__remote_receive(messages)
 
     def subscribe[T](self, types: Iterable[type[T]]) -> Queue[T]:
         queue = Queue[T]()
@@ -34,25 +34,31 @@ class Stream:
                 del self.__subscriptions[type]
         queue.shutdown(immediate=True)
 
-    def __distribute(self, event: Any):
-        """Local-only distribution of events to subscribers."""
-        subscribers = {
-            subscription
-            for type, subscriptions in self.__subscriptions.items()
-            for subscription in subscriptions
-            if isinstance(event, type)
-        }
-        for subscriber in subscribers:
-            subscriber.put(event)
+    def __distribute(self, events: list[Any]):
+        """Local-only distribution of events to subscribers.
+
+        Each subscriber receives its share of the events in a single put.
+        """
+        batches = dict[Queue[Any], list[Any]]()
+        for event in events:
+            subscribers = {
+                subscription
+                for type, subscriptions in self.__subscriptions.items()
+                for subscription in subscriptions
+                if isinstance(event, type)
+            }
+            for subscriber in subscribers:
+                batches.setdefault(subscriber, []).append(event)
+        for subscriber, batch in batches.items():
+            subscriber.put_many(batch)
 
     def __remote_publish(self, event: Any):
         """Remote distribution of events to subscribers."""
         self.__journal.publish(dill.dumps(event))
 
-    def __remote_receive(self, body: bytes):
-        """Receive and process remote events."""
-        event = dill.loads(body)
-        self.__distribute(event)
+    def __remote_receive(self, bodies: list[bytes]):
+        """Receive and process a batch of remote events."""
+        self.__distribute([dill.loads(body) for body in bodies])
 
     def publish(self, event: Any):
         """Publish an event to all subscribers of the stream.
@@ -67,7 +73,7 @@ class Stream:
 
         This is useful for events that have properties that are not serializable.
         """
-        self.__distribute(event)
+        self.__distribute([event])
 
     def shutdown(self):
         self.__journal.shutdown()
@@ -59,6 +59,7 @@ class StubBroker(Broker):
 
         receiver = StubReceiver(
             queues=[self.__queues[queue] for queue in queuespec.queues],
+            weights=queuespec.weights,
             capacity=queuespec.concurrency,
             priorities=self.__priorities,
         )
@@ -11,6 +11,8 @@ from queueio.queue import ShutDown
 class StubJournal(Journal):
     """An in-memory journal implementation for testing."""
 
+    __batch_size = 100
+
     @classmethod
     @contextmanager
     def create(cls) -> Generator[StubJournal]:
@@ -32,6 +34,13 @@ class StubJournal(Journal):
             except ShutDown:
                 return
 
+    def subscribe_many(self) -> Iterator[list[bytes]]:
+        while True:
+            try:
+                yield self.__queue.get_many(self.__batch_size)
+            except ShutDown:
+                return
+
     def publish(self, message: bytes):
         self.__queue.put(message)
 
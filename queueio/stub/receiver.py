@@ -8,6 +8,7 @@ from queueio.message import Message
 from queueio.queue import Queue
 from queueio.queue import ShutDown
 from queueio.receiver import Receiver
+from queueio.rotation import interleave
 from queueio.select import select
 
 
@@ -16,16 +17,21 @@ class StubReceiver(Receiver):
         self,
         *,
         queues: Iterable[dict[int, Queue[bytes]]],
+        weights: Iterable[int],
         priorities: int,
         capacity: int,
     ):
-        self.__queues = deque(queues)
+        # Each named queue gets as many turns in the rotation as its weight
+        queues = list(queues)
+        self.__queues = deque(queues[i] for i in interleave(list(weights)))
         self.__priorities = priorities
         self.__capacity = capacity
         # A bounded semaphore won't work because resume()
         # needs to decrease capacity without blocking
         self.__condition = Condition()
         self.__shutdown = False
+        # Shutting down wakes a receiver that is waiting for messages
+        self.__stopped = Queue[None]()
 
         # Randomize the starting position
         with self.__condition:
@@ -34,7 +40,7 @@ class StubReceiver(Receiver):
 
     def __iter__(self) -> Iterator[Message]:
         while True:
-            # Wait for capacity to consume a message
+            # Wait for capacity to consume messages
             with self.__condition:
                 while self.__capacity <= 0 and not self.__shutdown:
                     self.__condition.wait()
@@ -43,24 +49,41 @@ class StubReceiver(Receiver):
 
                 # Get the queue order with the condition lock
                 queues = list(self.__queues)
-                self.__capacity -= 1
 
+                # Take a fair share of the capacity for a batch from one
+                # turn in the rotation, so batching keeps the rotation order.
+                reserved = max(1, self.__capacity // len(queues))
+                self.__capacity -= reserved
+
+            # Select each named queue once, at its first turn in the rotation
             selectors = []
-            for priority_queues in queues:
+            positions = []
+            selected = set[int]()
+            for position, priority_queues in enumerate(queues):
+                if id(priority_queues) in selected:
+                    continue
+                selected.add(id(priority_queues))
+                positions.append(position)
                 for p in range(self.__priorities - 1, -1, -1):
-                    selectors.append(priority_queues[p].get.select())
+                    selectors.append(priority_queues[p].get_many.select(reserved))
+            selectors.append(self.__stopped.get.select())
 
-            # Wait for a new message without the condition lock
+            # Wait for new messages without the condition lock
             try:
-                i, value = select(selectors)
+                i, values = select(selectors)
             except ShutDown:
                 return
 
             with self.__condition:
-                # Determine which named queue won and cycle past it
-                named_queue_index = i // self.__priorities
-                for _ in range(named_queue_index + 1):
+                # Release any capacity that the batch didn't use
+                self.__capacity += reserved - len(values)
+
+                # Determine which turn won and cycle past it
+                position = positions[i // self.__priorities]
+                for _ in range(position + 1):
                     self.__queues.append(self.__queues.popleft())
+
+            for value in values:
                 yield Message(body=value)
 
     def pause(self, message: Message, /):
@@ -77,7 +100,13 @@ class StubReceiver(Receiver):
             self.__capacity += 1
             self.__condition.notify()
 
+    def adjust(self, change: int, /):
+        with self.__condition:
+            self.__capacity += change
+            self.__condition.notify()
+
     def shutdown(self):
         with self.__condition:
             self.__shutdown = True
             self.__condition.notify_all()
+        self.__stopped.shutdown(immediate=True)
@@ -0,0 +1,61 @@
+from collections.abc import Generator
+from contextlib import contextmanager
+from threading import Condition
+from time import monotonic
+from typing import Any
+
+from queueio.result import Result
+from queueio.results import ResultStore
+
+
+class StubResultStore(ResultStore):
+    """An in-memory result store implementation for testing."""
+
+    @classmethod
+    @contextmanager
+    def create(cls, *, ttl: float | None = None) -> Generator[StubResultStore]:
+        results = cls(ttl=ttl)
+        try:
+            yield results
+        finally:
+            results.shutdown()
+
+    def __init__(self, *, ttl: float | None = None):
+        self.__ttl = ttl
+        self.__condition = Condition()
+        self.__results = dict[str, tuple[float | None, Result[Any, BaseException]]]()
+
+    def put(self, id: str, result: Result[Any, BaseException], /):
+        expires = None if self.__ttl is None else monotonic() + self.__ttl
+        with self.__condition:
+            self.__results[id] = (expires, result)
+            self.__condition.notify_all()
+
+    def get(self, id: str, /) -> Result[Any, BaseException] | None:
+        with self.__condition:
+            return self.__get(id)
+
+    def __get(self, id: str) -> Result[Any, BaseException] | None:
+        entry = self.__results.get(id)
+        if entry is None:
+            return None
+        expires, result = entry
+        if expires is not None and monotonic() >= expires:
+            del self.__results[id]
+            return None
+        return result
+
+    def wait(
+        self, id: str, /, *, timeout: float | None = None
+    ) -> Result[Any, BaseException]:
+        with self.__condition:
+            if not self.__condition.wait_for(
+                lambda: self.__get(id) is not None, timeout
+            ):
+                raise TimeoutError(f"No result for invocation {id!r}")
+            result = self.__get(id)
+            assert result is not None
+            return result
+
+    def shutdown(self):
+        pass
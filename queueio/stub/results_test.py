@@ -0,0 +1,17 @@
+import pytest
+
+from queueio.results_test import BaseResultStoreTest
+
+from .results import StubResultStore
+
+
+class TestStubResultStore(BaseResultStoreTest):
+    @pytest.fixture
+    def results(self):
+        with StubResultStore.create() as results:
+            yield results
+
+    @pytest.fixture
+    def expiring_results(self):
+        with StubResultStore.create(ttl=0.1) as results:
+            yield results
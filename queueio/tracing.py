@@ -0,0 +1,378 @@
+import json
+import os
+import re
+import warnings
+from abc import ABC
+from abc import abstractmethod
+from collections.abc import Generator
+from collections.abc import Iterable
+from contextlib import contextmanager
+from contextlib import suppress
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from random import random
+from threading import Lock
+from time import time
+from typing import Any
+
+from .invocation import Invocation
+from .queue import Queue
+from .queue import ShutDown
+from .queuevar import QueueContext
+from .queuevar import QueueVar
+from .thread import Thread
+
+# The W3C trace context of the current span, propagated to invocations
+traceparent = QueueVar[str | None]("traceparent", default=None)
+
+_traceparent = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    """The identity of a span, and whether its trace is sampled."""
+
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+    @classmethod
+    def parse(cls, value: str | None, /) -> SpanContext | None:
+        """Parse a W3C traceparent, or None if it isn't valid."""
+        if value is None or (match := _traceparent.match(value)) is None:
+            return None
+        trace_id, span_id, flags = match.groups()
+        return cls(trace_id, span_id, sampled=bool(int(flags, 16) & 1))
+
+    def __str__(self):
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+@dataclass(frozen=True, kw_only=True)
+class Span:
+    """A timed operation in a trace, with times as Unix seconds."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start: float
+    end: float
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+
+def _span_id() -> str:
+    return os.urandom(8).hex()
+
+
+class Exporter(ABC):
+    """Send finished spans to be stored or viewed."""
+
+    @abstractmethod
+    def export(self, spans: list[Span], /):
+        """Export a batch of spans."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    @abstractmethod
+    def shutdown(self):
+        """Release any resources held by the exporter."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+
+class FileExporter(Exporter):
+    """Append spans to a file as JSON lines, for local testing."""
+
+    def __init__(self, path: Path, /):
+        self.__file = path.open("a")
+
+    def export(self, spans: list[Span], /):
+        for span in spans:
+            self.__file.write(json.dumps(asdict(span)) + "\n")
+        self.__file.flush()
+
+    def shutdown(self):
+        self.__file.close()
+
+
+class OtlpExporter(Exporter):
+    """Send spans to an OpenTelemetry collector with OTLP over HTTP.
+
+    Spans are encoded as OTLP JSON and posted to the traces endpoint
+    of the collector, such as http://localhost:4318/v1/traces.
+    """
+
+    def __init__(
+        self,
+        endpoint: str = "http://localhost:4318/v1/traces",
+        /,
+        *,
+        service: str = "queueio",
+        timeout: float = 10,
+    ):
+        self.__endpoint = endpoint
+        self.__service = service
+        self.__timeout = timeout
+
+    def encode(self, spans: Iterable[Span], /) -> dict[str, Any]:
+        """Encode spans as an OTLP export request."""
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": self.__service},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "queueio"},
+                            "spans": [self.__encode(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def __encode(self, span: Span) -> dict[str, Any]:
+        encoded: dict[str, Any] = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            # Producer spans are 4, and the other spans are internal
+            "kind": 4 if span.name == "queueio.enqueue" else 1,
+            "startTimeUnixNano": str(int(span.start * 1e9)),
+            "endTimeUnixNano": str(int(span.end * 1e9)),
+            "attributes": [
+                {"key": key, "value": {"stringValue": str(value)}}
+                for key, value in span.attributes.items()
+            ],
+        }
+        if span.parent_id is not None:
+            encoded["parentSpanId"] = span.parent_id
+        return encoded
+
+    def export(self, spans: list[Span], /):
+        # urllib is slow to import, and only needed to export
+        from urllib.request import Request
+        from urllib.request import urlopen
+
+        request = Request(
+            self.__endpoint,
+            data=json.dumps(self.encode(spans)).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urlopen(request, timeout=self.__timeout) as response:
+            response.read()
+
+    def shutdown(self):
+        pass
+
+
+@dataclass
+class _Trace:
+    """The spans of an invocation that is running in this process."""
+
+    trace_id: str
+    # The enqueue span, which is the parent of the invocation's spans
+    parent_id: str | None
+    run_id: str
+    started: float
+    # The start of the current suspension or resumption
+    segment: float
+    resuming: bool = False
+
+
+class Tracer:
+    """Record spans of invocations and export them in the background.
+
+    Traces are sampled when they start, at the given rate, and invocations
+    follow the decision of the trace they are part of. Invocations that
+    aren't sampled propagate their trace context without recording spans.
+    """
+
+    __batch_size = 512
+
+    @classmethod
+    @contextmanager
+    def start(cls, exporter: Exporter, /, *, sample: float = 1.0) -> Generator[Tracer]:
+        tracer = cls(exporter, sample=sample)
+        try:
+            yield tracer
+        finally:
+            tracer.shutdown()
+
+    def __init__(self, exporter: Exporter, /, *, sample: float = 1.0):
+        if not 0 <= sample <= 1:
+            raise ValueError(f"Sample rate {sample} is not between 0 and 1")
+        self.__exporter = exporter
+        self.__sample = sample
+        self.__spans = Queue[Span]()
+        self.__traces = dict[Invocation, _Trace]()
+        self.__shutdown_lock = Lock()
+        self.__shutdown = False
+        self.__thread = Thread(target=self.__export, name="queueio-tracer")
+        self.__thread.start()
+
+    def __export(self):
+        while True:
+            try:
+                spans = self.__spans.get_many(self.__batch_size)
+            except ShutDown:
+                break
+            try:
+                self.__exporter.export(spans)
+            except Exception as exception:
+                # Tracing must not interrupt the invocations being traced
+                warnings.warn(
+                    f"Failed to export {len(spans)} span(s): {exception!r}",
+                    RuntimeWarning,
+                    stacklevel=1,
+                )
+
+    def __record(self, span: Span):
+        with suppress(ShutDown):
+            self.__spans.put(span)
+
+    @contextmanager
+    def enqueue(self, invocation: Invocation, /, *, queue: str) -> Generator[None]:
+        """Record a span for enqueuing the invocation.
+
+        The invocation's context is given the trace context of this span,
+        so that the spans of the invocation are its children.
+        """
+        parent = SpanContext.parse(invocation.context.get(traceparent))
+        if parent is None:
+            context = SpanContext(
+                os.urandom(16).hex(), _span_id(), sampled=random() < self.__sample
+            )
+        else:
+            context = SpanContext(parent.trace_id, _span_id(), sampled=parent.sampled)
+        invocation.context = QueueContext(
+            {**invocation.context.serialize(), traceparent.name: str(context)}
+        )
+        if not context.sampled:
+            yield
+            return
+
+        start = time()
+        try:
+            yield
+        finally:
+            self.__record(
+                Span(
+                    name="queueio.enqueue",
+                    trace_id=context.trace_id,
+                    span_id=context.span_id,
+                    parent_id=None if parent is None else parent.span_id,
+                    start=start,
+                    end=time(),
+                    attributes={
+                        "queueio.routine": invocation.routine,
+                        "queueio.invocation_id": invocation.id,
+                        "messaging.destination.name": queue,
+                    },
+                )
+            )
+
+    def started(self, invocation: Invocation, /):
+        """Start the run span, after recording the wait in the queue.
+
+        The invocation's context is given the trace context of the run span,
+        so that invocations it submits are its children.
+        """
+        parent = SpanContext.parse(invocation.context.get(traceparent))
+        if parent is None or not parent.sampled:
+            return
+
+        now = time()
+        trace = _Trace(parent.trace_id, parent.span_id, _span_id(), now, now)
+        self.__traces[invocation] = trace
+        invocation.context = QueueContext(
+            {
+                **invocation.context.serialize(),
+                traceparent.name: str(
+                    SpanContext(trace.trace_id, trace.run_id, sampled=True)
+                ),
+            }
+        )
+        if invocation.enqueued_at is not None:
+            self.__span(invocation, trace, "queueio.wait", invocation.enqueued_at, now)
+
+    def __span(
+        self,
+        invocation: Invocation,
+        trace: _Trace,
+        name: str,
+        start: float,
+        end: float,
+    ):
+        self.__record(
+            Span(
+                name=name,
+                trace_id=trace.trace_id,
+                span_id=_span_id(),
+                parent_id=trace.parent_id if name == "queueio.wait" else trace.run_id,
+                start=start,
+                end=end,
+                attributes={
+                    "queueio.routine": invocation.routine,
+                    "queueio.invocation_id": invocation.id,
+                },
+            )
+        )
+
+    def suspended(self, invocation: Invocation, /):
+        if (trace := self.__traces.get(invocation)) is None:
+            return
+        now = time()
+        if trace.resuming:
+            self.__span(invocation, trace, "queueio.resume", trace.segment, now)
+        trace.segment, trace.resuming = now, False
+
+    def continued(self, invocation: Invocation, /):
+        if (trace := self.__traces.get(invocation)) is None:
+            return
+        self.__span(invocation, trace, "queueio.suspend", trace.segment, time())
+
+    def resumed(self, invocation: Invocation, /):
+        if (trace := self.__traces.get(invocation)) is None:
+            return
+        trace.segment, trace.resuming = time(), True
+
+    def completed(self, invocation: Invocation, /, *, ok: bool):
+        if (trace := self.__traces.pop(invocation, None)) is None:
+            return
+        now = time()
+        if trace.resuming:
+            self.__span(invocation, trace, "queueio.resume", trace.segment, now)
+        self.__record(
+            Span(
+                name="queueio.run",
+                trace_id=trace.trace_id,
+                span_id=trace.run_id,
+                parent_id=trace.parent_id,
+                start=trace.started,
+                end=now,
+                attributes={
+                    "queueio.routine": invocation.routine,
+                    "queueio.invocation_id": invocation.id,
+                    "queueio.result": "ok" if ok else "error",
+                },
+            )
+        )
+
+    def shutdown(self):
+        """Export the recorded spans, and stop exporting."""
+        with self.__shutdown_lock:
+            if self.__shutdown:
+                return
+            self.__shutdown = True
+        self.__spans.shutdown()
+        self.__thread.join()
+        self.__exporter.shutdown()
@@ -0,0 +1,188 @@
+import json
+from contextvars import copy_context
+
+import pytest
+
+from .pause import pause
+from .queueio import QueueIO
+from .queuespec import QueueSpec
+from .scenarios import QUEUE
+from .scenarios import noop
+from .stub import StubBackend
+from .tracing import Exporter
+from .tracing import FileExporter
+from .tracing import OtlpExporter
+from .tracing import Span
+from .tracing import SpanContext
+from .tracing import Tracer
+from .tracing import traceparent
+
+PARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+class ListExporter(Exporter):
+    def __init__(self):
+        self.spans = list[Span]()
+
+    def export(self, spans: list[Span], /):
+        self.spans.extend(spans)
+
+    def shutdown(self):
+        pass
+
+
+def span(name: str, **kwargs) -> Span:
+    return Span(
+        name=name,
+        trace_id="0af7651916cd43dd8448eb211c80319c",
+        span_id="b7ad6b7169203331",
+        parent_id=None,
+        start=1.5,
+        end=2.0,
+        **kwargs,
+    )
+
+
+def test_span_context_parses_traceparent():
+    context = SpanContext.parse(PARENT)
+
+    assert context == SpanContext(
+        "0af7651916cd43dd8448eb211c80319c", "b7ad6b7169203331", sampled=True
+    )
+    assert str(context) == PARENT
+    assert SpanContext.parse("not a traceparent") is None
+    assert SpanContext.parse(None) is None
+
+
+def test_tracer_records_the_spans_of_an_invocation():
+    """Spans of an invocation are children of the span that submitted it."""
+    exporter = ListExporter()
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+        Tracer.start(exporter) as tracer,
+    ):
+        queueio = QueueIO(broker=broker, journal=journal, tracer=tracer)
+        try:
+            queueio.sync([QUEUE])
+            with traceparent(PARENT):
+                queueio.submit(noop())
+            consumer = queueio.consume(QueueSpec(queues=[QUEUE], concurrency=1))
+            invocation = next(iter(consumer))
+
+            consumer.start(invocation)
+            # Invocations submitted while running are children of the run
+            ctx = copy_context()
+            invocation.context.load(ctx)
+            child = ctx.run(noop)
+
+            async def routine():
+                await pause(0)
+
+            generator = routine().__await__()
+            suspension = generator.send(None)
+            consumer.suspend(invocation, generator, suspension, copy_context())
+            consumer.resolve(invocation, generator, None)
+            consumer.resume(invocation)
+            consumer.succeed(invocation, None)
+        finally:
+            queueio.shutdown()
+
+    spans = {span.name: span for span in exporter.spans}
+    assert list(spans) == [
+        "queueio.enqueue",
+        "queueio.wait",
+        "queueio.suspend",
+        "queueio.resume",
+        "queueio.run",
+    ]
+    parent = SpanContext.parse(PARENT)
+    assert parent is not None
+    assert {span.trace_id for span in spans.values()} == {parent.trace_id}
+    enqueue, run = spans["queueio.enqueue"], spans["queueio.run"]
+    assert enqueue.parent_id == parent.span_id
+    assert enqueue.attributes["messaging.destination.name"] == QUEUE
+    assert spans["queueio.wait"].parent_id == enqueue.span_id
+    assert run.parent_id == enqueue.span_id
+    assert run.attributes["queueio.result"] == "ok"
+    assert spans["queueio.suspend"].parent_id == run.span_id
+    assert spans["queueio.resume"].parent_id == run.span_id
+    assert all(span.start <= span.end for span in spans.values())
+
+    child_context = SpanContext.parse(child.context.get(traceparent))
+    assert child_context is not None
+    assert child_context.span_id == run.span_id
+
+
+def test_tracer_propagates_unsampled_traces_without_spans():
+    exporter = ListExporter()
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+        Tracer.start(exporter, sample=0) as tracer,
+    ):
+        queueio = QueueIO(broker=broker, journal=journal, tracer=tracer)
+        try:
+            queueio.sync([QUEUE])
+            queueio.submit(noop())
+            consumer = queueio.consume(QueueSpec(queues=[QUEUE], concurrency=1))
+            invocation = next(iter(consumer))
+            consumer.start(invocation)
+            consumer.succeed(invocation, None)
+        finally:
+            queueio.shutdown()
+
+    assert exporter.spans == []
+    context = SpanContext.parse(invocation.context.get(traceparent))
+    assert context is not None
+    assert not context.sampled
+
+
+def test_tracer_warns_of_failed_exports():
+    class FailingExporter(ListExporter):
+        def export(self, spans: list[Span], /):
+            raise ConnectionError("collector is down")
+
+    with (
+        pytest.warns(RuntimeWarning, match="Failed to export 1 span"),
+        Tracer.start(FailingExporter()) as tracer,
+        tracer.enqueue(noop(), queue=QUEUE),
+    ):
+        pass
+
+
+def test_file_exporter_writes_json_lines(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = FileExporter(path)
+
+    exporter.export([span("queueio.run"), span("queueio.wait")])
+    exporter.shutdown()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["queueio.run", "queueio.wait"]
+    assert lines[0]["trace_id"] == "0af7651916cd43dd8448eb211c80319c"
+
+
+def test_otlp_exporter_encodes_spans():
+    exporter = OtlpExporter(service="web")
+
+    request = exporter.encode(
+        [span("queueio.enqueue", attributes={"queueio.routine": "noop"})]
+    )
+
+    (resource,) = request["resourceSpans"]
+    assert resource["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": "web"}}
+    ]
+    (encoded,) = resource["scopeSpans"][0]["spans"]
+    assert encoded == {
+        "traceId": "0af7651916cd43dd8448eb211c80319c",
+        "spanId": "b7ad6b7169203331",
+        "name": "queueio.enqueue",
+        "kind": 4,
+        "startTimeUnixNano": "1500000000",
+        "endTimeUnixNano": "2000000000",
+        "attributes": [{"key": "queueio.routine", "value": {"stringValue": "noop"}}],
+    }
@@ -0,0 +1,24 @@
+from collections.abc import Generator
+from contextlib import AbstractContextManager
+from contextlib import contextmanager
+
+from queueio.backend import Backend
+
+from .broker import UnixBroker
+from .journal import UnixJournal
+
+
+class UnixBackend(Backend):
+    def __init__(self, path: str):
+        self.__path = path
+
+    @classmethod
+    @contextmanager
+    def connect(cls, path: str, /) -> Generator[UnixBackend]:
+        yield cls(path)
+
+    def broker(self) -> AbstractContextManager[UnixBroker]:
+        return UnixBroker.connect(self.__path)
+
+    def journal(self) -> AbstractContextManager[UnixJournal]:
+        return UnixJournal.connect(self.__path)
@@ -0,0 +1,88 @@
+import socket
+from collections.abc import Generator
+from collections.abc import Iterable
+from contextlib import contextmanager
+from contextlib import suppress
+from threading import Lock
+from typing import Any
+
+from queueio.broker import Broker
+from queueio.queuespec import QueueSpec
+
+from .protocol import receive
+from .protocol import send
+from .receiver import UnixReceiver
+
+
+class UnixBroker(Broker):
+    """A broker whose queues are served by a hub on the same host.
+
+    Requests are sent to the hub over a Unix domain socket, and wait for
+    the hub to acknowledge them, so an enqueued message is in the hub's
+    queue when enqueue returns.
+    """
+
+    @classmethod
+    @contextmanager
+    def connect(cls, path: str) -> Generator[UnixBroker]:
+        broker = cls(path)
+        try:
+            yield broker
+        finally:
+            broker.shutdown()
+
+    def __init__(self, path: str):
+        self.__path = path
+        self.__lock = Lock()
+        self.__receivers = set[UnixReceiver]()
+        self.__shutdown_lock = Lock()
+        self.__shutdown = False
+        self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.__socket.connect(path)
+        self.__rfile = self.__socket.makefile("rb")
+        self.__wfile = self.__socket.makefile("wb")
+        send(self.__wfile, "broker")
+
+    def __request(self, *frame: Any):
+        with self.__lock:
+            send(self.__wfile, *frame)
+            response = receive(self.__rfile)
+        match response:
+            case ("error", exception):
+                raise exception
+            case None:
+                raise ConnectionError("The hub disconnected")
+
+    def sync(self, queues: Iterable[str], *, recreate: bool = False):
+        self.__request("sync", list(queues), recreate)
+
+    def enqueue(self, body: bytes, /, *, queue: str, priority: int):
+        self.__request("enqueue", [body], queue, priority)
+
+    def enqueue_many(self, bodies: Iterable[bytes], /, *, queue: str, priority: int):
+        """Enqueue messages with a single request to the hub."""
+        self.__request("enqueue", list(bodies), queue, priority)
+
+    def purge(self, *, queue: str):
+        self.__request("purge", queue)
+
+    def receive(self, queuespec: QueueSpec, /) -> UnixReceiver:
+        receiver = UnixReceiver(self.__path, queuespec)
+        self.__receivers.add(receiver)
+        return receiver
+
+    def shutdown(self):
+        with self.__shutdown_lock:
+            if self.__shutdown:
+                return
+            self.__shutdown = True
+
+            for receiver in set(self.__receivers):
+                receiver.shutdown()
+            self.__receivers.clear()
+
+            with self.__lock:
+                with suppress(OSError):
+                    self.__wfile.close()
+                self.__rfile.close()
+                self.__socket.close()
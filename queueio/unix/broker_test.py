@@ -0,0 +1,42 @@
+import pytest
+
+from queueio.broker_test import BaseBrokerTest
+from queueio.queuespec import QueueSpec
+
+from . import UnixBackend
+from .broker import UnixBroker
+from .hub import Hub
+
+
+@pytest.fixture
+def hub(tmp_path):
+    path = str(tmp_path / "queueio.sock")
+    with Hub.serve(path):
+        yield path
+
+
+class TestUnixBroker(BaseBrokerTest):
+    supports_multiple_queues = True
+    supports_weighted_queue_subscriptions = True
+
+    @pytest.fixture
+    def broker(self, hub):
+        with UnixBackend.connect(hub) as backend, backend.broker() as broker:
+            yield broker
+
+    @pytest.mark.timeout(2)
+    def test_unfinished_messages_are_enqueued_again(self, hub):
+        """Messages a receiver didn't finish go to the next receiver."""
+        with UnixBroker.connect(hub) as broker:
+            broker.sync(["test-queue"])
+            broker.enqueue(b"unfinished", queue="test-queue", priority=4)
+            receiver = broker.receive(QueueSpec(queues=["test-queue"], concurrency=1))
+            assert next(iter(receiver)).body == b"unfinished"
+            receiver.shutdown()
+
+            receiver = broker.receive(QueueSpec(queues=["test-queue"], concurrency=1))
+            assert next(iter(receiver)).body == b"unfinished"
+
+    def test_hub_refuses_a_socket_in_use(self, hub):
+        with pytest.raises(ValueError, match="already serving"):
+            Hub(hub)
@@ -0,0 +1,292 @@
+import os
+import socket
+import struct
+from collections.abc import Generator
+from collections.abc import Iterable
+from contextlib import contextmanager
+from contextlib import suppress
+from threading import Lock
+from typing import BinaryIO
+
+from queueio.message import Message
+from queueio.queue import Queue
+from queueio.queue import ShutDown
+from queueio.queuespec import QueueSpec
+from queueio.stub.receiver import StubReceiver
+from queueio.thread import Thread
+
+from .protocol import receive
+from .protocol import send
+
+_envelope = struct.Struct("!BH")
+
+
+def _wrap(body: bytes, /, *, queue: str, priority: int) -> bytes:
+    """Prefix the body with where it was enqueued, to enqueue it again."""
+    name = queue.encode()
+    return _envelope.pack(priority, len(name)) + name + body
+
+
+def _unwrap(data: bytes, /) -> bytes:
+    _, size = _envelope.unpack_from(data)
+    return data[_envelope.size + size :]
+
+
+class Hub:
+    """Serve queues and a journal to the processes on one host.
+
+    Clients connect to the hub with a Unix domain socket, which only the
+    user running the hub may connect to. The queues are kept in memory,
+    like the stub broker, so they don't outlive the hub. Messages that a
+    receiver doesn't finish before it disconnects are enqueued again.
+    Journal messages are sent to every subscriber that is connected.
+    """
+
+    __priorities = 10
+    __batch_size = 1000
+
+    @classmethod
+    @contextmanager
+    def serve(cls, path: str) -> Generator[Hub]:
+        hub = cls(path)
+        try:
+            yield hub
+        finally:
+            hub.shutdown()
+
+    def __init__(self, path: str):
+        self.__path = path
+        self.__lock = Lock()
+        self.__queues = dict[str, dict[int, Queue[bytes]]]()
+        self.__subscribers = set[Queue[bytes]]()
+        # The thread handling each connection
+        self.__connections = dict[socket.socket, Thread]()
+        self.__shutdown = False
+
+        # Replace a socket left behind by a hub that stopped
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(path)
+            except OSError:
+                with suppress(FileNotFoundError):
+                    os.unlink(path)
+            else:
+                raise ValueError(f"A hub is already serving at {path}")
+
+        self.__listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.__listener.bind(path)
+        os.chmod(path, 0o600)
+        self.__listener.listen()
+        self.__accept_thread = Thread(target=self.__accept, name="queueio-hub")
+        self.__accept_thread.start()
+
+    def __accept(self):
+        while True:
+            conn, _ = self.__listener.accept()
+            with self.__lock:
+                if self.__shutdown:
+                    conn.close()
+                    return
+                handler = Thread(
+                    target=self.__handle, args=(conn,), name="queueio-hub-connection"
+                )
+                self.__connections[conn] = handler
+            handler.start()
+
+    def __handle(self, conn: socket.socket):
+        rfile = conn.makefile("rb")
+        wfile = conn.makefile("wb")
+        try:
+            match receive(rfile):
+                case ("broker",):
+                    self.__serve_broker(rfile, wfile)
+                case ("receive", queuespec):
+                    self.__serve_receiver(queuespec, rfile, wfile)
+                case ("journal",):
+                    self.__serve_journal(rfile)
+                case ("subscribe",):
+                    self.__serve_subscriber(rfile, wfile)
+        except OSError:
+            # The client disconnected
+            pass
+        finally:
+            with self.__lock:
+                del self.__connections[conn]
+            with suppress(OSError):
+                wfile.close()
+            rfile.close()
+            conn.close()
+
+    def __serve_broker(self, rfile: BinaryIO, wfile: BinaryIO):
+        while (frame := receive(rfile)) is not None:
+            try:
+                match frame:
+                    case ("sync", queues, recreate):
+                        self.__sync(queues, recreate=recreate)
+                    case ("enqueue", bodies, queue, priority):
+                        self.__enqueue(bodies, queue=queue, priority=priority)
+                    case ("purge", queue):
+                        self.__purge(queue)
+                    case _:
+                        raise ValueError(f"Unknown broker request: {frame[0]}")
+            except Exception as exception:
+                send(wfile, "error", exception)
+            else:
+                send(wfile, "ok")
+
+    def __sync(self, queues: Iterable[str], *, recreate: bool):
+        with self.__lock:
+            for queue in queues:
+                if recreate or queue not in self.__queues:
+                    self.__queues[queue] = {
+                        p: Queue[bytes]() for p in range(self.__priorities)
+                    }
+
+    def __enqueue(self, bodies: Iterable[bytes], *, queue: str, priority: int):
+        with self.__lock:
+            if queue not in self.__queues:
+                raise ValueError(f"Queue '{queue}' does not exist")
+            target = self.__queues[queue][priority]
+        target.put_many(
+            [_wrap(body, queue=queue, priority=priority) for body in bodies]
+        )
+
+    def __purge(self, queue: str):
+        with self.__lock:
+            if queue not in self.__queues:
+                raise ValueError(f"Queue '{queue}' does not exist")
+            priority_queues = list(self.__queues[queue].values())
+        # Drain the queues in place, because receivers are waiting on them
+        for priority_queue in priority_queues:
+            with suppress(TimeoutError):
+                while True:
+                    priority_queue.get_many.within(0)(self.__batch_size)
+
+    def __receive(self, queuespec: QueueSpec) -> StubReceiver:
+        with self.__lock:
+            missing = [q for q in queuespec.queues if q not in self.__queues]
+            if missing:
+                raise ValueError(f"Queues do not exist: {missing}")
+            queues = [self.__queues[queue] for queue in queuespec.queues]
+        return StubReceiver(
+            queues=queues,
+            weights=queuespec.weights,
+            capacity=queuespec.concurrency,
+            priorities=self.__priorities,
+        )
+
+    def __serve_receiver(self, queuespec: QueueSpec, rfile: BinaryIO, wfile: BinaryIO):
+        try:
+            receiver = self.__receive(queuespec)
+        except ValueError as exception:
+            send(wfile, "error", exception)
+            return
+        send(wfile, "ok")
+
+        delivered = dict[int, Message]()
+
+        def deliver():
+            connected = True
+            # Keep receiving after a disconnect until the receiver shuts down,
+            # so that every message it took is delivered or enqueued again.
+            for id, message in enumerate(receiver):
+                delivered[id] = message
+                if connected:
+                    try:
+                        send(wfile, "message", id, _unwrap(message.body))
+                    except OSError:
+                        connected = False
+
+        sender = Thread(target=deliver, name="queueio-hub-receiver")
+        sender.start()
+        try:
+            while (frame := receive(rfile)) is not None:
+                match frame:
+                    case ("finish", id):
+                        receiver.finish(delivered.pop(id))
+                    case ("pause", id):
+                        receiver.pause(delivered[id])
+                    case ("unpause", id):
+                        receiver.unpause(delivered[id])
+                    case ("adjust", change):
+                        receiver.adjust(change)
+        finally:
+            receiver.shutdown()
+            sender.join()
+            for message in delivered.values():
+                self.__requeue(message)
+
+    def __requeue(self, message: Message):
+        priority, size = _envelope.unpack_from(message.body)
+        start = _envelope.size
+        queue = message.body[start : start + size].decode()
+        with self.__lock:
+            priority_queues = self.__queues.get(queue)
+        if priority_queues is not None:
+            with suppress(ShutDown):
+                priority_queues[priority].put(message.body)
+
+    def __serve_journal(self, rfile: BinaryIO):
+        while (frame := receive(rfile)) is not None:
+            match frame:
+                case ("publish", message):
+                    with self.__lock:
+                        subscribers = list(self.__subscribers)
+                    for subscriber in subscribers:
+                        with suppress(ShutDown):
+                            subscriber.put(message)
+
+    def __serve_subscriber(self, rfile: BinaryIO, wfile: BinaryIO):
+        subscriber = Queue[bytes]()
+        with self.__lock:
+            self.__subscribers.add(subscriber)
+        send(wfile, "ok")
+
+        def forward():
+            with suppress(ShutDown):
+                while True:
+                    send(wfile, "messages", subscriber.get_many(self.__batch_size))
+
+        sender = Thread(target=forward, name="queueio-hub-subscriber")
+        sender.start()
+        try:
+            # The subscriber sends nothing until it disconnects
+            receive(rfile)
+        finally:
+            with self.__lock:
+                self.__subscribers.discard(subscriber)
+            # Send the remaining messages before closing
+            subscriber.shutdown()
+            sender.join()
+
+    def shutdown(self):
+        with self.__lock:
+            if self.__shutdown:
+                return
+            self.__shutdown = True
+            connections = dict(self.__connections)
+            subscribers = list(self.__subscribers)
+            queues = [
+                queue
+                for priority_queues in self.__queues.values()
+                for queue in priority_queues.values()
+            ]
+
+        # Wake the accepting thread with a connection
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as wake:
+            wake.connect(self.__path)
+        self.__accept_thread.join()
+        self.__listener.close()
+        with suppress(FileNotFoundError):
+            os.unlink(self.__path)
+
+        for subscriber in subscribers:
+            subscriber.shutdown(immediate=True)
+        for queue in queues:
+            queue.shutdown(immediate=True)
+        for conn in connections:
+            with suppress(OSError):
+                conn.shutdown(socket.SHUT_RDWR)
+
+        for handler in connections.values():
+            handler.join()
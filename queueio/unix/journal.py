@@ -0,0 +1,89 @@
+import socket
+from collections.abc import Generator
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextlib import suppress
+from threading import Lock
+
+from queueio.journal import Journal
+
+from .protocol import receive
+from .protocol import send
+
+
+class UnixJournal(Journal):
+    """A journal whose messages are fanned out by a hub on the same host.
+
+    The journal subscribes when it connects, so it receives every message
+    published after that. Messages are published without waiting for the
+    hub to acknowledge them, and are received in the batches that the hub
+    sends them in.
+    """
+
+    @classmethod
+    @contextmanager
+    def connect(cls, path: str) -> Generator[UnixJournal]:
+        journal = cls(path)
+        try:
+            yield journal
+        finally:
+            journal.shutdown()
+
+    def __init__(self, path: str):
+        self.__publish_lock = Lock()
+        self.__shutdown_lock = Lock()
+        self.__shutdown = False
+        self.__subscribing = False
+
+        self.__publish_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.__publish_socket.connect(path)
+        self.__publish_file = self.__publish_socket.makefile("wb")
+        send(self.__publish_file, "journal")
+
+        # Wait for the subscription, so that no messages published after
+        # connecting are missed.
+        self.__subscribe_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.__subscribe_socket.connect(path)
+        self.__subscribe_file = self.__subscribe_socket.makefile("rb")
+        with self.__subscribe_socket.makefile("wb") as file:
+            send(file, "subscribe")
+        if receive(self.__subscribe_file) is None:
+            raise ConnectionError("The hub disconnected")
+
+    def subscribe(self) -> Iterator[bytes]:
+        for messages in self.subscribe_many():
+            yield from messages
+
+    def subscribe_many(self) -> Iterator[list[bytes]]:
+        with self.__shutdown_lock:
+            self.__subscribing = True
+        try:
+            with suppress(OSError, ValueError):
+                while (frame := receive(self.__subscribe_file)) is not None:
+                    _, messages = frame
+                    yield messages
+        finally:
+            self.__subscribe_file.close()
+            self.__subscribe_socket.close()
+
+    def publish(self, message: bytes):
+        with self.__publish_lock:
+            send(self.__publish_file, "publish", message)
+
+    def shutdown(self):
+        with self.__shutdown_lock:
+            if self.__shutdown:
+                return
+            self.__shutdown = True
+
+            with self.__publish_lock, suppress(OSError):
+                self.__publish_file.close()
+                self.__publish_socket.close()
+
+            # The hub sends the remaining messages to subscribers, then disconnects
+            if self.__subscribing:
+                with suppress(OSError):
+                    self.__subscribe_socket.shutdown(socket.SHUT_WR)
+            else:
+                self.__subscribe_file.close()
+                self.__subscribe_socket.close()
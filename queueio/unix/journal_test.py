@@ -0,0 +1,27 @@
+import pytest
+
+from queueio.journal_test import BaseJournalTest
+
+from .hub import Hub
+from .journal import UnixJournal
+
+
+class TestUnixJournal(BaseJournalTest):
+    @pytest.fixture
+    def journal(self, tmp_path):
+        path = str(tmp_path / "queueio.sock")
+        with Hub.serve(path), UnixJournal.connect(path) as journal:
+            yield journal
+
+    @pytest.mark.timeout(2)
+    def test_messages_are_fanned_out(self, tmp_path):
+        """Every connected journal receives each published message."""
+        path = str(tmp_path / "queueio.sock")
+        with (
+            Hub.serve(path),
+            UnixJournal.connect(path) as first,
+            UnixJournal.connect(path) as second,
+        ):
+            first.publish(b"message")
+            assert next(first.subscribe()) == b"message"
+            assert next(second.subscribe()) == b"message"
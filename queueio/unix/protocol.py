@@ -0,0 +1,25 @@
+import pickle
+import struct
+from typing import Any
+from typing import BinaryIO
+
+_header = struct.Struct("!I")
+
+
+def send(file: BinaryIO, /, *frame: Any):
+    """Send a frame of values, prefixed by its length."""
+    data = pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL)
+    file.write(_header.pack(len(data)) + data)
+    file.flush()
+
+
+def receive(file: BinaryIO, /) -> tuple[Any, ...] | None:
+    """Receive a frame of values, or None if the connection closed."""
+    header = file.read(_header.size)
+    if len(header) < _header.size:
+        return None
+    (size,) = _header.unpack(header)
+    data = file.read(size)
+    if len(data) < size:
+        return None
+    return pickle.loads(data)
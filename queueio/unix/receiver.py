@@ -0,0 +1,86 @@
+import socket
+from collections.abc import Iterator
+from contextlib import suppress
+from threading import Lock
+from typing import Any
+
+from queueio.message import Message
+from queueio.queuespec import QueueSpec
+from queueio.receiver import Receiver
+
+from .protocol import receive
+from .protocol import send
+
+
+class UnixReceiver(Receiver):
+    """Receive messages from a hub over a Unix domain socket.
+
+    The hub sends messages as there is capacity for them, and is told when
+    they pause, unpause, and finish. Messages that aren't finished when
+    the receiver disconnects are enqueued again by the hub.
+    """
+
+    def __init__(self, path: str, queuespec: QueueSpec, /):
+        if len(queuespec.queues) == 0:
+            raise ValueError("Must specify at least one queue")
+
+        self.__ids = dict[Message, int]()
+        self.__lock = Lock()
+        self.__shutdown = False
+        self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.__socket.connect(path)
+        self.__rfile = self.__socket.makefile("rb")
+        self.__wfile = self.__socket.makefile("wb")
+        send(self.__wfile, "receive", queuespec)
+        match receive(self.__rfile):
+            case ("error", exception):
+                self.__close()
+                raise exception
+            case None:
+                self.__close()
+                raise ConnectionError("The hub disconnected")
+
+    def __send(self, *frame: Any):
+        with self.__lock:
+            if self.__shutdown:
+                # The hub enqueues unfinished messages again
+                return
+            send(self.__wfile, *frame)
+
+    def __iter__(self) -> Iterator[Message]:
+        with suppress(OSError, ValueError):
+            while (frame := receive(self.__rfile)) is not None:
+                if self.__shutdown:
+                    return
+                _, id, body = frame
+                message = Message(body)
+                self.__ids[message] = id
+                yield message
+
+    def pause(self, message: Message, /):
+        self.__send("pause", self.__ids[message])
+
+    def unpause(self, message: Message, /):
+        self.__send("unpause", self.__ids[message])
+
+    def finish(self, message: Message, /):
+        self.__send("finish", self.__ids.pop(message))
+
+    def adjust(self, change: int, /):
+        self.__send("adjust", change)
+
+    def __close(self):
+        with suppress(OSError):
+            self.__wfile.close()
+        self.__rfile.close()
+        self.__socket.close()
+
+    def shutdown(self):
+        with self.__lock:
+            if self.__shutdown:
+                return
+            self.__shutdown = True
+            # Wake the iterator by closing the connection
+            with suppress(OSError):
+                self.__socket.shutdown(socket.SHUT_RDWR)
+            self.__close()
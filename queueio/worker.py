@@ -1,12 +1,25 @@
+import warnings
 from collections.abc import Awaitable
+from collections.abc import Coroutine
 from concurrent.futures import FIRST_COMPLETED
 from concurrent.futures import Future
 from concurrent.futures import wait
 from contextlib import suppress
 from contextvars import copy_context
+from dataclasses import dataclass
+from threading import Condition
+from threading import Event
+from threading import Lock
 from threading import Timer
+from time import monotonic
+from time import process_time
+from typing import Any
 
+from .concurrency import ConcurrencyController
+from .concurrency import Sample
+from .concurrency import parallelism
 from .continuation import Continuation
+from .id import random_id
 from .invocation import Invocation
 from .queue import Queue
 from .queue import ShutDown
@@ -14,54 +27,386 @@ from .queueio import QueueIO
 from .queuespec import QueueSpec
 from .result import Err
 from .result import Ok
+from .select import select
 from .thread import Thread
 
 
-class Worker:
-    def __init__(self, queueio: QueueIO, queuespec: QueueSpec):
+@dataclass
+class WaitTimes:
+    """Accumulated time that tasks of one kind waited for a runner."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, wait: float):
+        self.count += 1
+        self.total += wait
+        self.max = max(self.max, wait)
+
+
+class Pool:
+    """Runners, and the consumer that feeds them, for one queuespec.
+
+    Each pool of a worker has its own capacity, so a backlog on the queues
+    of one pool doesn't hold back the others.
+    """
+
+    __control_interval = 1.0
+
+    def __init__(
+        self,
+        queueio: QueueIO,
+        queuespec: QueueSpec,
+        *,
+        id: str,
+        max_suspended: int | None = None,
+    ):
+        self.__id = id
         self.__queueio = queueio
+        self.__queuespec = queuespec
+        name = ",".join(queuespec.shares())
+
+        # Runners beyond the limit wait for it to rise. It only changes
+        # from the concurrency when the queuespec is adaptive.
+        runners = queuespec.max_concurrency or queuespec.concurrency
+        self.__limit = queuespec.concurrency
+        self.__slots = Condition()
+        self.__stopping = Event()
+
+        # Continuations are run before new invocations, so that work in
+        # progress finishes before more is started. New invocations are
+        # bounded to push back on the receiver when the runners are busy.
+        self.__continuations = Queue[tuple[float, Continuation]]()
+        self.__invocations = Queue[tuple[float, Invocation]](maxsize=runners)
+        self.__stats_lock = Lock()
+        self.__wait_times = {"invocation": WaitTimes(), "continuation": WaitTimes()}
+        self.__busy = 0
+        self.__peak_busy = 0
+        self.__completed = 0
+        self.__run_time = 0.0
+        self.__consumer = self.__queueio.consume(queuespec, max_suspended=max_suspended)
+
+        self.runner_threads = [
+            Thread(
+                target=self.__runner,
+                name=f"queueio-{name}-runner-{i + 1}",
+                args=(i,),
+            )
+            for i in range(runners)
+        ]
+        self.controller_thread = (
+            Thread(target=self.__controller, name=f"queueio-{name}-controller")
+            if queuespec.adaptive
+            else None
+        )
+        self.receiver_thread = Thread(
+            target=self.__receiver, name=f"queueio-{name}-receiver"
+        )
+
+    def threads(self) -> list[Thread]:
+        """All the threads of the pool."""
+        threads = [self.receiver_thread, *self.runner_threads]
+        if self.controller_thread:
+            threads.append(self.controller_thread)
+        return threads
+
+    def __contains__(self, invocation: Invocation) -> bool:
+        return invocation in self.__consumer
+
+    def __receiver(self):
+        """Put messages from the consumer onto the queue.
+
+        This actor is dedicated to reading the queue and keeping the
+        consumer active.
+        """
+        for invocation in self.__consumer:
+            with suppress(ShutDown):
+                self.__invocations.put((monotonic(), invocation))
+
+    def resolve(self, continuation: Continuation, value: Any):
+        """Continue a suspended invocation with the value it waited for."""
+        self.__consumer.resolve(continuation.invocation, continuation.generator, value)
+        with suppress(ShutDown):
+            self.__continuations.put(
+                (
+                    monotonic(),
+                    Continuation(
+                        invocation=continuation.invocation,
+                        generator=continuation.generator,
+                        result=Ok(value),
+                        context=continuation.context,
+                    ),
+                )
+            )
+
+    def throw(self, continuation: Continuation, exception: Exception):
+        """Continue a suspended invocation with the exception it waited for."""
+        self.__consumer.throw(
+            continuation.invocation, continuation.generator, exception
+        )
+        with suppress(ShutDown):
+            self.__continuations.put(
+                (
+                    monotonic(),
+                    Continuation(
+                        invocation=continuation.invocation,
+                        generator=continuation.generator,
+                        result=Err(exception),
+                        context=continuation.context,
+                    ),
+                )
+            )
+
+    def __runner(self, slot: int):
+        """Run tasks from the queue.
 
-        self.__tasks = Queue[Invocation | Continuation]()
-        self.__consumer = self.__queueio.consume(queuespec)
+        This actor pulls tasks from the queue and runs them, writing the
+        appropriate events to the stream to notify other actors of the results.
+        """
+        while True:
+            with self.__slots:
+                self.__slots.wait_for(
+                    lambda: slot < self.__limit or self.__stopping.is_set()
+                )
+            if self.__stopping.is_set():
+                break
+
+            try:
+                # Selection prefers the earlier queue when both are ready
+                _, (enqueued, task) = select(
+                    [
+                        self.__continuations.get.select(),
+                        self.__invocations.get.select(),
+                    ]
+                )
+            except ShutDown:
+                break
+
+            with self.__stats_lock:
+                self.__busy += 1
+                self.__peak_busy = max(self.__peak_busy, self.__busy)
+            started = monotonic()
+
+            match task:
+                case Invocation() as invocation:
+                    waited = self.__record_wait("invocation", enqueued)
+                    self.__consumer.start(invocation, waited=waited)
+                    self.__run_invocation(invocation)
+                case Continuation() as continuation:
+                    waited = self.__record_wait("continuation", enqueued)
+                    self.__consumer.resume(continuation.invocation, waited=waited)
+                    self.__run_continuation(continuation)
+
+            with self.__stats_lock:
+                self.__busy -= 1
+                self.__completed += 1
+                self.__run_time += monotonic() - started
+
+    def __controller(self):
+        """Adapt the concurrency to the workload.
+
+        This actor samples the runners each interval, and applies the
+        controller's adjustments to the runner limit and consumer capacity.
+        """
+        assert self.__queuespec.max_concurrency is not None
+        controller = ConcurrencyController(
+            self.__queuespec.concurrency, self.__queuespec.max_concurrency
+        )
+        cpus = parallelism()
+        sampled, cpu_time = monotonic(), process_time()
+        while not self.__stopping.wait(self.__control_interval):
+            now, now_cpu_time = monotonic(), process_time()
+            elapsed = now - sampled
+            with self.__stats_lock:
+                completed, run_time, peak_busy = (
+                    self.__completed,
+                    self.__run_time,
+                    self.__peak_busy,
+                )
+                self.__completed, self.__run_time = 0, 0.0
+                self.__peak_busy = self.__busy
+
+            sample = Sample(
+                throughput=completed / elapsed,
+                latency=run_time / completed if completed else 0.0,
+                cpu=(now_cpu_time - cpu_time) / (elapsed * cpus),
+                saturated=peak_busy >= controller.limit,
+            )
+            sampled, cpu_time = now, now_cpu_time
+
+            previous = controller.limit
+            reason = controller.update(sample)
+            if reason is None:
+                continue
+
+            try:
+                self.__consumer.adjust(controller.limit - previous)
+            except NotImplementedError as exception:
+                warnings.warn(
+                    f"Keeping a fixed concurrency of {previous}: {exception}",
+                    RuntimeWarning,
+                    stacklevel=1,
+                )
+                self.__stopping.wait()
+                return
+            with self.__slots:
+                self.__limit = controller.limit
+                self.__slots.notify_all()
+            self.__queueio.publish(
+                ConcurrencyController.Adjusted(
+                    id=self.__id,
+                    previous=previous,
+                    limit=controller.limit,
+                    reason=reason,
+                    throughput=sample.throughput,
+                    latency=sample.latency,
+                    cpu=sample.cpu,
+                )
+            )
+
+    def __record_wait(self, kind: str, enqueued: float) -> float:
+        waited = monotonic() - enqueued
+        with self.__stats_lock:
+            self.__wait_times[kind].add(waited)
+        return waited
+
+    def wait_times(self) -> dict[str, WaitTimes]:
+        """Time that tasks waited for a runner, by kind of task."""
+        with self.__stats_lock:
+            return {
+                kind: WaitTimes(times.count, times.total, times.max)
+                for kind, times in self.__wait_times.items()
+            }
+
+    def __run_invocation(self, invocation: Invocation):
+        """Process an invocation task."""
+        routine = self.__queueio.routine(invocation.routine)
+        ctx = copy_context()
+        invocation.context.load(ctx)
+        try:
+            result = ctx.run(routine.fn, *invocation.args, **invocation.kwargs)
+        except Exception as exception:
+            self.__consumer.error(invocation, exception)
+        else:
+            if isinstance(result, Awaitable):
+                # Coroutines are resumed directly, so their frames can be sized
+                generator = (
+                    result if isinstance(result, Coroutine) else result.__await__()
+                )
+                self.__run_continuation(
+                    Continuation(
+                        invocation=invocation,
+                        generator=generator,
+                        result=Ok(None),
+                        context=ctx,
+                    )
+                )
+            else:
+                self.__consumer.succeed(invocation, result)
+
+    def __run_continuation(self, continuation: Continuation):
+        """Process a continuation task."""
+        method = continuation.resume
+
+        try:
+            suspension = continuation.context.run(method)
+        except StopIteration as stop:
+            self.__consumer.succeed(continuation.invocation, stop.value)
+        except Exception as exception:
+            self.__consumer.error(continuation.invocation, exception)
+        else:
+            self.__consumer.suspend(
+                continuation.invocation,
+                continuation.generator,
+                suspension,
+                continuation.context,
+            )
+
+    def stop(self):
+        """Stop running tasks, without waiting for the queued ones."""
+        self.__stopping.set()
+        with self.__slots:
+            self.__slots.notify_all()
+        self.__continuations.shutdown(immediate=True)
+        self.__invocations.shutdown(immediate=True)
+
+
+class Worker:
+    """Run invocations from the queues of one or more queuespecs.
+
+    Each queuespec gets its own pool of runners and consumer, and the pools
+    share the connection, event stream, and continuer of the worker.
+
+    max_suspended caps how many invocations suspended on a pause release
+    their capacity in each pool. It doesn't cover invocations awaiting
+    other invocations, which always release their capacity.
+    """
+
+    def __init__(
+        self,
+        queueio: QueueIO,
+        /,
+        *queuespecs: QueueSpec,
+        max_suspended: int | None = None,
+    ):
+        if not queuespecs:
+            raise ValueError("Must specify at least one queuespec")
+
+        # Import only the routines on these queues when there's a manifest
+        queueio.import_routines(
+            queue for queuespec in queuespecs for queue in queuespec.queues
+        )
+
+        self.__id = random_id()
+        self.__queueio = queueio
+        self.__pools = [
+            Pool(queueio, queuespec, id=self.__id, max_suspended=max_suspended)
+            for queuespec in queuespecs
+        ]
         self.__continuer_events = self.__queueio.subscribe({Invocation.LocalSuspended})
 
         # Start threads event queues are created
-        self.__runner_threads = [
-            Thread(target=self.__runner, name=f"queueio-runner-{i + 1}")
-            for i in range(queuespec.concurrency)
-        ]
         self.__continuer_thread = Thread(
             target=self.__continuer, name="queueio-continuer"
         )
-        self.__receiver_thread = Thread(target=self.__receiver, name="queueio-receiver")
         self.__timers: dict[str, Timer] = {}
+        self.__stopped = False
 
     def __call__(self):
         with self.__queueio.invocation_handler() as invocation_handler_future:
             try:
-                for thread in self.__runner_threads:
-                    thread.start()
+                for pool in self.__pools:
+                    for thread in pool.threads():
+                        thread.start()
                 self.__continuer_thread.start()
-                self.__receiver_thread.start()
 
                 done, _ = wait(
-                    [
-                        invocation_handler_future,
-                        self.__continuer_thread.future,
-                        self.__receiver_thread.future,
-                    ]
-                    + [thread.future for thread in self.__runner_threads],
+                    [invocation_handler_future, self.__continuer_thread.future]
+                    + [
+                        thread.future
+                        for pool in self.__pools
+                        for thread in pool.threads()
+                    ],
                     return_when=FIRST_COMPLETED,
                 )
                 for future in done:
                     future.result()
+                if self.__stopped:
+                    return
                 print("Some actor finished unexpectedly.")
                 print(
                     {
                         "continuer": self.__continuer_thread.future,
-                        "receiver": self.__receiver_thread.future,
                         "invocation": invocation_handler_future,
-                        "runners": [thread.future for thread in self.__runner_threads],
+                        "pools": [
+                            {thread.name: thread.future for thread in pool.threads()}
+                            for pool in self.__pools
+                        ],
                     }
                 )
             except KeyboardInterrupt:
@@ -69,15 +414,9 @@ class Worker:
             finally:
                 self.shutdown()
 
-    def __receiver(self):
-        """Put messages from the consumer onto the queue.
-
-        This actor is dedicated to reading the queue and keeping the
-        consumer active.
-        """
-        for invocation in self.__consumer:
-            with suppress(ShutDown):
-                self.__tasks.put(invocation)
+    def __pool(self, invocation: Invocation) -> Pool:
+        """The pool whose consumer received the invocation."""
+        return next(pool for pool in self.__pools if invocation in pool)
 
     def __continuer(self):
         """Continue suspended invocations.
@@ -133,34 +472,13 @@ class Worker:
                     continue
 
                 continuation = waiting.pop(future)
+                pool = self.__pool(continuation.invocation)
                 try:
                     value = future.result()
                 except Exception as exception:
-                    self.__consumer.throw(
-                        continuation.invocation, continuation.generator, exception
-                    )
-                    with suppress(ShutDown):
-                        self.__tasks.put(
-                            Continuation(
-                                invocation=continuation.invocation,
-                                generator=continuation.generator,
-                                result=Err(exception),
-                                context=continuation.context,
-                            )
-                        )
+                    pool.throw(continuation, exception)
                 else:
-                    self.__consumer.resolve(
-                        continuation.invocation, continuation.generator, value
-                    )
-                    with suppress(ShutDown):
-                        self.__tasks.put(
-                            Continuation(
-                                invocation=continuation.invocation,
-                                generator=continuation.generator,
-                                result=Ok(value),
-                                context=continuation.context,
-                            ),
-                        )
+                    pool.resolve(continuation, value)
 
             if wait_new.done():
                 try:
@@ -170,80 +488,36 @@ class Worker:
 
         listener_thread.join()
 
-    def __runner(self):
-        """Run tasks from the queue.
-
-        This actor pulls tasks from the queue and runs them, writing the
-        appropriate events to the stream to notify other actors of the results.
-        """
-        while True:
-            try:
-                task = self.__tasks.get()
-            except ShutDown:
-                break
-
-            match task:
-                case Invocation() as invocation:
-                    self.__consumer.start(invocation)
-                    self.__run_invocation(invocation)
-                case Continuation() as continuation:
-                    self.__consumer.resume(continuation.invocation)
-                    self.__run_continuation(continuation)
-
-    def __run_invocation(self, invocation: Invocation):
-        """Process an invocation task."""
-        routine = self.__queueio.routine(invocation.routine)
-        ctx = copy_context()
-        invocation.context.load(ctx)
-        try:
-            result = ctx.run(routine.fn, *invocation.args, **invocation.kwargs)
-        except Exception as exception:
-            self.__consumer.error(invocation, exception)
-        else:
-            if isinstance(result, Awaitable):
-                generator = result.__await__()
-                self.__run_continuation(
-                    Continuation(
-                        invocation=invocation,
-                        generator=generator,
-                        result=Ok(None),
-                        context=ctx,
-                    )
-                )
-            else:
-                self.__consumer.succeed(invocation, result)
-
-    def __run_continuation(self, continuation: Continuation):
-        """Process a continuation task."""
-        method = continuation.resume
-
-        try:
-            suspension = continuation.context.run(method)
-        except StopIteration as stop:
-            self.__consumer.succeed(continuation.invocation, stop.value)
-        except Exception as exception:
-            self.__consumer.error(continuation.invocation, exception)
-        else:
-            self.__consumer.suspend(
-                continuation.invocation,
-                continuation.generator,
-                suspension,
-                continuation.context,
-            )
+    def wait_times(self) -> dict[str, WaitTimes]:
+        """Time that tasks waited for a runner, by kind of task."""
+        totals = {"invocation": WaitTimes(), "continuation": WaitTimes()}
+        for pool in self.__pools:
+            for kind, times in pool.wait_times().items():
+                total = totals[kind]
+                total.count += times.count
+                total.total += times.total
+                total.max = max(total.max, times.max)
+        return totals
 
     def stop(self):
-        self.__tasks.shutdown(immediate=True)
+        self.__stopped = True
+        for pool in self.__pools:
+            pool.stop()
         for timer in self.__timers.values():
             timer.cancel()
-        for thread in self.__runner_threads:
-            thread.join()
+        for pool in self.__pools:
+            for thread in pool.threads():
+                if thread.is_alive() and thread is not pool.receiver_thread:
+                    thread.join()
 
     def shutdown(self):
-        self.__tasks.shutdown(immediate=True)
+        for pool in self.__pools:
+            pool.stop()
         for timer in self.__timers.values():
             timer.cancel()
         self.__queueio.shutdown()
         self.__continuer_thread.join()
-        self.__receiver_thread.join()
-        for thread in self.__runner_threads:
-            thread.join()
+        for pool in self.__pools:
+            for thread in pool.threads():
+                if thread.is_alive():
+                    thread.join()
@@ -0,0 +1,326 @@
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import replace
+from threading import Event
+
+import pytest
+
+from .concurrency import ConcurrencyController
+from .consumer import Consumer
+from .message import Message
+from .metrics import Metrics
+from .pause import pause
+from .queueio import QueueIO
+from .queuespec import QueueSpec
+from .receiver import Receiver
+from .registry import ROUTINE_REGISTRY
+from .routine import Routine
+from .stub import StubBackend
+from .stub.broker import StubBroker
+from .thread import Thread
+from .worker import Worker
+
+QUEUE = "worker-test"
+OTHER = "worker-test-other"
+
+
+class WideQueueIO(QueueIO):
+    """Receive more invocations than there are runners, as a prefetch may."""
+
+    def consume(self, queuespec: QueueSpec, /, **kwargs) -> Consumer:
+        maximum = queuespec.max_concurrency
+        wider = replace(
+            queuespec,
+            concurrency=queuespec.concurrency + 4,
+            max_concurrency=None if maximum is None else maximum + 4,
+        )
+        return super().consume(wider, **kwargs)
+
+
+class Routines:
+    """Routines that record the order they run in."""
+
+    def __init__(self):
+        self.order = list[str]()
+        self.blocking = Event()
+        self.gate = Event()
+
+        def record(label: str):
+            self.order.append(label)
+
+        def block(label: str):
+            self.blocking.set()
+            self.gate.wait(timeout=5)
+            self.order.append(label)
+
+        async def pauses(interval: float):
+            self.order.append("paused")
+            await pause(interval)
+            self.order.append("resumed")
+
+        async def awaits(label: str):
+            await self.elsewhere(label)
+
+        self.record = Routine(record, name="worker_test_record", queue=QUEUE)
+        self.block = Routine(block, name="worker_test_block", queue=QUEUE)
+        self.pauses = Routine(pauses, name="worker_test_pauses", queue=QUEUE)
+        self.awaits = Routine(awaits, name="worker_test_awaits", queue=QUEUE)
+        self.elsewhere = Routine(record, name="worker_test_elsewhere", queue=OTHER)
+
+
+@pytest.fixture
+def routines():
+    routines = Routines()
+    original_registry = dict(ROUTINE_REGISTRY)
+    for routine in vars(routines).values():
+        if isinstance(routine, Routine):
+            ROUTINE_REGISTRY[routine.name] = routine
+    try:
+        yield routines
+    finally:
+        routines.gate.set()
+        ROUTINE_REGISTRY.clear()
+        ROUTINE_REGISTRY.update(original_registry)
+
+
+@contextmanager
+def running(queueio: QueueIO, *queuespecs: QueueSpec) -> Generator[Worker]:
+    """Run a worker, stopping it and shutting down the QueueIO at exit."""
+    worker = Worker(queueio, *queuespecs)
+    thread = Thread(target=worker, name="queueio-test-worker")
+    thread.start()
+    try:
+        with queueio.invocation_handler():
+            yield worker
+    finally:
+        worker.stop()
+        thread.join()
+    thread.future.result()
+
+
+def test_continuations_run_before_buffered_invocations(routines):
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = WideQueueIO(broker=broker, journal=journal)
+        queueio.sync([QUEUE])
+        with running(queueio, QueueSpec(queues=[QUEUE], concurrency=1)):
+            paused = routines.pauses(0.1).submit()
+            blocked = routines.block("blocked").submit()
+            assert routines.blocking.wait(timeout=1)
+            recorded = routines.record("invocation").submit()
+            time.sleep(0.3)  # The pause ends while the invocation is buffered
+
+            routines.gate.set()
+            for future in [paused, blocked, recorded]:
+                future.result(timeout=1)
+
+    assert routines.order == ["paused", "blocked", "resumed", "invocation"]
+
+
+def test_receiving_blocks_when_the_runners_are_busy(routines):
+    metrics = Metrics()
+    in_flight = f'queueio_in_flight{{routine="worker_test_record",queue="{QUEUE}"}}'
+
+    def received() -> float:
+        for line in metrics.render().splitlines():
+            if line.startswith(in_flight + " "):
+                return float(line.rsplit(" ", 1)[1])
+        return 0
+
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = WideQueueIO(broker=broker, journal=journal, metrics=metrics)
+        queueio.sync([QUEUE])
+        with running(queueio, QueueSpec(queues=[QUEUE], concurrency=1)):
+            blocked = routines.block("blocked").submit()
+            assert routines.blocking.wait(timeout=1)
+            recorded = [routines.record(str(i)).submit() for i in range(4)]
+            time.sleep(0.2)
+
+            # One is buffered, and the receiver waits to buffer the next
+            # instead of receiving the rest while the runner is busy
+            assert received() == 2
+            routines.gate.set()
+            for future in [blocked, *recorded]:
+                future.result(timeout=1)
+
+    assert routines.order == ["blocked", "0", "1", "2", "3"]
+
+
+def test_wait_times_are_reported_by_kind(routines):
+    metrics = Metrics()
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = WideQueueIO(broker=broker, journal=journal, metrics=metrics)
+        queueio.sync([QUEUE])
+        spec = QueueSpec(queues=[QUEUE], concurrency=1)
+        with running(queueio, spec) as worker:
+            blocked = routines.block("blocked").submit()
+            assert routines.blocking.wait(timeout=1)
+            recorded = routines.record("waited").submit()
+            time.sleep(0.1)  # The invocation waits for the busy runner
+            routines.gate.set()
+            routines.pauses(0).submit().result(timeout=1)
+            for future in [blocked, recorded]:
+                future.result(timeout=1)
+            wait_times = worker.wait_times()
+
+    invocations, continuations = wait_times["invocation"], wait_times["continuation"]
+    assert invocations.count == 3
+    assert continuations.count == 1
+    assert invocations.max >= 0.05
+    assert invocations.mean == invocations.total / 3
+    assert continuations.max < invocations.max
+
+    # The metrics have the same wait times, by routine
+    counts = {
+        line.split("{", 1)[1].rsplit("}", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in metrics.render().splitlines()
+        if line.startswith("queueio_runner_wait_seconds_count{")
+    }
+    assert counts == {
+        f'routine="worker_test_block",queue="{QUEUE}",kind="invocation"': 1,
+        f'routine="worker_test_record",queue="{QUEUE}",kind="invocation"': 1,
+        f'routine="worker_test_pauses",queue="{QUEUE}",kind="invocation"': 1,
+        f'routine="worker_test_pauses",queue="{QUEUE}",kind="continuation"': 1,
+    }
+
+
+def test_adaptive_pools_adjust_the_receiver_and_runners(routines):
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = QueueIO(broker=broker, journal=journal)
+        queueio.sync([QUEUE])
+        adjusted = queueio.subscribe({ConcurrencyController.Adjusted})
+        with running(queueio, QueueSpec.parse(f"{QUEUE}=auto:1..2")):
+            blocked = routines.block("blocked").submit()
+            assert routines.blocking.wait(timeout=1)
+            recorded = routines.record("recorded").submit()
+
+            # The saturated runner raises the limit, so the receiver
+            # receives another invocation, and another runner runs it
+            event = adjusted.get.within(2)()
+            assert (event.previous, event.limit) == (1, 2)
+            assert event.reason == "saturated"
+            assert recorded.result(timeout=1) is None
+            assert not blocked.done()
+
+            routines.gate.set()
+            blocked.result(timeout=1)
+
+    assert routines.order == ["recorded", "blocked"]
+
+
+def test_runners_beyond_the_limit_wait_for_it_to_rise(routines):
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = WideQueueIO(broker=broker, journal=journal)
+        queueio.sync([QUEUE])
+        adjusted = queueio.subscribe({ConcurrencyController.Adjusted})
+        with running(queueio, QueueSpec.parse(f"{QUEUE}=auto:1..2")):
+            blocked = routines.block("blocked").submit()
+            assert routines.blocking.wait(timeout=1)
+
+            # The invocation is received, but the second runner waits
+            recorded = routines.record("recorded").submit()
+            time.sleep(0.5)
+            assert not recorded.done()
+
+            adjusted.get.within(2)()
+            assert recorded.result(timeout=1) is None
+            routines.gate.set()
+            blocked.result(timeout=1)
+
+
+def test_pools_run_the_invocations_of_their_queuespecs(routines):
+    with (
+        StubBackend.connect() as backend,
+        backend.broker() as broker,
+        backend.journal() as journal,
+    ):
+        queueio = QueueIO(broker=broker, journal=journal)
+        queueio.sync([QUEUE, OTHER])
+        with running(
+            queueio,
+            QueueSpec(queues=[QUEUE], concurrency=1),
+            QueueSpec(queues=[OTHER], concurrency=1),
+        ):
+            blocked = routines.block("blocked").submit()
+            assert routines.blocking.wait(timeout=1)
+
+            # The other pool has its own runner
+            assert routines.elsewhere("elsewhere").submit().result(timeout=1) is None
+            routines.gate.set()
+            blocked.result(timeout=1)
+
+            # The continuation of the parent goes back to its own pool
+            # after the child completes in the other pool
+            assert routines.awaits("child").submit().result(timeout=1) is None
+
+    assert routines.order == ["elsewhere", "blocked", "child"]
+
+
+class FixedReceiver(Receiver):
+    """A receiver that can't adjust its capacity."""
+
+    def __init__(self, receiver: Receiver):
+        self.__receiver = receiver
+
+    def __iter__(self):
+        return iter(self.__receiver)
+
+    def pause(self, message: Message, /):
+        self.__receiver.pause(message)
+
+    def unpause(self, message: Message, /):
+        self.__receiver.unpause(message)
+
+    def finish(self, message: Message, /):
+        self.__receiver.finish(message)
+
+
+class FixedBroker(StubBroker):
+    def receive(  # pyright: ignore[reportIncompatibleMethodOverride]
+        self, queuespec: QueueSpec, /
+    ) -> FixedReceiver:
+        return FixedReceiver(super().receive(queuespec))
+
+
+def test_receivers_that_cant_adjust_keep_a_fixed_concurrency(routines):
+    with (
+        StubBackend.connect() as backend,
+        FixedBroker.create() as broker,
+        backend.journal() as journal,
+        pytest.warns(RuntimeWarning) as warned,
+    ):
+        queueio = QueueIO(broker=broker, journal=journal)
+        queueio.sync([QUEUE])
+        with running(queueio, QueueSpec.parse(f"{QUEUE}=auto:1..2")):
+            blocked = routines.block("blocked").submit()
+            assert routines.blocking.wait(timeout=1)
+            recorded = routines.record("recorded").submit()
+            # The runner is saturated for the control interval
+            time.sleep(1.2)
+            assert not recorded.done()
+            routines.gate.set()
+            for future in [blocked, recorded]:
+                future.result(timeout=1)
+
+    assert "Keeping a fixed concurrency of 1" in str(warned[0].message)
+    assert "FixedReceiver can't adjust its capacity" in str(warned[0].message)